@@ -0,0 +1,266 @@
+import numpy as np
+import os
+import sys
+import threading
+
+from model_ann import (
+    predict_flood_ann_batch,
+    ANN_STATUS_LABELS,
+    ANN_STATUS_MESSAGES,
+    ANN_FEATURE_COLUMNS,
+    batch_input_shape,
+    batch_error
+)
+
+DEFAULT_WEIGHTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ann_weights.npz')
+LAYER_SIZES = (4, 8, 4, 1)
+NORMALIZATION_FACTORS = np.array([300.0, 150.0, 100.0, 35.0])
+
+_shared_models = {}
+_shared_lock = threading.Lock()
+
+class FloodMLP:
+    """Jaringan 4-8-4-1 (tanh - tanh - sigmoid) berbasis NumPy murni"""
+
+    def __init__(self, layer_sizes=LAYER_SIZES, seed=42):
+        self.layer_sizes = tuple(layer_sizes)
+        rng = np.random.default_rng(seed)
+
+        self.weights = []
+        self.biases = []
+        for fan_in, fan_out in zip(self.layer_sizes[:-1], self.layer_sizes[1:]):
+            limit = np.sqrt(6.0 / (fan_in + fan_out))
+            self.weights.append(rng.uniform(-limit, limit, size=(fan_in, fan_out)))
+            self.biases.append(np.zeros(fan_out))
+
+        self.training_samples = 0
+        self.final_loss = None
+
+    def _forward(self, x):
+        """Forward pass, simpan aktivasi tiap layer untuk backprop"""
+        activations = [x]
+        for i, (w, b) in enumerate(zip(self.weights, self.biases)):
+            z = activations[-1] @ w + b
+            if i == len(self.weights) - 1:
+                activations.append(1.0 / (1.0 + np.exp(-z)))
+            else:
+                activations.append(np.tanh(z))
+        return activations
+
+    def predict_proba(self, features):
+        """Risiko (0-1) untuk array fitur mentah berbentuk (n, 4)"""
+        a = np.asarray(features, dtype=float) / NORMALIZATION_FACTORS
+        last = len(self.weights) - 1
+        for i, (w, b) in enumerate(zip(self.weights, self.biases)):
+            z = a @ w + b
+            a = 1.0 / (1.0 + np.exp(-z)) if i == last else np.tanh(z)
+        return a[..., 0]
+
+    def fit(self, features, targets, epochs=30, batch_size=256, learning_rate=0.01, seed=0):
+        """
+        Training mini-batch dengan Adam dan binary cross-entropy.
+        Target boleh label 0/1 maupun risiko kontinu 0-1.
+        """
+        x = np.asarray(features, dtype=float) / NORMALIZATION_FACTORS
+        y = np.asarray(targets, dtype=float).reshape(-1, 1)
+        n = len(x)
+        rng = np.random.default_rng(seed)
+
+        params = self.weights + self.biases
+        m = [np.zeros_like(p) for p in params]
+        v = [np.zeros_like(p) for p in params]
+        beta1, beta2, eps = 0.9, 0.999, 1e-8
+        step = 0
+
+        for _ in range(epochs):
+            order = rng.permutation(n)
+            epoch_loss = 0.0
+
+            for start in range(0, n, batch_size):
+                idx = order[start:start + batch_size]
+                xb, yb = x[idx], y[idx]
+                activations = self._forward(xb)
+                out = activations[-1]
+
+                clipped = np.clip(out, 1e-7, 1 - 1e-7)
+                epoch_loss -= np.sum(yb * np.log(clipped) + (1 - yb) * np.log(1 - clipped))
+
+                # Gradien BCE terhadap pre-aktivasi sigmoid = out - y
+                delta = (out - yb) / len(xb)
+                grads_w = [None] * len(self.weights)
+                grads_b = [None] * len(self.biases)
+                for i in range(len(self.weights) - 1, -1, -1):
+                    grads_w[i] = activations[i].T @ delta
+                    grads_b[i] = delta.sum(axis=0)
+                    if i > 0:
+                        delta = (delta @ self.weights[i].T) * (1 - activations[i] ** 2)
+
+                step += 1
+                for p, g, m_i, v_i in zip(params, grads_w + grads_b, m, v):
+                    m_i *= beta1
+                    m_i += (1 - beta1) * g
+                    v_i *= beta2
+                    v_i += (1 - beta2) * g * g
+                    m_hat = m_i / (1 - beta1 ** step)
+                    v_hat = v_i / (1 - beta2 ** step)
+                    p -= learning_rate * m_hat / (np.sqrt(v_hat) + eps)
+
+            self.final_loss = epoch_loss / n
+
+        self.training_samples = n
+        return self
+
+    def save(self, path=DEFAULT_WEIGHTS_PATH):
+        """Simpan bobot ke file .npz (tanpa kompresi agar cepat dibaca)"""
+        arrays = {'layer_sizes': np.array(self.layer_sizes),
+                'training_samples': np.array(self.training_samples)}
+        for i, (w, b) in enumerate(zip(self.weights, self.biases)):
+            arrays[f'W{i}'] = w
+            arrays[f'b{i}'] = b
+        np.savez(path, **arrays)
+        print(f"✅ MLP weights saved: {path}")
+        return path
+
+    @classmethod
+    def load(cls, path=DEFAULT_WEIGHTS_PATH):
+        """Muat bobot dari file .npz"""
+        with np.load(path) as data:
+            model = cls(layer_sizes=data['layer_sizes'].tolist())
+            model.weights = [data[f'W{i}'] for i in range(len(model.layer_sizes) - 1)]
+            model.biases = [data[f'b{i}'] for i in range(len(model.layer_sizes) - 1)]
+            model.training_samples = int(data['training_samples'])
+        for arr in model.weights + model.biases:
+            arr.setflags(write=False)
+        return model
+
+def get_shared_mlp(path=DEFAULT_WEIGHTS_PATH):
+    """
+    Instance MLP per proses, dipakai bersama oleh semua sesi Streamlit.
+    File bobot hanya dibaca sekali; bobotnya read-only.
+    """
+    model = _shared_models.get(path)
+    if model is not None:
+        return model
+
+    with _shared_lock:
+        model = _shared_models.get(path)
+        if model is None:
+            model = FloodMLP.load(path)
+            _shared_models[path] = model
+            print(f"✅ MLP weights loaded: {path}")
+    return model
+
+def reset_shared_mlp(path=None):
+    """Buang cache agar bobot baru dibaca ulang setelah retraining"""
+    with _shared_lock:
+        if path is None:
+            _shared_models.clear()
+        else:
+            _shared_models.pop(path, None)
+
+def predict_flood_mlp_batch(rainfall, water_level, humidity, temperature, weights_path=DEFAULT_WEIGHTS_PATH):
+    """Prediksi MLP untuk array input, format keluaran sama dengan predict_flood_ann_batch"""
+    try:
+        features = np.stack(np.broadcast_arrays(
+            np.atleast_1d(np.asarray(rainfall, dtype=float)),
+            np.atleast_1d(np.asarray(water_level, dtype=float)),
+            np.atleast_1d(np.asarray(humidity, dtype=float)),
+            np.atleast_1d(np.asarray(temperature, dtype=float))
+        ), axis=-1)
+
+        risk_level = get_shared_mlp(weights_path).predict_proba(features)
+        status_code = (risk_level >= 0.5).astype(np.int8) + (risk_level >= 0.8).astype(np.int8)
+
+        return {
+            'risk_level': np.round(risk_level, 3),
+            'status_code': status_code,
+            'status': ANN_STATUS_LABELS[status_code],
+            'message': ANN_STATUS_MESSAGES[status_code]
+        }
+
+    except Exception as e:
+        return batch_error(
+            batch_input_shape(rainfall, water_level, humidity, temperature),
+            f'Error dalam prediksi MLP batch: {str(e)}'
+        )
+
+def predict_flood_mlp(rainfall, water_level, humidity, temperature, weights_path=DEFAULT_WEIGHTS_PATH):
+    """Memprediksi risiko banjir menggunakan MLP 4-8-4-1 yang sudah dilatih"""
+    try:
+        features = np.array([[rainfall, water_level, humidity, temperature]], dtype=float)
+        risk_level = float(get_shared_mlp(weights_path).predict_proba(features)[0])
+        status_code = int(risk_level >= 0.5) + int(risk_level >= 0.8)
+
+        return {
+            'risk_level': round(risk_level, 3),
+            'status': ANN_STATUS_LABELS[status_code],
+            'message': ANN_STATUS_MESSAGES[status_code],
+            'parameters_used': {
+                'architecture': '-'.join(str(s) for s in LAYER_SIZES),
+                'normalization_factors': NORMALIZATION_FACTORS.tolist(),
+                'input_values': {
+                    'rainfall': rainfall,
+                    'water_level': water_level,
+                    'humidity': humidity,
+                    'temperature': temperature
+                }
+            }
+        }
+
+    except Exception as e:
+        return {
+            'risk_level': 0.0,
+            'status': 'ERROR',
+            'message': f'Error dalam prediksi MLP: {str(e)}'
+        }
+
+def get_mlp_parameters(weights_path=DEFAULT_WEIGHTS_PATH):
+    """Return parameter MLP untuk display di technical details"""
+    model = get_shared_mlp(weights_path)
+    return {
+        'architecture': '4-8-4-1 Neural Network',
+        'activation': 'Tanh (hidden), Sigmoid (output)',
+        'normalization_factors': NORMALIZATION_FACTORS.tolist(),
+        'training_samples': model.training_samples,
+        'weights_file': os.path.basename(weights_path),
+        'version': 'MLP'
+    }
+
+def generate_training_data(n_samples=50000, seed=0):
+    """
+    Sampel sintetis di rentang operasional (hujan 0-500 mm, air 60-150 mdpl,
+    kelembapan 0-100%, suhu 15-40°C) berlabel risiko dari model 2.0.
+    """
+    rng = np.random.default_rng(seed)
+    features = np.column_stack([
+        rng.uniform(0.0, 500.0, n_samples),
+        rng.uniform(60.0, 150.0, n_samples),
+        rng.uniform(0.0, 100.0, n_samples),
+        rng.uniform(15.0, 40.0, n_samples)
+    ])
+    labels = predict_flood_ann_batch(*features.T)['risk_level']
+    return features, labels
+
+def train_and_save(features=None, targets=None, path=DEFAULT_WEIGHTS_PATH, **fit_kwargs):
+    """Latih MLP (default: data sintetis), simpan bobot, dan muat ulang cache proses"""
+    if features is None or targets is None:
+        features, targets = generate_training_data()
+
+    model = FloodMLP().fit(features, targets, **fit_kwargs)
+    print(f"✅ MLP trained on {model.training_samples} samples, loss={model.final_loss:.4f}")
+    model.save(path)
+    reset_shared_mlp(path)
+    return model
+
+def load_training_csv(csv_path, target_column='risk'):
+    """Baca data berlabel dari CSV dengan kolom fitur ANN dan kolom target"""
+    import pandas as pd
+    df = pd.read_csv(csv_path, usecols=ANN_FEATURE_COLUMNS + [target_column])
+    return df[ANN_FEATURE_COLUMNS].to_numpy(dtype=float), df[target_column].to_numpy(dtype=float)
+
+if __name__ == "__main__":
+    # python ann_mlp.py [data.csv]  -> latih ulang dan tulis ann_weights.npz
+    if len(sys.argv) > 1:
+        train_and_save(*load_training_csv(sys.argv[1]))
+    else:
+        train_and_save()
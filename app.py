@@ -35,34 +35,12 @@ def safe_print(message):
 
 safe_print(f"[INFO] Checking database at: {os.path.abspath(DB_PATH)}")
 
-if not os.path.exists(DB_PATH):
-    safe_print("[WARNING] Database belum diinisialisasi. Menjalankan init database...")
-    try:
-        import sqlite3
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS flood_reports (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TEXT NOT NULL,
-                address TEXT NOT NULL,
-                flood_height TEXT NOT NULL,
-                reporter_name TEXT NOT NULL,
-                reporter_phone TEXT,
-                photo_path TEXT,
-                ip_address TEXT,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
-        safe_print("[OK] Database berhasil diinisialisasi!")
-    except Exception as e:
-        safe_print(f"[ERROR] Gagal inisialisasi database: {e}")
-else:
-    safe_print(f"[OK] Database found: {os.path.getsize(DB_PATH)} bytes")
+try:
+    from models.DatabaseMigrator import DatabaseMigrator
+    schema_version = DatabaseMigrator(DB_PATH).migrate()
+    safe_print(f"[OK] Database schema version: {schema_version}")
+except Exception as e:
+    safe_print(f"[ERROR] Gagal migrasi database: {e}")
 
 # ==================== IMPORT CONTROLLERS ====================
 safe_print("[SYSTEM] Initializing Flood Warning System...")
@@ -76,12 +54,22 @@ except Exception as e:
     
     # FALLBACK CONTROLLERS JIKA IMPORT GAGAL
     class FloodReportController:
+        def __init__(self, *args, **kwargs): pass
         def submit_report(self, *args, **kwargs):
             return False, "Sistem offline - Google Sheets tidak terhubung"
-        def get_today_reports(self): return []
-        def get_month_reports(self): return []
-        def get_all_reports(self): return []
-        def get_monthly_statistics(self): return {}
+        def get_today_reports(self, as_frame=False): return []
+        def get_month_reports(self, as_frame=False): return []
+        def get_all_reports(self, as_frame=False): return []
+        def search_reports(self, *args, **kwargs): return []
+        def new_report_feed(self, scope='today', max_size=1000): return {'scope': scope, 'day': None, 'last_id': 0, 'reports': [], 'max_size': max_size, 'total': 0, 'locations': set(), 'reporters': set()}
+        def poll_report_feed(self, feed, batch_size=500): return 0
+        def get_export_formats(self): return {'csv': 'text/csv'}
+        def export_reports(self, *args, **kwargs): raise RuntimeError("Ekspor tidak tersedia")
+        def get_reports_page(self, *args, **kwargs): return {'reports': [], 'next_cursor': None}
+        def get_reports_summary(self, *args, **kwargs): return {'total_reports': 0, 'unique_locations': 0, 'unique_reporters': 0, 'today_reports': 0}
+        def get_monthly_statistics(self, *args, **kwargs): return {}
+        def get_report_histogram(self, *args, **kwargs): return {'labels': [], 'counts': [], 'total': 0}
+        def get_month_to_date_range(self): return None, None
         def get_client_ip(self): return "127.0.0.1"
         def get_yearly_statistics(self):
             from datetime import datetime
@@ -118,37 +106,15 @@ except Exception as e:
             ]
 
 # ==================== IMPORT MODEL PREDICTION ====================
-try:
-    from model_ann import predict_flood_ann_with_temp_range
-    sys.stderr.write("[OK] ANN model imported\n")
-except ImportError:
-    sys.stderr.write("[WARNING] Using fallback ANN model\n")
-    def predict_flood_ann_with_temp_range(rainfall, water_level, humidity, temp_min, temp_max):
-        """Fallback prediction function"""
-        temp_avg = (temp_min + temp_max) / 2
-        risk = min(1.0, (rainfall / 300) * 0.5 + (water_level / 150) * 0.3 + (humidity / 100) * 0.15 + ((temp_avg - 20) / 20) * 0.05)
-        
-        if risk >= 0.7:
-            status = "TINGGI"
-            message = "WASPADA! Potensi banjir tinggi"
-        elif risk >= 0.4:
-            status = "MENENGAH"
-            message = "SIAGA! Pantau perkembangan"
-        else:
-            status = "RENDAH"
-            message = "AMAN, tetap waspada"
-        
-        return {
-            'risk_level': round(risk, 3),
-            'status': status,
-            'message': message,
-            'temperature_range': {'min': temp_min, 'max': temp_max, 'average': temp_avg}
-        }
+# Registry memilih versi model aktif (default "2.0") dan otomatis jatuh ke
+# versi "simple" tanpa NumPy jika versi aktif gagal dimuat.
+from model_registry import predict_flood_ann_with_temp_range
+sys.stderr.write("[OK] ANN model registry imported\n")
 
 # ==================== IMPORT VIEWS ====================
 try:
     from views.flood_report_form import show_flood_report_form
-    from views.flood_reports_table import show_current_month_reports
+    from views.flood_reports_table import show_current_month_reports, show_report_search
     from views.monthly_reports import show_monthly_reports_summary
     from views.prediction_dashboard import show_prediction_dashboard
     from views.panduan_page import show_panduan_page
@@ -162,6 +128,9 @@ except Exception as e:
     def show_current_month_reports(*args, **kwargs):
         st.info("Reports not available")
 
+    def show_report_search(*args, **kwargs):
+        st.info("Pencarian laporan tidak tersedia")
+
     def show_monthly_reports_summary(*args, **kwargs):
         st.info("Monthly reports not available")
 
@@ -398,7 +367,7 @@ st.markdown(CSS_THEME, unsafe_allow_html=True)
 if 'controllers_initialized' not in st.session_state:
     try:
         print("[INIT] Initializing controllers...")
-        st.session_state.flood_controller = FloodReportController()
+        st.session_state.flood_controller = FloodReportController(db_path=DB_PATH)
         st.session_state.realtime_controller = RealTimeDataController()
         st.session_state.controllers_initialized = True
         print("[OK] All controllers initialized successfully")
@@ -755,8 +724,6 @@ def show_flood_calculator_page():
     # ========== PREDIKSI TANPA GOOGLE SHEETS ==========
     if submitted:
         with st.spinner("Menganalisis data..."):
-            time.sleep(0.8)
-            
             try:
                 rainfall_val = float(rainfall)
                 water_level_val = float(water_level)
@@ -775,6 +742,9 @@ def show_flood_calculator_page():
                 show_calculator_result(result, rainfall_val, water_level_val, 
                                     humidity_val, temp_min_val, temp_max_val)
                 
+                show_risk_surface(rainfall_val, water_level_val, humidity_val,
+                                temp_min_val, temp_max_val)
+                
             except Exception as e:
                 st.error(f"[ERROR] Error dalam prediksi: {str(e)}")
                 
@@ -900,6 +870,53 @@ def show_calculator_result(result, rainfall, water_level, humidity, temp_min, te
     if st.button("Uji Parameter Lain", use_container_width=True, type="secondary"):
         st.rerun()
 
+def show_risk_surface(rainfall, water_level, humidity, temp_min, temp_max):
+    """Heatmap risiko untuk seluruh rentang curah hujan x tinggi air"""
+    
+    st.markdown("---")
+    st.markdown("### PETA RISIKO")
+    st.caption(f"Curah hujan 0-500 mm x tinggi air 60-150 mdpl | Kelembapan {humidity:.2f}% | Suhu rata-rata {(temp_min + temp_max) / 2:.1f}°C")
+    
+    try:
+        from risk_surface import compute_risk_surface
+        from model_registry import registry
+        import matplotlib.pyplot as plt
+        
+        # Versi tanpa prediktor batch dihitung per titik; pakai grid lebih kasar
+        version = registry.active_version
+        resolution = (500, 500) if registry.is_vectorized(version) else (100, 100)
+        
+        surface = compute_risk_surface(
+            resolution=resolution,
+            humidity=humidity,
+            temp_min=temp_min,
+            temp_max=temp_max,
+            version=version
+        )
+        
+        fig, ax = plt.subplots(figsize=(10, 6))
+        extent = [surface['rainfall'][0], surface['rainfall'][-1],
+                surface['water_level'][0], surface['water_level'][-1]]
+        
+        image = ax.imshow(surface['risk_level'], origin='lower', aspect='auto',
+                        extent=extent, cmap='RdYlGn_r', vmin=0.0, vmax=1.0)
+        ax.contour(surface['rainfall'], surface['water_level'], surface['risk_level'],
+                levels=[0.5, 0.8], colors='white', linewidths=1)
+        ax.plot(rainfall, water_level, marker='o', color='#00a8ff',
+                markeredgecolor='white', markersize=10)
+        
+        ax.set_xlabel('Curah Hujan (mm)', fontsize=12)
+        ax.set_ylabel('Tinggi Air (mdpl)', fontsize=12)
+        fig.colorbar(image, ax=ax, label='Risk Level')
+        plt.tight_layout()
+        
+        st.pyplot(fig)
+        plt.close(fig)
+        st.caption(f"Model {surface['version']} | Garis putih: risk level 0.5 dan 0.8. Titik biru: parameter yang dimasukkan.")
+        
+    except Exception as e:
+        st.warning(f"[WARNING] Peta risiko tidak dapat ditampilkan: {str(e)}")
+
 # ==================== CATATAN LAPORAN PAGE (MENU PEMILIHAN) ====================
 def show_catatan_laporan_page():
     """Halaman utama Catatan Laporan (Menu pemilihan)"""
@@ -943,6 +960,9 @@ def show_catatan_laporan_page():
         if st.button("Lihat Rekapan Bulanan", key="go_bulanan_from_main", use_container_width=True):
             st.session_state.current_page = "Bulanan"
             st.rerun()
+    
+    st.markdown("---")
+    show_report_search(flood_controller)
 
 # ==================== HARIAN PAGE (LAPORAN HARIAN) ====================
 def show_harian_page():
@@ -1123,6 +1143,9 @@ def show_bulanan_page():
             else:
                 st.info("Tidak ada data untuk ditampilkan")
         
+        with st.expander("Ekspor Laporan untuk Mitra (BPBD)", expanded=False):
+            show_report_export()
+        
         st.markdown("---")
         st.markdown("#### Analisis Tren")
         
@@ -1143,6 +1166,53 @@ def show_bulanan_page():
             if zero_months:
                 st.info(f"**Bulan tanpa laporan:** {', '.join(zero_months)}")
 
+def show_report_export():
+    """
+    Ekspor laporan (CSV/Parquet/GeoJSON) per rentang tanggal. Query dan
+    penulisan berjalan per chunk ke file sementara di disk, tetapi
+    st.download_button butuh seluruh isi file: hasil akhir dibaca utuh ke
+    memori sebelum dikirim. Untuk ekspor sangat besar gunakan CLI
+    export_reports.py yang menulis langsung ke file.
+    """
+    import tempfile
+    
+    use_range = st.checkbox("Batasi rentang tanggal", key="export_use_range")
+    start_date = end_date = None
+    if use_range:
+        col1, col2 = st.columns(2)
+        with col1:
+            start_date = st.date_input("Dari tanggal", key="export_start")
+        with col2:
+            end_date = st.date_input("Sampai tanggal", key="export_end")
+    
+    formats = flood_controller.get_export_formats()
+    fmt = st.selectbox("Format", list(formats), format_func=str.upper, key="export_format")
+    
+    if st.button("Siapkan File Ekspor", key="export_prepare", use_container_width=True):
+        try:
+            # Ditulis bertahap ke file sementara (bukan DataFrame di memori)
+            with tempfile.TemporaryFile() as buffer:
+                total = flood_controller.export_reports(
+                    buffer, fmt,
+                    start_date.isoformat() if start_date else None,
+                    end_date.isoformat() if end_date else None
+                )
+                buffer.seek(0)
+                # download_button butuh seluruh isi file (lihat docstring)
+                data = buffer.read()
+            
+            suffix = f"{start_date}_{end_date}" if use_range else "semua"
+            st.success(f"✅ {total} laporan siap diunduh")
+            st.download_button(
+                label=f"Download Laporan ({fmt.upper()})",
+                data=data,
+                file_name=f"laporan_banjir_{suffix}.{fmt}",
+                mime=formats[fmt],
+                use_container_width=True
+            )
+        except Exception as e:
+            st.error(f"❌ Ekspor gagal: {str(e)}")
+
 # ==================== PAGE HANDLERS LAINNYA ====================
 def show_flood_report_page():
     st.markdown(
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Job arsip laporan banjir (CLI untuk models/ReportArchiver).
+
+Memindahkan laporan yang lebih tua dari horizon (default 730 hari) dari
+flood_reports ke file SQLite per tahun di folder archive/. Penyalinan
+berjalan per chunk lalu baris dihapus dari tabel utama; aman dijalankan
+ulang (mis. dari cron) jika terputus.
+
+    python archive_reports.py [db_path] [--horizon-days N] [--archive-dir DIR]
+"""
+
+import sys
+
+from models.ReportArchiver import ReportArchiver, ARCHIVE_HORIZON_DAYS
+
+def _option(args, name, default):
+    if name in args:
+        i = args.index(name)
+        value = args[i + 1]
+        del args[i:i + 2]
+        return value
+    return default
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    horizon_days = int(_option(args, '--horizon-days', ARCHIVE_HORIZON_DAYS))
+    archive_dir = _option(args, '--archive-dir', None)
+    db_path = args[0] if args else 'flood_system.db'
+
+    print("=" * 60)
+    print(f"📦 ARCHIVING REPORTS OLDER THAN {horizon_days} DAYS")
+    print("=" * 60)
+
+    archiver = ReportArchiver(db_path, archive_dir=archive_dir, horizon_days=horizon_days)
+    moved = archiver.run()
+    for year, count in moved.items():
+        print(f"  {year}: {count} laporan -> {archiver.archive_path(year)}")
@@ -1,16 +1,32 @@
-from models.FloodReportModel import FloodReportModel
+from models.ReportStorage import create_report_storage, month_date_range
 from models.GoogleSheetsModel import GoogleSheetsModel
+from models.ReportExporter import EXPORT_FORMATS, parquet_available
+from models.ReportRateLimiter import ReportRateLimiter
+from models.ReportDeduplicator import ReportDeduplicator
 import os
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
 import streamlit as st
 import traceback
-import sqlite3
-from datetime import timedelta
+
+# Jumlah reverse proxy tepercaya di depan aplikasi (Streamlit Cloud / nginx).
+# IP klien = entri X-Forwarded-For yang ditambahkan proxy terdekat.
+TRUSTED_PROXY_HOPS = 1
 
 class FloodReportController:
-    def __init__(self):
-        self.flood_model = FloodReportModel()
+    def __init__(self, flood_model=None, db_path='flood_system.db'):
+        # Backend penyimpanan (ReportStorage): SQLite secara default, atau
+        # InMemoryReportStorage untuk uji beban / benchmark
+        self.flood_model = flood_model if flood_model is not None else create_report_storage(db_path=db_path)
+        # Batas laporan per IP / No HP di memori, snapshot ke file database backend
+        # Indeks LSH laporan hampir sama dibagi semua sesi per file database
+        if self.flood_model.db_path:
+            self.rate_limiter = ReportRateLimiter.for_path(self.flood_model.db_path)
+            self.deduplicator = ReportDeduplicator.for_path(self.flood_model.db_path)
+        else:
+            self.rate_limiter = ReportRateLimiter()
+            self.deduplicator = ReportDeduplicator()
+        self._warm_deduplicator()
         self.sheets_model = None
         self.upload_folder = "uploads"
         
@@ -39,12 +55,27 @@ class FloodReportController:
         except Exception as e:
             print(f"❌ Error creating upload folder: {e}")
     
-    def check_daily_limit(self, ip_address):
-        """Check if daily limit (10 reports per IP) has been reached"""
+    def _warm_deduplicator(self):
+        """Fill the duplicate index with recent canonical reports (once per process)"""
+        if self.deduplicator.warmed:
+            return
         try:
-            today_count = self.flood_model.get_today_reports_count_by_ip(ip_address)
-            can_submit = today_count < 10
-            print(f"📊 Daily limit check: IP={ip_address}, Count={today_count}, CanSubmit={can_submit}")
+            page = self.flood_model.get_reports_page('all', page_size=500, collapse_duplicates=True)
+            recent = [(
+                report.id,
+                report.alamat,
+                self.flood_model.tz_wib.localize(datetime.strptime(report.timestamp, '%Y-%m-%d %H:%M:%S')).timestamp()
+            ) for report in page['reports']]
+            self.deduplicator.warm(recent)
+            print(f"✅ Duplicate index warmed: {self.deduplicator.stats()['entries']} recent reports")
+        except Exception as e:
+            print(f"⚠️ Duplicate index not warmed: {e}")
+    
+    def check_daily_limit(self, ip_address, phone=None):
+        """Check the per-IP / per-phone report limit (in memory, no database query)"""
+        try:
+            can_submit, retry_after = self.rate_limiter.check(ip_address, phone)
+            print(f"📊 Daily limit check: IP={ip_address}, CanSubmit={can_submit}, RetryAfter={retry_after:.0f}s")
             return can_submit
         except Exception as e:
             print(f"⚠️ Error in check_daily_limit: {e}")
@@ -54,12 +85,16 @@ class FloodReportController:
         """Submit new flood report dengan struktur baru"""
         photo_url = None
         photo_filename = None
+        client_ip = None
+        admitted = False
         
         try:
             client_ip = self.get_client_ip()
             print(f"🌐 Client IP: {client_ip}")
             
-            if not self.check_daily_limit(client_ip):
+            # Slot dicatat saat cek (atomik); dikembalikan jika laporan gagal disimpan
+            admitted, _ = self.rate_limiter.acquire(client_ip, reporter_phone)
+            if not admitted:
                 return False, "❌ Mohon maaf batas laporan harian telah mencapai batas, silahkan kembali lagi besok."
             
             if photo_file is not None:
@@ -68,6 +103,7 @@ class FloodReportController:
                     valid_extensions = ['jpg', 'jpeg', 'png', 'gif']
                     
                     if file_extension not in valid_extensions:
+                        self.rate_limiter.release(client_ip, reporter_phone)
                         return False, f"❌ Format file tidak didukung. Gunakan: {', '.join(valid_extensions)}"
                     
                     photo_filename = f"{uuid.uuid4()}.{file_extension}"
@@ -87,17 +123,31 @@ class FloodReportController:
                     photo_filename = None
             
             
+            # Alamat hampir sama dalam jendela waktu -> ditautkan ke laporan kanonik.
+            # Cek + daftar indeks dijalankan backend di bagian tulis yang sama
+            # dengan insert, jadi dua laporan serupa tidak sama-sama kanonik.
+            signature = self.deduplicator.signature(address)
+            matches = []
+            
+            def deduplicate(report_id):
+                match = self.deduplicator.find_or_add(report_id, signature)
+                if match:
+                    matches.append(match)
+                return match
+            
             report_id = self.flood_model.create_report(
                 alamat=address,  
                 tinggi_banjir=flood_height,  
                 nama_pelapor=reporter_name,  
                 no_hp=reporter_phone,  
                 photo_url=photo_url,  
-                ip_address=client_ip  
+                ip_address=client_ip,
+                deduplicate=deduplicate
             )
             
             if not report_id:
                 print("❌ Failed to save to SQLite")
+                self.rate_limiter.release(client_ip, reporter_phone)
                 if photo_url and os.path.exists(photo_url):
                     try:
                         os.remove(photo_url)
@@ -105,6 +155,10 @@ class FloodReportController:
                         pass
                 return False, "❌ Gagal menyimpan laporan ke database lokal."
             
+            match = matches[0] if matches else None
+            if match:
+                print(f"🔁 Report {report_id} is a near-duplicate of {match[0]} (similarity {match[1]:.2f})")
+            
             if self.sheets_model and self.sheets_model.client:
                 try:
                     print("📊 Saving to Google Sheets...")
@@ -137,12 +191,17 @@ class FloodReportController:
             today_reports = self.flood_model.get_today_reports()
             print(f"✅ Verification: Total reports today = {len(today_reports)}")
             
+            if match:
+                return True, "✅ Informasi anda telah terkirim! Laporan serupa di lokasi ini sudah kami terima, terimakasih atas laporannya."
             return True, f"✅ Informasi anda telah terkirim! Terimakasih atas laporannya."
                 
         except Exception as e:
             print(f"❌ CRITICAL Error in submit_report: {e}")
             traceback.print_exc()
             
+            if admitted:
+                self.rate_limiter.release(client_ip, reporter_phone)
+            
             if photo_url and os.path.exists(photo_url):
                 try:
                     os.remove(photo_url)
@@ -151,60 +210,131 @@ class FloodReportController:
             
             return False, f"❌ Error sistem: {str(e)}"
     
+    def update_report_status(self, report_id, status):
+        """Update a report's status (e.g. 'verified')"""
+        return self.flood_model.update_report_status(report_id, status)
+    
     # ============ FUNGSI UNTUK VIEWS ============
     
-    def get_today_reports(self):
-        """Get today's flood reports"""
-        return self.flood_model.get_today_reports()
+    def get_today_reports(self, as_frame=False):
+        """Get today's flood reports (FloodReport list or DataFrame)"""
+        return self.flood_model.get_today_reports(as_frame=as_frame)
+    
+    def get_month_reports(self, as_frame=False):
+        """Get this month's flood reports (FloodReport list or DataFrame)"""
+        return self.flood_model.get_month_reports(as_frame=as_frame)
+    
+    def get_all_reports(self, as_frame=False):
+        """Get all flood reports (FloodReport list or DataFrame)"""
+        return self.flood_model.get_all_reports(as_frame=as_frame)
+    
+    def search_reports(self, query, scope='all', limit=50):
+        """Full-text search on address / reporter name, best matches first"""
+        return self.flood_model.search_reports(query, scope=scope, limit=limit)
+    
+    def get_reports_page(self, scope='all', page_size=20, cursor=None, collapse_duplicates=True):
+        """Get one keyset-paginated page of reports ('today', 'month' or 'all')"""
+        return self.flood_model.get_reports_page(
+            scope=scope, page_size=page_size, cursor=cursor, collapse_duplicates=collapse_duplicates
+        )
+    
+    def get_reports_summary(self, scope='all', collapse_duplicates=True):
+        """Get counts for a report scope without loading the rows"""
+        return self.flood_model.get_reports_summary(scope=scope, collapse_duplicates=collapse_duplicates)
+    
+    # ============ EKSPOR ============
+    
+    def get_export_formats(self):
+        """Export formats available in this environment -> MIME type"""
+        return {
+            fmt: mime for fmt, (mime, _) in EXPORT_FORMATS.items()
+            if fmt != 'parquet' or parquet_available()
+        }
+    
+    def export_reports(self, output, fmt='csv', start_date=None, end_date=None):
+        """Stream reports (incl. archives) to a path or binary file; returns row count"""
+        return self.flood_model.export_reports(output, fmt, start_date, end_date)
     
-    def get_month_reports(self):
-        """Get this month's flood reports"""
-        return self.flood_model.get_month_reports()
+    # ============ CHANGE FEED (LIVE VIEW) ============
     
-    def get_all_reports(self):
-        """Get all flood reports"""
-        return self.flood_model.get_all_reports()
+    def new_report_feed(self, scope='today', max_size=1000):
+        """Session-held buffer for a live report list (newest first)"""
+        return {
+            'scope': scope,
+            'day': None,
+            'last_id': 0,
+            'reports': [],
+            'max_size': max_size,
+            'total': 0,
+            'locations': set(),
+            'reporters': set()
+        }
     
-    def get_monthly_statistics(self):
+    def poll_report_feed(self, feed, batch_size=500):
+        """
+        Fetch only reports newer than the feed's last id and merge them into
+        the buffer. The buffer resets when the WIB day changes. Returns the
+        number of new reports.
+        """
+        today = datetime.now(self.flood_model.tz_wib).strftime('%Y-%m-%d')
+        if feed['day'] != today:
+            feed.update(self.new_report_feed(feed['scope'], feed['max_size']))
+            feed['day'] = today
+        
+        new_reports = []
+        while True:
+            rows = self.flood_model.get_reports_since(
+                feed['last_id'], scope=feed['scope'], limit=batch_size, collapse_duplicates=True
+            )
+            if not rows:
+                break
+            new_reports.extend(rows)
+            feed['last_id'] = rows[-1].id
+            if len(rows) < batch_size:
+                break
+        
+        if new_reports:
+            # Ringkasan diperbarui secara inkremental, buffer dibatasi max_size
+            feed['total'] += len(new_reports)
+            feed['locations'].update(report.alamat for report in new_reports)
+            feed['reporters'].update(report.nama_pelapor for report in new_reports)
+            new_reports.reverse()
+            feed['reports'] = (new_reports + feed['reports'])[:feed['max_size']]
+        
+        return len(new_reports)
+    
+    def get_monthly_statistics(self, collapse_duplicates=True):
         """Get monthly statistics for reports"""
-        return self.flood_model.get_monthly_statistics()
+        return self.flood_model.get_monthly_statistics(collapse_duplicates=collapse_duplicates)
+    
+    def get_report_histogram(self, start, end, bucket='day', collapse_duplicates=True):
+        """Report counts per hour/day/week/month bucket in [start, end)"""
+        return self.flood_model.get_report_histogram(start, end, bucket=bucket, collapse_duplicates=collapse_duplicates)
+    
+    def get_month_to_date_range(self):
+        """[awal bulan ini, besok) dalam WIB, untuk tren harian bulan berjalan"""
+        now = datetime.now(self.flood_model.tz_wib)
+        return now.strftime('%Y-%m-01'), (now + timedelta(days=1)).strftime('%Y-%m-%d')
     
     def get_yearly_statistics(self):
         """Get yearly flood report statistics for the last 12 months"""
         try:
-            conn = sqlite3.connect('flood_system.db')
-            cursor = conn.cursor()
-            
-            current_date = datetime.now()
+            current_date = datetime.now(self.flood_model.tz_wib)
             current_year_month = current_date.strftime('%Y-%m')
             
-            months_data = []
-            for i in range(11, -1, -1):  
-                month_offset = i
-                target_date = current_date - timedelta(days=30*month_offset)
-                year_month = target_date.strftime('%Y-%m')
-                month_name = target_date.strftime('%b')  
-                
-                query = """
-                SELECT COUNT(*) as report_count
-                FROM flood_reports 
-                WHERE strftime('%Y-%m', report_date) = ?
-                """
-                
-                cursor.execute(query, (year_month,))
-                result = cursor.fetchone()
-                report_count = result[0] if result else 0
-                
-                is_current = (year_month == current_year_month)
-                
-                months_data.append({
-                    'year_month': year_month,
-                    'month_name': month_name,
-                    'report_count': report_count,
-                    'is_current': is_current
-                })
+            # 12 bulan kalender terakhir (termasuk bulan ini), satu query
+            first_index = current_date.year * 12 + current_date.month - 1 - 11
+            start = f"{first_index // 12:04d}-{first_index % 12 + 1:02d}-01"
+            end = month_date_range(current_year_month)[1]
+            
+            histogram = self.flood_model.get_report_histogram(start, end, bucket='month', collapse_duplicates=True)
             
-            conn.close()
+            months_data = [{
+                'year_month': year_month,
+                'month_name': datetime.strptime(year_month, '%Y-%m').strftime('%b'),
+                'report_count': int(count),
+                'is_current': year_month == current_year_month
+            } for year_month, count in zip(histogram['labels'], histogram['counts'])]
             
             total_reports = sum(item['report_count'] for item in months_data)
             avg_per_month = total_reports / len(months_data) if months_data else 0
@@ -238,17 +368,36 @@ class FloodReportController:
                 'current_year_month': ""
             }
     
+    def _get_request_headers(self):
+        """HTTP headers of the current session (st.context on newer Streamlit)"""
+        context = getattr(st, 'context', None)
+        if context is not None and getattr(context, 'headers', None) is not None:
+            return context.headers
+        try:
+            from streamlit.web.server.websocket_headers import _get_websocket_headers
+            return _get_websocket_headers() or {}
+        except Exception:
+            return {}
+    
     def get_client_ip(self):
-        """Get client IP address"""
+        """Get client IP address (proxy header), or a per-session id if unknown"""
         try:
-            if 'user_ip' not in st.session_state:
-                import random
-                st.session_state.user_ip = f"192.168.{random.randint(1, 255)}.{random.randint(1, 255)}"
+            headers = self._get_request_headers()
+            forwarded = [part.strip() for part in headers.get('X-Forwarded-For', '').split(',') if part.strip()]
+            if len(forwarded) >= TRUSTED_PROXY_HOPS:
+                ip = forwarded[-TRUSTED_PROXY_HOPS]
+            else:
+                ip = headers.get('X-Real-Ip', '').strip() or getattr(getattr(st, 'context', None), 'ip_address', None)
+            
+            if not ip:
+                # Tanpa proxy / header: satu id per sesi (batas No HP tetap berlaku)
+                if 'user_ip' not in st.session_state:
+                    st.session_state.user_ip = f"session-{uuid.uuid4().hex[:12]}"
+                ip = st.session_state.user_ip
             
-            ip = st.session_state.user_ip
             print(f"🖥️ Using IP: {ip}")
             return ip
             
         except Exception as e:
             print(f"⚠️ Error getting IP: {e}")
-            return "unknown_user"
\ No newline at end of file
+            return "unknown_user"
@@ -1,7 +1,5 @@
 import streamlit as st
 
-from model_ann import predict_flood_ann
-
 class RealTimeDataController:
     def __init__(self):
         pass
@@ -9,12 +7,26 @@ class RealTimeDataController:
     def get_comprehensive_data(self):
         """Ambil semua data real-time dan lakukan prediksi"""
         try:
-            return self.get_fallback_predictions()
+            return self.apply_gumbel_predictions(self.get_fallback_predictions())
             
         except Exception as e:
             st.error(f"Error getting comprehensive data: {str(e)}")
             return self.get_fallback_predictions()
     
+    def apply_gumbel_predictions(self, predictions):
+        """Isi gumbel_risk/status/message dari predict_flood_gumbel dengan parameter fit per lokasi"""
+        from gumbel_distribution import predict_flood_gumbel
+        
+        for pred in predictions:
+            result = predict_flood_gumbel(pred['rainfall_mm'], station=pred['location'])
+            if result['status'] == 'ERROR':
+                print(f"⚠️ Gumbel prediction failed for {pred['location']}: {result['message']}")
+                continue
+            pred['gumbel_risk'] = result['risk_level']
+            pred['gumbel_status'] = result['status']
+            pred['gumbel_message'] = result['message']
+        return predictions
+    
     def get_fallback_predictions(self):
         """Data fallback untuk prediksi - HAPUS cm"""
         return [
@@ -77,6 +89,75 @@ class RealTimeDataController:
         else:
             return "RENDAH", "green"
 
+    def get_prediction_uncertainty(self, predictions, n_samples=10000, humidity=70.0, temperature=28.0):
+        """
+        Pita ketidakpastian Monte Carlo (ANN versi aktif & Gumbel per stasiun)
+        untuk semua lokasi sekaligus. Data BBWS belum memuat kelembapan/suhu,
+        jadi dipakai nilai default halaman Simulasi.
+        """
+        try:
+            from uncertainty import propagate_ann_uncertainty, propagate_gumbel_uncertainty
+            
+            if not predictions:
+                return []
+            
+            rainfall = [p['rainfall_mm'] for p in predictions]
+            water_level = [p['water_level_mdpl'] for p in predictions]
+            
+            ann = propagate_ann_uncertainty(rainfall, water_level, humidity, temperature, n_samples=n_samples)
+            gumbel = propagate_gumbel_uncertainty(
+                rainfall, n_samples=n_samples, station=[p['location'] for p in predictions]
+            )
+            
+            if 'status' in ann or 'status' in gumbel:
+                print(f"⚠️ Uncertainty error: {ann.get('message', '')} {gumbel.get('message', '')}")
+                return []
+            
+            bands = []
+            for i in range(len(predictions)):
+                bands.append({
+                    'ann_p5': float(ann['risk_percentiles'][5][i]),
+                    'ann_p50': float(ann['risk_percentiles'][50][i]),
+                    'ann_p95': float(ann['risk_percentiles'][95][i]),
+                    'ann_status_probability': {k: float(v[i]) for k, v in ann['status_probability'].items()},
+                    'gumbel_p5': float(gumbel['risk_percentiles'][5][i]),
+                    'gumbel_p50': float(gumbel['risk_percentiles'][50][i]),
+                    'gumbel_p95': float(gumbel['risk_percentiles'][95][i]),
+                    'gumbel_status_probability': {k: float(v[i]) for k, v in gumbel['status_probability'].items()}
+                })
+            return bands
+            
+        except Exception as e:
+            print(f"⚠️ Error computing prediction uncertainty: {e}")
+            return []
+
+    def get_gumbel_bands(self, predictions, return_period=10):
+        """
+        Pita bootstrap (tersimpan) untuk mu, beta dan curah hujan rencana
+        per lokasi. Hanya lookup; perhitungan dilakukan oleh gumbel_bootstrap.py.
+        """
+        try:
+            from gumbel_bootstrap import get_bootstrap_bands
+            
+            bands = []
+            for pred in predictions or []:
+                entry = get_bootstrap_bands(pred['location'])
+                if entry is None:
+                    bands.append(None)
+                    continue
+                bands.append({
+                    'confidence': entry['confidence'],
+                    'mu': entry['mu'],
+                    'beta': entry['beta'],
+                    'return_period': return_period,
+                    'return_level': entry['return_levels'].get(str(return_period))
+                })
+            return bands
+            
+        except Exception as e:
+            print(f"⚠️ Error loading Gumbel bootstrap bands: {e}")
+            return []
+
     def is_same_location(self, loc1, loc2):
         """Check jika dua lokasi sama (simple matching)"""
         return True
\ No newline at end of file
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Ekspor laporan banjir untuk mitra BPBD (CLI untuk models/ReportExporter).
+
+Membaca flood_reports beserta arsip tahunan per chunk dan menulis CSV,
+Parquet (butuh pyarrow) atau GeoJSON secara bertahap; memori konstan
+berapa pun jumlah laporan. Format diambil dari ekstensi file jika
+--format tidak diberikan.
+
+    python export_reports.py output.csv [--format csv|parquet|geojson]
+                             [--start YYYY-MM-DD] [--end YYYY-MM-DD]
+                             [--db flood_system.db]
+"""
+
+import os
+import sys
+
+from models.ReportExporter import ReportExporter, EXPORT_FORMATS
+
+def _option(args, name, default=None):
+    if name in args:
+        i = args.index(name)
+        value = args[i + 1]
+        del args[i:i + 2]
+        return value
+    return default
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    fmt = _option(args, '--format')
+    start_date = _option(args, '--start')
+    end_date = _option(args, '--end')
+    db_path = _option(args, '--db', 'flood_system.db')
+
+    if not args:
+        print(__doc__)
+        sys.exit(1)
+
+    output = args[0]
+    if fmt is None:
+        fmt = os.path.splitext(output)[1].lstrip('.').lower() or 'csv'
+    if fmt not in EXPORT_FORMATS:
+        print(f"❌ Format tidak dikenal: {fmt} (pilih: {', '.join(EXPORT_FORMATS)})")
+        sys.exit(1)
+
+    total = ReportExporter(db_path).export(output, fmt, start_date, end_date)
+    print(f"📦 {total} laporan -> {output}")
@@ -0,0 +1,200 @@
+"""
+Interval kepercayaan bootstrap untuk parameter Gumbel dan curah hujan rencana.
+
+Setiap stasiun dikerjakan di ProcessPoolExecutor; di dalam worker semua
+resample dibuat sekaligus sebagai matriks (resample, tahun) lalu di-fit
+dengan fungsi tervektorisasi dari gumbel_fitting. Hasilnya disimpan di
+tabel gumbel_bootstrap (kunci stasiun + hash data) sehingga dashboard hanya
+membaca pita yang sudah jadi.
+
+    python gumbel_bootstrap.py [db_path] [n_resamples]
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+from gumbel_fitting import (
+    DEFAULT_DB_PATH,
+    MIN_YEARS,
+    PARAMETER_CHECK_INTERVAL,
+    _db_signature,
+    fit_gumbel_mle,
+    fit_gumbel_mom,
+    init_gumbel_tables
+)
+from gumbel_distribution import gumbel_return_levels, RETURN_PERIODS
+
+DEFAULT_RESAMPLES = 2000
+DEFAULT_CONFIDENCE = 0.90
+
+_bands_cache = {}
+_cache_lock = threading.Lock()
+
+def init_bootstrap_table(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS gumbel_bootstrap (
+            station TEXT NOT NULL,
+            method TEXT NOT NULL,
+            data_hash TEXT,
+            n_resamples INTEGER,
+            confidence REAL,
+            bands TEXT,
+            computed_at TEXT,
+            PRIMARY KEY (station, method)
+        )
+    ''')
+    conn.commit()
+
+def bootstrap_station(maxima, n_resamples=DEFAULT_RESAMPLES, confidence=DEFAULT_CONFIDENCE,
+                    method='mle', seed=None, return_periods=RETURN_PERIODS):
+    """
+    Bootstrap satu stasiun: resample maksimum tahunan dengan pengembalian,
+    fit ulang semua resample sekaligus, lalu ambil persentil.
+    """
+    maxima = np.asarray(maxima, dtype=float)
+    rng = np.random.default_rng(seed)
+
+    samples = maxima[rng.integers(0, len(maxima), size=(n_resamples, len(maxima)))]
+    mask = np.ones(samples.shape, dtype=bool)
+    fit = fit_gumbel_mle if method == 'mle' else fit_gumbel_mom
+    mu, beta = fit(samples, mask)
+    levels = gumbel_return_levels(mu, beta, return_periods)
+
+    alpha = (1.0 - confidence) / 2.0
+    quantiles = [alpha * 100, 50.0, (1.0 - alpha) * 100]
+    mu_q = np.percentile(mu, quantiles)
+    beta_q = np.percentile(beta, quantiles)
+    level_q = np.percentile(levels, quantiles, axis=0)
+
+    return {
+        'mu': {'lower': float(mu_q[0]), 'median': float(mu_q[1]), 'upper': float(mu_q[2])},
+        'beta': {'lower': float(beta_q[0]), 'median': float(beta_q[1]), 'upper': float(beta_q[2])},
+        'return_levels': {
+            str(period): {
+                'lower': float(level_q[0, j]),
+                'median': float(level_q[1, j]),
+                'upper': float(level_q[2, j])
+            }
+            for j, period in enumerate(return_periods)
+        }
+    }
+
+def _bootstrap_task(args):
+    station, maxima, n_resamples, confidence, method, seed = args
+    return station, bootstrap_station(maxima, n_resamples, confidence, method, seed)
+
+def run_bootstrap(db_path=DEFAULT_DB_PATH, stations=None, n_resamples=DEFAULT_RESAMPLES,
+                confidence=DEFAULT_CONFIDENCE, method='mle', max_workers=None, force=False, seed=0):
+    """
+    Hitung interval bootstrap untuk stasiun yang fit-nya berubah sejak
+    bootstrap terakhir (dibandingkan lewat data_hash), paralel per stasiun.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        init_gumbel_tables(conn)
+        init_bootstrap_table(conn)
+
+        fitted_hash = dict(conn.execute('SELECT station, data_hash FROM gumbel_parameters').fetchall())
+        done = {
+            row[0]: row[1:]
+            for row in conn.execute('SELECT station, data_hash, n_resamples, confidence FROM gumbel_bootstrap WHERE method = ?', (method,))
+        }
+
+        series = {}
+        for station, value in conn.execute('SELECT station, max_rainfall FROM rainfall_annual_maxima ORDER BY station, year'):
+            if station in fitted_hash and (stations is None or station in stations):
+                series.setdefault(station, []).append(value)
+
+        tasks = []
+        for i, (station, maxima) in enumerate(sorted(series.items())):
+            if len(maxima) < MIN_YEARS:
+                continue
+            if not force and done.get(station) == (fitted_hash[station], n_resamples, confidence):
+                continue
+            tasks.append((station, maxima, n_resamples, confidence, method, seed + i))
+
+        if not tasks:
+            print("ℹ️ Bootstrap intervals up to date")
+            return []
+
+        print(f"🔄 Bootstrapping {len(tasks)} stations x {n_resamples} resamples...")
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(_bootstrap_task, tasks))
+
+        computed_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        conn.executemany('''
+            INSERT OR REPLACE INTO gumbel_bootstrap
+            (station, method, data_hash, n_resamples, confidence, bands, computed_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', [
+            (station, method, fitted_hash[station], n_resamples, confidence, json.dumps(bands), computed_at)
+            for station, bands in results
+        ])
+        conn.commit()
+        print(f"✅ Bootstrap intervals stored for {len(results)} stations")
+
+        clear_bands_cache()
+        return [station for station, _ in results]
+    finally:
+        conn.close()
+
+def _load_bands(db_path, method):
+    bands = {}
+    if os.path.exists(db_path):
+        try:
+            conn = sqlite3.connect(db_path)
+            try:
+                for row in conn.execute('SELECT station, bands, confidence, n_resamples FROM gumbel_bootstrap WHERE method = ?', (method,)):
+                    entry = json.loads(row[1])
+                    entry['confidence'] = row[2]
+                    entry['n_resamples'] = row[3]
+                    bands[row[0]] = entry
+            finally:
+                conn.close()
+        except sqlite3.OperationalError:
+            pass
+    return bands
+
+def get_bootstrap_bands(station, method='mle', db_path=DEFAULT_DB_PATH):
+    """
+    Pita kepercayaan tersimpan untuk stasiun (None jika belum dihitung).
+    Cache per (db_path, method) memakai aturan yang sama dengan tabel
+    parameter di gumbel_fitting: dicek paling sering sekali per
+    PARAMETER_CHECK_INTERVAL detik dan dibaca ulang jika database berubah,
+    jadi hasil run dari terminal muncul tanpa restart.
+    """
+    key = (db_path, method)
+    now = time.monotonic()
+    cached = _bands_cache.get(key)
+    if cached is not None and now - cached[1] < PARAMETER_CHECK_INTERVAL:
+        return cached[2].get(station)
+
+    with _cache_lock:
+        cached = _bands_cache.get(key)
+        if cached is not None and now - cached[1] < PARAMETER_CHECK_INTERVAL:
+            return cached[2].get(station)
+
+        signature = _db_signature(db_path)
+        if cached is not None and cached[0] == signature:
+            bands = cached[2]
+        else:
+            bands = _load_bands(db_path, method)
+        _bands_cache[key] = (signature, now, bands)
+    return bands.get(station)
+
+def clear_bands_cache():
+    with _cache_lock:
+        _bands_cache.clear()
+
+if __name__ == "__main__":
+    target = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_DB_PATH
+    resamples = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_RESAMPLES
+    run_bootstrap(target, n_resamples=resamples)
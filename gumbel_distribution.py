@@ -1,36 +1,37 @@
 import numpy as np
-import math
 
-def predict_flood_gumbel(rainfall, return_period=10):
+from gumbel_fitting import get_station_parameters, get_return_level
+
+def predict_flood_gumbel(rainfall, return_period=10, station=None):
     """
-    Prediksi menggunakan distribusi Gumbel untuk extreme value analysis
+    Prediksi menggunakan distribusi Gumbel untuk extreme value analysis.
+    Parameter mu/beta diambil dari hasil fit per stasiun (gumbel_fitting),
+    atau nilai default jika stasiun belum di-fit.
     """
     try:
-        mu = 85.0   
-        beta = 22.5 
-        
-        z = (rainfall - mu) / beta
-        probability = math.exp(-math.exp(-z))
+        mu, beta, parameter_source = get_station_parameters(station)
         
-        risk_level = min(1.0, probability * 1.5)
+        result = predict_flood_gumbel_batch(rainfall, mu=mu, beta=beta)
+        probability = float(result['probability'])
         
-        if risk_level >= 0.7:
-            status = "TINGGI"
-        elif risk_level >= 0.4:
-            status = "MENENGAH"
-        else:
-            status = "RENDAH"
+        return_level = get_return_level(station, return_period)
+        estimated_return_period = float(gumbel_exceedance_batch(rainfall, mu=mu, beta=beta)['return_period'])
         
         return {
-            'risk_level': round(risk_level, 3),
-            'probability': round(probability, 4),
+            'risk_level': float(result['risk_level']),
+            'probability': probability,
             'parameters_used': {
                 'mu_location': mu,
                 'beta_scale': beta,
-                'return_period': return_period
+                'return_period': return_period,
+                'station': station,
+                'source': parameter_source,
+                'return_level': round(return_level, 2)
             },
+            'return_period_estimate': round(estimated_return_period, 2),
+            'exceeds_return_level': rainfall >= return_level,
             'message': f'Distribusi Gumbel: Prob {probability:.1%}',
-            'status': status
+            'status': str(result['status'])
         }
         
     except Exception as e:
@@ -40,12 +41,68 @@ def predict_flood_gumbel(rainfall, return_period=10):
             'message': f'Error: {str(e)}',
             'status': 'ERROR'
         }
-def get_gumbel_parameters():
+
+GUMBEL_STATUS_LABELS = np.array(["RENDAH", "MENENGAH", "TINGGI"], dtype=object)
+
+def predict_flood_gumbel_batch(rainfall, mu=85.0, beta=22.5):
+    """
+    Versi batch dari predict_flood_gumbel untuk array curah hujan
+    (bentuk array bebas). Ambang status sama dengan versi skalar.
+    """
+    rainfall = np.asarray(rainfall, dtype=float)
+    
+    z = (rainfall - mu) / beta
+    probability = np.exp(-np.exp(-z))
+    risk_level = np.minimum(1.0, probability * 1.5)
+    
+    status_code = (risk_level >= 0.4).astype(np.int8) + (risk_level >= 0.7).astype(np.int8)
+    
+    return {
+        'risk_level': np.round(risk_level, 3),
+        'probability': np.round(probability, 4),
+        'status_code': status_code,
+        'status': GUMBEL_STATUS_LABELS[status_code]
+    }
+
+RETURN_PERIODS = (2, 5, 10, 25, 50, 100)
+
+def gumbel_exceedance_batch(rainfall, mu=85.0, beta=22.5):
+    """
+    CDF, peluang terlampaui, dan periode ulang (tahun) untuk array curah
+    hujan. mu/beta boleh array yang bisa di-broadcast (mis. per stasiun).
+    """
+    rainfall = np.asarray(rainfall, dtype=float)
+    
+    z = (rainfall - mu) / beta
+    cdf = np.exp(-np.exp(-z))
+    exceedance = -np.expm1(-np.exp(-z))
+    
+    with np.errstate(divide='ignore'):
+        return_period = np.where(exceedance > 0, 1.0 / exceedance, np.inf)
+    
+    return {
+        'cdf': cdf,
+        'exceedance_probability': exceedance,
+        'return_period': return_period
+    }
+
+def gumbel_return_levels(mu, beta, return_periods=RETURN_PERIODS):
+    """
+    Curah hujan rencana x_T = mu - beta * ln(-ln(1 - 1/T)).
+    Hasil berbentuk (len(mu), len(return_periods)).
+    """
+    mu = np.atleast_1d(np.asarray(mu, dtype=float))[:, np.newaxis]
+    beta = np.atleast_1d(np.asarray(beta, dtype=float))[:, np.newaxis]
+    periods = np.asarray(return_periods, dtype=float)[np.newaxis, :]
+    return mu - beta * np.log(-np.log1p(-1.0 / periods))
+
+def get_gumbel_parameters(station=None):
     """Return parameter Gumbel untuk display di technical details"""
+    mu, beta, parameter_source = get_station_parameters(station)
     return {
-        'mu_location': 85.0,
-        'beta_scale': 22.5,
+        'mu_location': mu,
+        'beta_scale': beta,
         'distribution_type': 'Gumbel Type I (Extreme Value Type I)',
-        'data_source': 'BMKG Historical Data 10 years',
+        'data_source': 'BMKG Historical Data 10 years' if parameter_source == 'default' else parameter_source,
         'application': 'Extreme flood prediction'
     }
\ No newline at end of file
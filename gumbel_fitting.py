@@ -0,0 +1,391 @@
+"""
+Fitting parameter Gumbel (mu, beta) per stasiun dari data curah hujan historis.
+
+Alur:
+1. Seri curah hujan panjang (CSV atau SQLite) dibaca per chunk dan hanya
+   maksimum tahunan per stasiun yang disimpan (tabel rainfall_annual_maxima).
+2. mu dan beta di-fit per stasiun dengan metode momen dan MLE, tervektorisasi
+   untuk semua stasiun sekaligus.
+3. Hasil fit disimpan di tabel gumbel_parameters, dengan kunci stasiun +
+   hash maksimum tahunan. Stasiun yang datanya tidak berubah tidak di-fit ulang,
+   jadi data tahun baru cukup di-ingest lalu hanya stasiun terkait yang di-refit.
+
+Prediksi hanya melakukan lookup ke cache parameter (lihat get_station_parameters).
+Cache dibaca ulang jika file database (termasuk -wal) berubah, dicek paling
+sering sekali per PARAMETER_CHECK_INTERVAL detik.
+
+    python gumbel_fitting.py hujan.csv
+"""
+
+import hashlib
+import os
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+DEFAULT_DB_PATH = 'flood_system.db'
+DEFAULT_MU = 85.0
+DEFAULT_BETA = 22.5
+EULER_GAMMA = 0.5772156649015329
+MIN_YEARS = 2
+PARAMETER_CHECK_INTERVAL = 5.0
+
+# db_path -> (signature file, waktu cek terakhir, tabel parameter)
+_parameter_cache = {}
+_return_level_cache = {}
+_cache_lock = threading.Lock()
+_missing_reported = set()
+
+def init_gumbel_tables(conn):
+    """Buat tabel maksimum tahunan dan cache parameter jika belum ada"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS rainfall_annual_maxima (
+            station TEXT NOT NULL,
+            year INTEGER NOT NULL,
+            max_rainfall REAL NOT NULL,
+            PRIMARY KEY (station, year)
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS gumbel_parameters (
+            station TEXT PRIMARY KEY,
+            mu_mom REAL,
+            beta_mom REAL,
+            mu_mle REAL,
+            beta_mle REAL,
+            n_years INTEGER,
+            data_hash TEXT,
+            fitted_at TEXT
+        )
+    ''')
+    conn.commit()
+
+# ============ STREAMING MAKSIMUM TAHUNAN ============
+
+def _chunk_annual_maxima(chunk, station_col, date_col, value_col):
+    """Maksimum per (stasiun, tahun) dari satu chunk DataFrame"""
+    import pandas as pd
+
+    years = pd.to_datetime(chunk[date_col], errors='coerce').dt.year
+    values = pd.to_numeric(chunk[value_col], errors='coerce')
+    frame = pd.DataFrame({'station': chunk[station_col].astype(str), 'year': years, 'value': values}).dropna()
+    grouped = frame.groupby(['station', 'year'], sort=False)['value'].max()
+    return grouped
+
+def _merge_maxima(maxima, grouped):
+    for (station, year), value in grouped.items():
+        key = (station, int(year))
+        if value > maxima.get(key, -np.inf):
+            maxima[key] = float(value)
+
+def stream_annual_maxima_csv(csv_path, station_col='station', date_col='date',
+                            value_col='rainfall', chunksize=200000):
+    """Baca CSV per chunk dan kembalikan {(stasiun, tahun): maksimum}"""
+    import pandas as pd
+
+    maxima = {}
+    for chunk in pd.read_csv(csv_path, usecols=[station_col, date_col, value_col], chunksize=chunksize):
+        _merge_maxima(maxima, _chunk_annual_maxima(chunk, station_col, date_col, value_col))
+    return maxima
+
+def stream_annual_maxima_sqlite(source_db, table='rainfall', station_col='station',
+                                date_col='date', value_col='rainfall', chunksize=200000):
+    """Baca tabel curah hujan SQLite dengan fetchmany dan kembalikan {(stasiun, tahun): maksimum}"""
+    import pandas as pd
+
+    maxima = {}
+    conn = sqlite3.connect(source_db)
+    try:
+        cursor = conn.execute(f'SELECT "{station_col}", "{date_col}", "{value_col}" FROM "{table}"')
+        while True:
+            rows = cursor.fetchmany(chunksize)
+            if not rows:
+                break
+            chunk = pd.DataFrame(rows, columns=[station_col, date_col, value_col])
+            _merge_maxima(maxima, _chunk_annual_maxima(chunk, station_col, date_col, value_col))
+    finally:
+        conn.close()
+    return maxima
+
+def store_annual_maxima(maxima, db_path=DEFAULT_DB_PATH):
+    """Upsert maksimum tahunan; kembalikan stasiun yang datanya berubah"""
+    conn = sqlite3.connect(db_path)
+    try:
+        init_gumbel_tables(conn)
+        before = conn.total_changes
+        changed = set()
+        for (station, year), value in maxima.items():
+            cursor = conn.execute('''
+                INSERT INTO rainfall_annual_maxima (station, year, max_rainfall)
+                VALUES (?, ?, ?)
+                ON CONFLICT(station, year) DO UPDATE SET max_rainfall = excluded.max_rainfall
+                WHERE excluded.max_rainfall > rainfall_annual_maxima.max_rainfall
+            ''', (station, year, value))
+            if cursor.rowcount:
+                changed.add(station)
+        conn.commit()
+        print(f"✅ Annual maxima stored: {conn.total_changes - before} rows changed, {len(changed)} stations")
+        return changed
+    finally:
+        conn.close()
+
+# ============ FITTING TERVEKTORISASI ============
+
+def _pad_series(series_list):
+    """List array berbeda panjang -> matriks (stasiun, tahun) + mask valid"""
+    n_max = max(len(s) for s in series_list)
+    values = np.zeros((len(series_list), n_max))
+    mask = np.zeros((len(series_list), n_max), dtype=bool)
+    for i, s in enumerate(series_list):
+        values[i, :len(s)] = s
+        mask[i, :len(s)] = True
+    return values, mask
+
+def fit_gumbel_mom(values, mask):
+    """Metode momen: beta = s*sqrt(6)/pi, mu = mean - gamma*beta (per baris)"""
+    n = mask.sum(axis=1)
+    mean = np.where(mask, values, 0.0).sum(axis=1) / n
+    var = np.where(mask, (values - mean[:, None]) ** 2, 0.0).sum(axis=1) / np.maximum(n - 1, 1)
+    beta = np.sqrt(var) * np.sqrt(6.0) / np.pi
+    mu = mean - EULER_GAMMA * beta
+    return mu, beta
+
+def fit_gumbel_mle(values, mask, iterations=50, tol=1e-10):
+    """
+    MLE dengan iterasi Newton pada persamaan beta:
+        beta = mean(x) - sum(x*e^(-x/beta)) / sum(e^(-x/beta))
+    lalu mu = -beta * log(mean(e^(-x/beta))). Semua stasiun diproses bersamaan.
+    """
+    n = mask.sum(axis=1)
+    mean = np.where(mask, values, 0.0).sum(axis=1) / n
+    x_min = np.where(mask, values, np.inf).min(axis=1)
+    shifted = np.where(mask, values - x_min[:, None], 0.0)
+
+    _, beta = fit_gumbel_mom(values, mask)
+    beta = np.maximum(beta, 1e-6)
+
+    for _ in range(iterations):
+        w = np.where(mask, np.exp(-shifted / beta[:, None]), 0.0)
+        sw = w.sum(axis=1)
+        ex = (w * shifted).sum(axis=1) / sw
+        ex2 = (w * shifted ** 2).sum(axis=1) / sw
+
+        f = beta - (mean - x_min) + ex
+        df = 1.0 + (ex2 - ex ** 2) / beta ** 2
+        step = f / df
+        beta = np.maximum(beta - step, 1e-6)
+        if np.all(np.abs(step) < tol):
+            break
+
+    w = np.where(mask, np.exp(-shifted / beta[:, None]), 0.0)
+    mu = x_min - beta * np.log(w.sum(axis=1) / n)
+    return mu, beta
+
+def _data_hash(years, values):
+    digest = hashlib.sha1()
+    digest.update(np.asarray(years, dtype=np.int64).tobytes())
+    digest.update(np.asarray(values, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+def refit_stations(db_path=DEFAULT_DB_PATH, stations=None, force=False):
+    """
+    Fit ulang stasiun yang maksimum tahunannya berubah (hash berbeda).
+    stations=None berarti cek semua stasiun.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        init_gumbel_tables(conn)
+
+        rows = conn.execute('SELECT station, year, max_rainfall FROM rainfall_annual_maxima ORDER BY station, year').fetchall()
+        existing = dict(conn.execute('SELECT station, data_hash FROM gumbel_parameters').fetchall())
+
+        series = {}
+        for station, year, value in rows:
+            if stations is None or station in stations:
+                series.setdefault(station, ([], []))
+                series[station][0].append(year)
+                series[station][1].append(value)
+
+        to_fit = []
+        for station, (years, values) in series.items():
+            if len(values) < MIN_YEARS:
+                continue
+            data_hash = _data_hash(years, values)
+            if force or existing.get(station) != data_hash:
+                to_fit.append((station, values, data_hash))
+
+        if not to_fit:
+            print("ℹ️ Gumbel parameters up to date")
+            return []
+
+        values, mask = _pad_series([np.asarray(v, dtype=float) for _, v, _ in to_fit])
+        mu_mom, beta_mom = fit_gumbel_mom(values, mask)
+        mu_mle, beta_mle = fit_gumbel_mle(values, mask)
+        fitted_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        conn.executemany('''
+            INSERT OR REPLACE INTO gumbel_parameters
+            (station, mu_mom, beta_mom, mu_mle, beta_mle, n_years, data_hash, fitted_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [
+            (station, float(mu_mom[i]), float(beta_mom[i]), float(mu_mle[i]), float(beta_mle[i]),
+            len(v), data_hash, fitted_at)
+            for i, (station, v, data_hash) in enumerate(to_fit)
+        ])
+        conn.commit()
+        print(f"✅ Gumbel parameters fitted for {len(to_fit)} stations")
+
+        clear_parameter_cache()
+        return [station for station, _, _ in to_fit]
+    finally:
+        conn.close()
+
+def ingest_and_fit_csv(csv_path, db_path=DEFAULT_DB_PATH, **csv_kwargs):
+    """Ingest CSV curah hujan lalu refit hanya stasiun yang berubah"""
+    changed = store_annual_maxima(stream_annual_maxima_csv(csv_path, **csv_kwargs), db_path)
+    return refit_stations(db_path, stations=changed)
+
+def ingest_and_fit_sqlite(source_db, db_path=DEFAULT_DB_PATH, **table_kwargs):
+    """Ingest tabel curah hujan SQLite lalu refit hanya stasiun yang berubah"""
+    changed = store_annual_maxima(stream_annual_maxima_sqlite(source_db, **table_kwargs), db_path)
+    return refit_stations(db_path, stations=changed)
+
+# ============ LOOKUP UNTUK PREDIKSI ============
+
+def _load_parameter_table(db_path):
+    table = {}
+    try:
+        conn = sqlite3.connect(db_path)
+        try:
+            for row in conn.execute('SELECT station, mu_mom, beta_mom, mu_mle, beta_mle, n_years, fitted_at FROM gumbel_parameters'):
+                table[row[0]] = {
+                    'mom': (row[1], row[2]),
+                    'mle': (row[3], row[4]),
+                    'n_years': row[5],
+                    'fitted_at': row[6]
+                }
+        finally:
+            conn.close()
+    except sqlite3.OperationalError:
+        if db_path not in _missing_reported:
+            _missing_reported.add(db_path)
+            print("ℹ️ No fitted Gumbel parameters yet, using defaults")
+    except Exception as e:
+        print(f"⚠️ Cannot load Gumbel parameters: {e}")
+    return table
+
+def _db_signature(db_path):
+    """(mtime, ukuran) file database dan WAL-nya; berubah setiap ada commit"""
+    signature = []
+    for path in (db_path, db_path + '-wal'):
+        try:
+            stat = os.stat(path)
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            signature.append(None)
+    return tuple(signature)
+
+def _get_parameter_table(db_path):
+    """
+    Tabel parameter hasil fit, di-cache per db_path. Dicek ulang paling
+    sering sekali per PARAMETER_CHECK_INTERVAL detik dan dibaca ulang jika
+    file database berubah. Tabel kosong (belum ada fit atau database belum
+    ada) di-cache dengan aturan yang sama, jadi stasiun tanpa fit tidak
+    membuka SQLite di setiap prediksi.
+    """
+    now = time.monotonic()
+    cached = _parameter_cache.get(db_path)
+    if cached is not None and now - cached[1] < PARAMETER_CHECK_INTERVAL:
+        return cached[2]
+
+    with _cache_lock:
+        cached = _parameter_cache.get(db_path)
+        if cached is not None and now - cached[1] < PARAMETER_CHECK_INTERVAL:
+            return cached[2]
+
+        signature = _db_signature(db_path)
+        if cached is not None and cached[0] == signature:
+            _parameter_cache[db_path] = (signature, now, cached[2])
+            return cached[2]
+
+        table = _load_parameter_table(db_path)
+        for key in [key for key in _return_level_cache if key[0] == db_path]:
+            del _return_level_cache[key]
+        _parameter_cache[db_path] = (signature, now, table)
+        return table
+
+def get_station_parameters(station=None, method='mle', db_path=DEFAULT_DB_PATH):
+    """
+    (mu, beta, sumber) untuk stasiun; tabel parameter di-cache (lihat _get_parameter_table).
+    Jatuh ke nilai default jika stasiun belum pernah di-fit.
+    """
+    if station is None:
+        return DEFAULT_MU, DEFAULT_BETA, 'default'
+
+    fitted = _get_parameter_table(db_path).get(station)
+    if fitted is None:
+        return DEFAULT_MU, DEFAULT_BETA, 'default'
+
+    mu, beta = fitted[method]
+    return mu, beta, f"{method.upper()} ({fitted['n_years']} tahun)"
+
+def build_return_level_table(method='mle', db_path=DEFAULT_DB_PATH, include_fitted=True):
+    """
+    Tabel curah hujan rencana {stasiun: {T: x_T}} untuk T = 2..100 tahun,
+    dihitung sekaligus untuk semua stasiun. Kunci None = parameter default.
+    """
+    from gumbel_distribution import gumbel_return_levels, RETURN_PERIODS
+
+    table = _get_parameter_table(db_path) if include_fitted else {}
+    stations = [None] + list(table.keys())
+    params = [(DEFAULT_MU, DEFAULT_BETA)] + [table[s][method] for s in stations[1:]]
+    levels = gumbel_return_levels([p[0] for p in params], [p[1] for p in params], RETURN_PERIODS)
+
+    return {
+        station: {period: float(levels[i, j]) for j, period in enumerate(RETURN_PERIODS)}
+        for i, station in enumerate(stations)
+    }
+
+def get_return_level(station=None, return_period=10, method='mle', db_path=DEFAULT_DB_PATH):
+    """Lookup O(1) ambang curah hujan periode ulang T untuk stasiun"""
+    include_fitted = station is not None
+    key = (db_path, method, include_fitted)
+    if include_fitted:
+        # Tabel parameter yang berubah ikut membuang cache ambang db_path ini
+        _get_parameter_table(db_path)
+    levels = _return_level_cache.get(key)
+    if levels is None:
+        levels = build_return_level_table(method, db_path, include_fitted=include_fitted)
+        with _cache_lock:
+            _return_level_cache[key] = levels
+
+    station_levels = levels.get(station, levels[None])
+    level = station_levels.get(return_period)
+    if level is None:
+        # Periode ulang di luar tabel standar dihitung langsung
+        from gumbel_distribution import gumbel_return_levels
+        mu, beta, _ = get_station_parameters(station, method, db_path)
+        level = float(gumbel_return_levels(mu, beta, (return_period,))[0, 0])
+    return level
+
+def clear_parameter_cache():
+    """Paksa tabel parameter dibaca ulang pada lookup berikutnya"""
+    with _cache_lock:
+        _parameter_cache.clear()
+        _return_level_cache.clear()
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python gumbel_fitting.py <hujan.csv | sumber.db> [db_path]")
+        sys.exit(1)
+
+    source = sys.argv[1]
+    target = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_DB_PATH
+    if source.endswith('.db') or source.endswith('.sqlite'):
+        ingest_and_fit_sqlite(source, target)
+    else:
+        ingest_and_fit_csv(source, target)
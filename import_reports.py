@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Impor massal laporan banjir dari CSV (data lapangan offline tim BPBD atau
+ekspor worksheet Google Sheets 'flood_reports').
+
+Header CSV memakai kolom format Google Sheets (Timestamp, Alamat, Tinggi
+Banjir, Nama Pelapor, No HP, IP Address, Photo URL, Status) atau nama
+argumen create_report (alamat, tinggi_banjir, ...). File dibaca bertahap
+dan setiap chunk disimpan dalam satu transaksi lewat antrean penulis,
+sehingga laporan dari dashboard tetap bisa masuk selama impor berjalan.
+
+    python import_reports.py laporan.csv [db_path] [--chunk-size N]
+"""
+
+import csv
+import sys
+import time
+
+from models.FloodReportModel import FloodReportModel
+
+def import_csv(csv_path, db_path='flood_system.db', chunk_size=10000):
+    """Stream baris CSV ke FloodReportModel.create_reports_bulk"""
+    model = FloodReportModel(db_path)
+
+    start = time.perf_counter()
+    with open(csv_path, newline='', encoding='utf-8-sig') as f:
+        result = model.create_reports_bulk(csv.DictReader(f), chunk_size=chunk_size)
+    elapsed = time.perf_counter() - start
+
+    rate = result['inserted'] / elapsed if elapsed > 0 else 0
+    print(f"📊 {result['inserted']} laporan diimpor dalam {elapsed:.2f} detik ({rate:,.0f} baris/detik)")
+    if result['rejected']:
+        print(f"⚠️ {result['rejected']} baris ditolak (kolom wajib kosong / Timestamp tidak valid)")
+    return result
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    chunk_size = 10000
+    if '--chunk-size' in args:
+        i = args.index('--chunk-size')
+        chunk_size = int(args[i + 1])
+        del args[i:i + 2]
+
+    if not args:
+        print(__doc__)
+        sys.exit(1)
+
+    import_csv(args[0], args[1] if len(args) > 1 else 'flood_system.db', chunk_size)
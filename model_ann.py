@@ -69,15 +69,108 @@ def predict_flood_ann(rainfall, water_level, humidity, temperature):
             'message': f'Error dalam prediksi ANN: {str(e)}'
         }
 
+ANN_STATUS_LABELS = np.array(["RENDAH", "MENENGAH", "TINGGI"], dtype=object)
+ANN_STATUS_MESSAGES = np.array([
+    "Aman, tetap waspada",
+    "Siaga! Pantau terus perkembangan",
+    "Waspada! Kondisi kritis - potensi banjir tinggi"
+], dtype=object)
+ANN_FEATURE_COLUMNS = ['rainfall', 'water_level', 'humidity', 'temperature']
+
+def batch_input_shape(*values):
+    """Bentuk hasil batch untuk input ini; dipakai juga saat input tidak valid"""
+    try:
+        return np.broadcast(*(np.atleast_1d(np.asarray(v)) for v in values)).shape
+    except Exception:
+        return (max((len(v) for v in values if hasattr(v, '__len__')), default=0),)
+
+def batch_error(shape, message):
+    """
+    Hasil batch saat prediksi gagal: array sepanjang input (risk NaN,
+    status_code -1, status 'ERROR') agar pemanggil tetap bisa zip per indeks.
+    Kunci 'error' menandai kegagalan.
+    """
+    return {
+        'risk_level': np.full(shape, np.nan),
+        'status_code': np.full(shape, -1, dtype=np.int8),
+        'status': np.full(shape, 'ERROR', dtype=object),
+        'message': np.full(shape, message, dtype=object),
+        'error': message
+    }
+
+def predict_flood_ann_batch(rainfall=None, water_level=None, humidity=None, temperature=None, data=None):
+    """
+    Versi batch dari predict_flood_ann untuk banyak baris sekaligus.
+    Input berupa array (atau DataFrame lewat `data` dengan kolom
+    rainfall/water_level/humidity/temperature). Hasil identik dengan
+    memanggil predict_flood_ann per baris.
+    """
+    try:
+        if data is not None:
+            rainfall, water_level, humidity, temperature = (
+                np.asarray(data[col], dtype=float) for col in ANN_FEATURE_COLUMNS
+            )
+        
+        rainfall, water_level, humidity, temperature = np.broadcast_arrays(
+            np.atleast_1d(np.asarray(rainfall, dtype=float)),
+            np.atleast_1d(np.asarray(water_level, dtype=float)),
+            np.atleast_1d(np.asarray(humidity, dtype=float)),
+            np.atleast_1d(np.asarray(temperature, dtype=float))
+        )
+        
+        features = np.stack([rainfall, water_level, humidity, temperature], axis=-1)
+        
+        weights = np.array([0.50, 0.25, 0.15, 0.10])
+        normalization_factors = np.array([300.0, 150.0, 100.0, 35.0])
+        
+        weighted_sum = np.sum((features / normalization_factors) * weights, axis=-1)
+        risk_level = 1 / (1 + np.exp(-weighted_sum * 6))
+        
+        rain_multiplier = np.where(rainfall > 200, 1.4, np.where(rainfall > 100, 1.2, 1.0))
+        risk_level = np.minimum(1.0, risk_level * rain_multiplier)
+        
+        water_multiplier = np.where(water_level > 130, 1.3, np.where(water_level > 110, 1.1, 1.0))
+        risk_level = np.minimum(1.0, risk_level * water_multiplier)
+        
+        risk_level = np.maximum(0.1, risk_level)
+        
+        status_code = (risk_level >= 0.5).astype(np.int8) + (risk_level >= 0.8).astype(np.int8)
+        
+        return {
+            'risk_level': np.round(risk_level, 3),
+            'status_code': status_code,
+            'status': ANN_STATUS_LABELS[status_code],
+            'message': ANN_STATUS_MESSAGES[status_code]
+        }
+        
+    except Exception as e:
+        if data is not None:
+            shape = (len(data),)
+        else:
+            shape = batch_input_shape(rainfall, water_level, humidity, temperature)
+        return batch_error(shape, f'Error dalam prediksi ANN batch: {str(e)}')
+
 def get_ann_parameters():
-    """Return parameter ANN untuk display di technical details"""
+    """
+    Return parameter model 2.0 untuk display di technical details.
+    Model ini bukan jaringan terlatih: jumlah terbobot fitur ternormalisasi
+    lewat sigmoid, lalu faktor pengali aturan hujan/tinggi air. Untuk MLP
+    4-8-4-1 yang benar-benar dilatih, lihat ann_mlp.get_mlp_parameters.
+    """
     return {
-        'architecture': '4-8-4-1 Neural Network',
-        'weights': [0.50, 0.25, 0.15, 0.10],  
+        'architecture': 'Weighted-sum rule model (4 input, sigmoid, rule multipliers)',
+        'weights': [0.50, 0.25, 0.15, 0.10],
         'normalization_factors': [300.0, 150.0, 100.0, 35.0],
-        'activation': 'Sigmoid',
-        'training_samples': 1245,
-        'accuracy': 0.892,
+        'activation': 'Sigmoid (weighted_sum * 6)',
+        'rule_multipliers': {
+            'rainfall > 200': 1.4,
+            'rainfall > 100': 1.2,
+            'water_level > 130': 1.3,
+            'water_level > 110': 1.1
+        },
+        'baseline_risk': 0.1,
+        'thresholds': {'TINGGI': 0.8, 'MENENGAH': 0.5},
+        'training_samples': None,
         'version': '2.0 - Improved Logic'
     }
 
@@ -147,4 +240,44 @@ def predict_flood_ann_legacy(rainfall, water_level, humidity, temperature):
             'risk_level': 0.0,
             'status': 'ERROR',
             'message': f'Error dalam prediksi ANN: {str(e)}'
-        }
\ No newline at end of file
+        }
+
+LEGACY_STATUS_MESSAGES = np.array([
+    "Aman, tetap waspada",
+    "Siaga! Pantau terus perkembangan",
+    "Waspada! Kondisi kritis"
+], dtype=object)
+
+def predict_flood_ann_legacy_batch(rainfall, water_level, humidity, temperature):
+    """
+    Versi batch dari predict_flood_ann_legacy (format predict_flood_ann_batch).
+    Hasil identik dengan memanggil predict_flood_ann_legacy per titik.
+    """
+    try:
+        rainfall, water_level, humidity, temperature = np.broadcast_arrays(
+            np.atleast_1d(np.asarray(rainfall, dtype=float)),
+            np.atleast_1d(np.asarray(water_level, dtype=float)),
+            np.atleast_1d(np.asarray(humidity, dtype=float)),
+            np.atleast_1d(np.asarray(temperature, dtype=float))
+        )
+
+        features = np.stack([rainfall, water_level, humidity, temperature], axis=-1)
+        weights = np.array([0.45, 0.30, 0.15, 0.10])
+        normalization_factors = np.array([300.0, 150.0, 100.0, 35.0])
+        weighted_sum = np.sum((features / normalization_factors) * weights, axis=-1)
+        risk_level = 1 / (1 + np.exp(-weighted_sum * 10))
+
+        status_code = (risk_level >= 0.4).astype(np.int8) + (risk_level >= 0.7).astype(np.int8)
+
+        return {
+            'risk_level': np.round(risk_level, 3),
+            'status_code': status_code,
+            'status': ANN_STATUS_LABELS[status_code],
+            'message': LEGACY_STATUS_MESSAGES[status_code]
+        }
+
+    except Exception as e:
+        return batch_error(
+            batch_input_shape(rainfall, water_level, humidity, temperature),
+            f'Error dalam prediksi ANN legacy batch: {str(e)}'
+        )
\ No newline at end of file
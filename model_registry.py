@@ -0,0 +1,464 @@
+"""
+Registry versi model ANN.
+
+Setiap versi didaftarkan dengan loader yang baru dipanggil saat versi itu
+pertama kali dipakai, lalu di-cache di dalam proses. Versi aktif bisa
+diganti tanpa restart server, baik lewat set_active_version() maupun dari
+terminal:
+
+    python model_registry.py activate mlp
+    python model_registry.py shadow 2.0 mlp
+
+Versi shadow dijalankan di thread latar belakang pada input yang sama
+dengan versi aktif, sehingga latensi dan hasilnya bisa dibandingkan pada
+traffic nyata tanpa memperlambat pengguna.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_VERSION = "2.0"
+FALLBACK_VERSION = "simple"
+CONTROL_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'model_version.json')
+CONTROL_CHECK_INTERVAL = 1.0
+SHADOW_HISTORY_SIZE = 1000
+
+def _load_v2():
+    from model_ann import predict_flood_ann
+    return predict_flood_ann
+
+def _load_legacy():
+    from model_ann import predict_flood_ann_legacy
+    return predict_flood_ann_legacy
+
+def _load_mlp():
+    from ann_mlp import predict_flood_mlp, get_shared_mlp
+    get_shared_mlp()
+    return predict_flood_mlp
+
+def _load_v2_batch():
+    from model_ann import predict_flood_ann_batch
+    return predict_flood_ann_batch
+
+def _load_legacy_batch():
+    from model_ann import predict_flood_ann_legacy_batch
+    return predict_flood_ann_legacy_batch
+
+def _load_mlp_batch():
+    from ann_mlp import predict_flood_mlp_batch, get_shared_mlp
+    get_shared_mlp()
+    return predict_flood_mlp_batch
+
+# Urutan kode status batch (status_code) sama dengan model_ann.ANN_STATUS_LABELS
+BATCH_STATUS_CODES = {"RENDAH": 0, "MENENGAH": 1, "TINGGI": 2}
+
+def _scalar_batch(predict_fn):
+    """
+    Bungkus fungsi prediksi skalar menjadi prediktor batch (format
+    predict_flood_ann_batch) untuk versi tanpa jalur vektor. Satu panggilan
+    per titik, jadi jauh lebih lambat daripada versi batch asli.
+    """
+    def predict_batch(rainfall, water_level, humidity, temperature):
+        import numpy as np
+        from model_ann import batch_input_shape, batch_error
+
+        try:
+            rainfall, water_level, humidity, temperature = np.broadcast_arrays(
+                np.atleast_1d(np.asarray(rainfall, dtype=float)),
+                np.atleast_1d(np.asarray(water_level, dtype=float)),
+                np.atleast_1d(np.asarray(humidity, dtype=float)),
+                np.atleast_1d(np.asarray(temperature, dtype=float))
+            )
+
+            results = [
+                predict_fn(float(r), float(w), float(h), float(t))
+                for r, w, h, t in zip(rainfall.ravel(), water_level.ravel(), humidity.ravel(), temperature.ravel())
+            ]
+            errors = [result['message'] for result in results if result.get('status') not in BATCH_STATUS_CODES]
+            if errors:
+                raise ValueError(errors[0])
+
+            shape = rainfall.shape
+            return {
+                'risk_level': np.array([result['risk_level'] for result in results], dtype=float).reshape(shape),
+                'status_code': np.array([BATCH_STATUS_CODES[result['status']] for result in results], dtype=np.int8).reshape(shape),
+                'status': np.array([result['status'] for result in results], dtype=object).reshape(shape),
+                'message': np.array([result['message'] for result in results], dtype=object).reshape(shape)
+            }
+
+        except Exception as e:
+            return batch_error(
+                batch_input_shape(rainfall, water_level, humidity, temperature),
+                f'Error dalam prediksi batch: {str(e)}'
+            )
+    return predict_batch
+
+def _load_simple():
+    def predict_flood_simple(rainfall, water_level, humidity, temperature):
+        """Model cadangan tanpa NumPy (dulu inline di app.py)"""
+        risk = min(1.0, (rainfall / 300) * 0.5 + (water_level / 150) * 0.3 + (humidity / 100) * 0.15 + ((temperature - 20) / 20) * 0.05)
+
+        if risk >= 0.7:
+            status = "TINGGI"
+            message = "WASPADA! Potensi banjir tinggi"
+        elif risk >= 0.4:
+            status = "MENENGAH"
+            message = "SIAGA! Pantau perkembangan"
+        else:
+            status = "RENDAH"
+            message = "AMAN, tetap waspada"
+
+        return {
+            'risk_level': round(risk, 3),
+            'status': status,
+            'message': message
+        }
+    return predict_flood_simple
+
+def _load_simple_batch():
+    """
+    Versi batch model cadangan. NumPy diimpor di sini saja, jadi versi
+    skalar 'simple' tetap bisa dipakai walau NumPy tidak tersedia.
+    """
+    import numpy as np
+    from model_ann import ANN_STATUS_LABELS, batch_input_shape, batch_error
+
+    messages = np.array([
+        "AMAN, tetap waspada",
+        "SIAGA! Pantau perkembangan",
+        "WASPADA! Potensi banjir tinggi"
+    ], dtype=object)
+
+    def predict_flood_simple_batch(rainfall, water_level, humidity, temperature):
+        try:
+            rainfall, water_level, humidity, temperature = np.broadcast_arrays(
+                np.atleast_1d(np.asarray(rainfall, dtype=float)),
+                np.atleast_1d(np.asarray(water_level, dtype=float)),
+                np.atleast_1d(np.asarray(humidity, dtype=float)),
+                np.atleast_1d(np.asarray(temperature, dtype=float))
+            )
+
+            risk = np.minimum(1.0, (rainfall / 300) * 0.5 + (water_level / 150) * 0.3 + (humidity / 100) * 0.15 + ((temperature - 20) / 20) * 0.05)
+            status_code = (risk >= 0.4).astype(np.int8) + (risk >= 0.7).astype(np.int8)
+
+            return {
+                'risk_level': np.round(risk, 3),
+                'status_code': status_code,
+                'status': ANN_STATUS_LABELS[status_code],
+                'message': messages[status_code]
+            }
+
+        except Exception as e:
+            return batch_error(
+                batch_input_shape(rainfall, water_level, humidity, temperature),
+                f'Error dalam prediksi batch: {str(e)}'
+            )
+    return predict_flood_simple_batch
+
+class ModelRegistry:
+    def __init__(self, control_file=CONTROL_FILE):
+        self._loaders = {}
+        self._batch_loaders = {}
+        self._descriptions = {}
+        self._cache = {}
+        self._batch_cache = {}
+        self._lock = threading.Lock()
+
+        self._active_version = os.environ.get('ANN_MODEL_VERSION', DEFAULT_VERSION)
+        self._shadow_versions = ()
+
+        self.control_file = control_file
+        self._control_mtime = None
+        self._control_checked_at = 0.0
+
+        self._shadow_executor = None
+        self._shadow_history = deque(maxlen=SHADOW_HISTORY_SIZE)
+
+    # ============ REGISTRASI & LOADING ============
+
+    def register(self, version, loader, description="", batch_loader=None):
+        """
+        Daftarkan versi baru; loader dipanggil saat versi pertama kali dipakai.
+        batch_loader (opsional) memuat prediktor array berformat
+        predict_flood_ann_batch; tanpa itu get_batch() membungkus versi skalar.
+        """
+        with self._lock:
+            self._loaders[version] = loader
+            self._descriptions[version] = description
+            if batch_loader is None:
+                self._batch_loaders.pop(version, None)
+            else:
+                self._batch_loaders[version] = batch_loader
+            self._cache.pop(version, None)
+            self._batch_cache.pop(version, None)
+
+    def versions(self):
+        """Daftar versi terdaftar beserta status loading-nya"""
+        self._refresh_from_control_file(force=True)
+        return [
+            {
+                'version': version,
+                'description': self._descriptions.get(version, ''),
+                'loaded': version in self._cache,
+                'vectorized': self.is_vectorized(version),
+                'active': version == self._active_version,
+                'shadow': version in self._shadow_versions
+            }
+            for version in self._loaders
+        ]
+
+    def is_vectorized(self, version):
+        """True jika versi punya prediktor batch asli (bukan pembungkus skalar)"""
+        return version in self._batch_loaders
+
+    def get(self, version):
+        """Ambil fungsi prediksi suatu versi (lazy load, cache per proses)"""
+        predict_fn = self._cache.get(version)
+        if predict_fn is not None:
+            return predict_fn
+
+        with self._lock:
+            predict_fn = self._cache.get(version)
+            if predict_fn is None:
+                if version not in self._loaders:
+                    raise KeyError(f"Versi model tidak dikenal: {version}")
+                predict_fn = self._loaders[version]()
+                self._cache[version] = predict_fn
+                print(f"✅ Model version '{version}' loaded")
+        return predict_fn
+
+    def get_batch(self, version):
+        """Prediktor batch suatu versi; versi tanpa jalur vektor memakai pembungkus skalar"""
+        predict_batch = self._batch_cache.get(version)
+        if predict_batch is not None:
+            return predict_batch
+
+        batch_loader = self._batch_loaders.get(version)
+        if batch_loader is None:
+            predict_batch = _scalar_batch(self.get(version))
+        else:
+            predict_batch = batch_loader()
+
+        with self._lock:
+            self._batch_cache.setdefault(version, predict_batch)
+            return self._batch_cache[version]
+
+    def unload(self, version=None):
+        """Buang cache versi (semua jika None) agar dimuat ulang saat dipakai lagi"""
+        with self._lock:
+            if version is None:
+                self._cache.clear()
+                self._batch_cache.clear()
+            else:
+                self._cache.pop(version, None)
+                self._batch_cache.pop(version, None)
+
+    # ============ VERSI AKTIF & SHADOW ============
+
+    @property
+    def active_version(self):
+        self._refresh_from_control_file()
+        return self._active_version
+
+    @property
+    def shadow_versions(self):
+        self._refresh_from_control_file()
+        return self._shadow_versions
+
+    def set_active_version(self, version, persist=False):
+        """Ganti versi aktif tanpa restart; persist=True juga berlaku untuk proses lain"""
+        if version not in self._loaders:
+            raise KeyError(f"Versi model tidak dikenal: {version}")
+        self.get(version)
+        self._refresh_from_control_file(force=True)
+        self._active_version = version
+        print(f"✅ Active model version: {version}")
+        if persist:
+            self._write_control_file()
+
+    def set_shadow_versions(self, versions, persist=False):
+        """Jalankan versi-versi ini berdampingan dengan versi aktif (kosongkan untuk mematikan)"""
+        versions = tuple(versions)
+        for version in versions:
+            if version not in self._loaders:
+                raise KeyError(f"Versi model tidak dikenal: {version}")
+        self._refresh_from_control_file(force=True)
+        self._shadow_versions = versions
+        print(f"✅ Shadow model versions: {', '.join(versions) or '-'}")
+        if persist:
+            self._write_control_file()
+
+    def _write_control_file(self):
+        with open(self.control_file, 'w') as f:
+            json.dump({'active': self._active_version, 'shadow': list(self._shadow_versions)}, f)
+        self._control_mtime = os.path.getmtime(self.control_file)
+
+    def _refresh_from_control_file(self, force=False):
+        """Baca ulang file kontrol jika berubah (dicek maksimal sekali per detik)"""
+        now = time.monotonic()
+        if not force and now - self._control_checked_at < CONTROL_CHECK_INTERVAL:
+            return
+        self._control_checked_at = now
+
+        try:
+            mtime = os.path.getmtime(self.control_file)
+        except OSError:
+            return
+        if mtime == self._control_mtime:
+            return
+
+        try:
+            with open(self.control_file) as f:
+                control = json.load(f)
+            self._control_mtime = mtime
+
+            active = control.get('active', self._active_version)
+            if active in self._loaders:
+                self._active_version = active
+            self._shadow_versions = tuple(v for v in control.get('shadow', []) if v in self._loaders)
+            print(f"🔄 Model control reloaded: active={self._active_version}, shadow={list(self._shadow_versions)}")
+        except Exception as e:
+            print(f"⚠️ Error reading model control file: {e}")
+
+    # ============ PREDIKSI ============
+
+    def predict(self, rainfall, water_level, humidity, temperature, version=None):
+        """Prediksi dengan versi tertentu atau versi aktif, plus shadow run bila aktif"""
+        requested = version or self.active_version
+
+        try:
+            predict_fn = self.get(requested)
+        except Exception as e:
+            print(f"⚠️ Model version '{requested}' unavailable ({e}), using '{FALLBACK_VERSION}'")
+            requested = FALLBACK_VERSION
+            predict_fn = self.get(FALLBACK_VERSION)
+
+        started = time.perf_counter()
+        result = predict_fn(rainfall, water_level, humidity, temperature)
+        latency = time.perf_counter() - started
+
+        result['model_version'] = requested
+
+        if version is None and self.shadow_versions:
+            self._submit_shadow(requested, result, latency, (rainfall, water_level, humidity, temperature))
+
+        return result
+
+    def predict_batch(self, rainfall, water_level, humidity, temperature, version=None):
+        """
+        Prediksi array dengan versi tertentu atau versi aktif (tanpa shadow run).
+        Hasil berformat predict_flood_ann_batch plus 'model_version'.
+        """
+        requested = version or self.active_version
+
+        try:
+            predict_batch = self.get_batch(requested)
+        except Exception as e:
+            print(f"⚠️ Model version '{requested}' unavailable ({e}), using '{FALLBACK_VERSION}'")
+            requested = FALLBACK_VERSION
+            predict_batch = self.get_batch(FALLBACK_VERSION)
+
+        result = predict_batch(rainfall, water_level, humidity, temperature)
+        result['model_version'] = requested
+        return result
+
+    def _submit_shadow(self, primary_version, primary_result, primary_latency, inputs):
+        if self._shadow_executor is None:
+            with self._lock:
+                if self._shadow_executor is None:
+                    self._shadow_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ann-shadow')
+
+        shadows = [v for v in self._shadow_versions if v != primary_version]
+        self._shadow_executor.submit(self._run_shadow, primary_version, primary_result,
+                                    primary_latency, inputs, shadows)
+
+    def _run_shadow(self, primary_version, primary_result, primary_latency, inputs, shadows):
+        for shadow_version in shadows:
+            try:
+                predict_fn = self.get(shadow_version)
+                started = time.perf_counter()
+                shadow_result = predict_fn(*inputs)
+                latency = time.perf_counter() - started
+
+                self._shadow_history.append({
+                    'primary_version': primary_version,
+                    'shadow_version': shadow_version,
+                    'primary_latency_ms': primary_latency * 1000,
+                    'shadow_latency_ms': latency * 1000,
+                    'risk_diff': float(shadow_result.get('risk_level', 0.0)) - float(primary_result.get('risk_level', 0.0)),
+                    'status_match': shadow_result.get('status') == primary_result.get('status')
+                })
+            except Exception as e:
+                print(f"⚠️ Shadow run '{shadow_version}' failed: {e}")
+
+    def get_shadow_report(self):
+        """Ringkasan perbandingan shadow vs aktif per versi shadow"""
+        grouped = {}
+        for record in list(self._shadow_history):
+            grouped.setdefault(record['shadow_version'], []).append(record)
+
+        report = {}
+        for shadow_version, records in grouped.items():
+            n = len(records)
+            shadow_latencies = sorted(r['shadow_latency_ms'] for r in records)
+            report[shadow_version] = {
+                'samples': n,
+                'primary_versions': sorted(set(r['primary_version'] for r in records)),
+                'primary_latency_ms_mean': sum(r['primary_latency_ms'] for r in records) / n,
+                'shadow_latency_ms_mean': sum(shadow_latencies) / n,
+                'shadow_latency_ms_p95': shadow_latencies[min(n - 1, int(0.95 * n))],
+                'risk_diff_mean': sum(r['risk_diff'] for r in records) / n,
+                'risk_diff_abs_max': max(abs(r['risk_diff']) for r in records),
+                'status_agreement': sum(r['status_match'] for r in records) / n
+            }
+        return report
+
+registry = ModelRegistry()
+registry.register("2.0", _load_v2, "Weighted sigmoid + aturan ambang (model_ann.predict_flood_ann)", _load_v2_batch)
+registry.register("legacy", _load_legacy, "Logic lama (model_ann.predict_flood_ann_legacy)", _load_legacy_batch)
+registry.register("mlp", _load_mlp, "MLP 4-8-4-1 terlatih (ann_mlp.predict_flood_mlp)", _load_mlp_batch)
+registry.register(FALLBACK_VERSION, _load_simple, "Cadangan tanpa NumPy", _load_simple_batch)
+
+def predict_flood_ann(rainfall, water_level, humidity, temperature, version=None):
+    """Prediksi risiko banjir dengan versi model aktif di registry"""
+    try:
+        return registry.predict(rainfall, water_level, humidity, temperature, version=version)
+    except Exception as e:
+        return {
+            'risk_level': 0.0,
+            'status': 'ERROR',
+            'message': f'Error dalam prediksi ANN: {str(e)}'
+        }
+
+def predict_flood_ann_with_temp_range(rainfall, water_level, humidity, temp_min, temp_max, version=None):
+    """Seperti model_ann.predict_flood_ann_with_temp_range, tetapi lewat registry"""
+    temperature_avg = (temp_min + temp_max) / 2
+    result = predict_flood_ann(rainfall, water_level, humidity, temperature_avg, version=version)
+
+    result.update({
+        'temperature_range': {
+            'min': temp_min,
+            'max': temp_max,
+            'average': round(temperature_avg, 1)
+        }
+    })
+
+    return result
+
+if __name__ == "__main__":
+    # python model_registry.py list | activate <versi> | shadow [versi ...]
+    command = sys.argv[1] if len(sys.argv) > 1 else 'list'
+
+    if command == 'activate' and len(sys.argv) == 3:
+        registry.set_active_version(sys.argv[2], persist=True)
+    elif command == 'shadow':
+        registry.set_shadow_versions(sys.argv[2:], persist=True)
+    else:
+        for info in registry.versions():
+            flags = ' '.join(f for f in ('active', 'shadow') if info[f])
+            print(f"{info['version']:<8} {flags:<14} {info['description']}")
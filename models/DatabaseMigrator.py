@@ -0,0 +1,441 @@
+import sqlite3
+import os
+import traceback
+from datetime import datetime
+
+FLOOD_REPORTS_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS {table} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        "Timestamp" TEXT,
+        "Alamat" TEXT NOT NULL,
+        "Tinggi Banjir" TEXT NOT NULL,
+        "Nama Pelapor" TEXT NOT NULL,
+        "No HP" TEXT,
+        "IP Address" TEXT,
+        "Photo URL" TEXT,
+        "Status" TEXT DEFAULT 'pending',
+        report_date DATE,
+        report_time TIME,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+'''
+
+# Kolom format Google Sheets -> ekspresi dari kolom skema lama (app.py versi awal).
+# Ekspresi pertama yang kolom sumbernya tersedia akan dipakai.
+LEGACY_COLUMN_MAP = [
+    ('id', [('id', 'id')]),
+    ('"Timestamp"', [('Timestamp', '"Timestamp"'), ('timestamp', 'timestamp')]),
+    ('"Alamat"', [('Alamat', '"Alamat"'), ('address', "COALESCE(address, '')")]),
+    ('"Tinggi Banjir"', [('Tinggi Banjir', '"Tinggi Banjir"'), ('flood_height', "COALESCE(flood_height, '')")]),
+    ('"Nama Pelapor"', [('Nama Pelapor', '"Nama Pelapor"'), ('reporter_name', "COALESCE(reporter_name, '')")]),
+    ('"No HP"', [('No HP', '"No HP"'), ('reporter_phone', 'reporter_phone')]),
+    ('"IP Address"', [('IP Address', '"IP Address"'), ('ip_address', 'ip_address')]),
+    ('"Photo URL"', [('Photo URL', '"Photo URL"'), ('photo_path', 'photo_path')]),
+    ('"Status"', [('Status', '"Status"'), ('status', "COALESCE(status, 'pending')")]),
+    ('report_date', [('report_date', 'report_date'), ('timestamp', 'date(timestamp)')]),
+    ('report_time', [('report_time', 'report_time'), ('timestamp', 'time(timestamp)')]),
+    ('created_at', [('created_at', 'created_at')])
+]
+
+def _count_upsert(table, key_column, key_expr, status_expr, delta):
+    return f'''
+        INSERT INTO {table} ({key_column}, status, report_count)
+        VALUES ({key_expr}, {status_expr}, {delta})
+        ON CONFLICT ({key_column}, status)
+        DO UPDATE SET report_count = report_count + ({delta});
+    '''
+
+def _count_change(row, delta):
+    """Statement trigger untuk menambah/mengurangi hitungan harian & bulanan"""
+    status = f"COALESCE({row}.\"Status\", 'pending')"
+    return (
+        _count_upsert('report_counts_daily', 'report_date', f'{row}.report_date', status, delta)
+        + _count_upsert('report_counts_monthly', 'year_month', f'substr({row}.report_date, 1, 7)', status, delta)
+    )
+
+REPORT_COUNT_TRIGGERS = [
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_report_counts_insert
+    AFTER INSERT ON flood_reports
+    WHEN NEW.report_date IS NOT NULL
+    BEGIN {_count_change('NEW', 1)} END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_report_counts_delete
+    AFTER DELETE ON flood_reports
+    WHEN OLD.report_date IS NOT NULL
+    BEGIN {_count_change('OLD', -1)} END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_report_counts_update_old
+    AFTER UPDATE OF "Status", report_date ON flood_reports
+    WHEN OLD.report_date IS NOT NULL
+    BEGIN {_count_change('OLD', -1)} END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_report_counts_update_new
+    AFTER UPDATE OF "Status", report_date ON flood_reports
+    WHEN NEW.report_date IS NOT NULL
+    BEGIN {_count_change('NEW', 1)} END
+    '''
+]
+
+# Indeks full-text (FTS5, external content) untuk pencarian Alamat / Nama Pelapor
+REPORT_FTS_TABLE = 'flood_reports_fts'
+
+REPORT_FTS_TRIGGERS = [
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_report_fts_insert
+    AFTER INSERT ON flood_reports
+    BEGIN
+        INSERT INTO {REPORT_FTS_TABLE} (rowid, "Alamat", "Nama Pelapor")
+        VALUES (NEW.id, NEW."Alamat", NEW."Nama Pelapor");
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_report_fts_delete
+    AFTER DELETE ON flood_reports
+    BEGIN
+        INSERT INTO {REPORT_FTS_TABLE} ({REPORT_FTS_TABLE}, rowid, "Alamat", "Nama Pelapor")
+        VALUES ('delete', OLD.id, OLD."Alamat", OLD."Nama Pelapor");
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_report_fts_update
+    AFTER UPDATE OF "Alamat", "Nama Pelapor" ON flood_reports
+    BEGIN
+        INSERT INTO {REPORT_FTS_TABLE} ({REPORT_FTS_TABLE}, rowid, "Alamat", "Nama Pelapor")
+        VALUES ('delete', OLD.id, OLD."Alamat", OLD."Nama Pelapor");
+        INSERT INTO {REPORT_FTS_TABLE} (rowid, "Alamat", "Nama Pelapor")
+        VALUES (NEW.id, NEW."Alamat", NEW."Nama Pelapor");
+    END
+    '''
+]
+
+# Snapshot ReportRateLimiter: waktu laporan terakhir per kunci ("ip:..." / "phone:...")
+RATE_LIMIT_TABLE = 'rate_limit_hits'
+
+# Laporan hampir sama (ReportDeduplicator) -> laporan kanonik
+REPORT_DUPLICATES_TABLE = 'report_duplicates'
+
+REPORT_INSERT_TRIGGER_NAMES = [
+    'trg_report_counts_insert',
+    'trg_report_fts_insert'
+]
+
+def suspend_report_insert_triggers(conn):
+    """
+    Lepas trigger AFTER INSERT (agregat & FTS) untuk impor massal. Harus
+    dipanggil di dalam transaksi yang sama dengan resume_report_insert_triggers()
+    sehingga koneksi lain tidak pernah melihat tabel tanpa trigger.
+    """
+    for name in REPORT_INSERT_TRIGGER_NAMES:
+        conn.execute(f'DROP TRIGGER IF EXISTS {name}')
+
+def resume_report_insert_triggers(conn, first_id=None, last_id=None):
+    """Proses baris id [first_id, last_id] sekaligus (agregat & FTS) lalu pasang ulang trigger"""
+    if first_id is not None:
+        for table, key_column, key_expr in [
+            ('report_counts_daily', 'report_date', 'report_date'),
+            ('report_counts_monthly', 'year_month', 'substr(report_date, 1, 7)')
+        ]:
+            conn.execute(f'''
+                INSERT INTO {table} ({key_column}, status, report_count)
+                SELECT {key_expr}, COALESCE("Status", 'pending'), COUNT(*)
+                FROM flood_reports
+                WHERE id BETWEEN ? AND ? AND report_date IS NOT NULL
+                GROUP BY 1, 2
+                ON CONFLICT ({key_column}, status)
+                DO UPDATE SET report_count = report_count + excluded.report_count
+            ''', (first_id, last_id))
+
+        if _table_exists(conn, REPORT_FTS_TABLE):
+            conn.execute(f'''
+                INSERT INTO {REPORT_FTS_TABLE} (rowid, "Alamat", "Nama Pelapor")
+                SELECT id, "Alamat", "Nama Pelapor" FROM flood_reports
+                WHERE id BETWEEN ? AND ?
+            ''', (first_id, last_id))
+
+    conn.execute(REPORT_COUNT_TRIGGERS[0])
+    if _table_exists(conn, REPORT_FTS_TABLE):
+        conn.execute(REPORT_FTS_TRIGGERS[0])
+
+def _table_columns(conn, table):
+    return [row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')]
+
+def _table_exists(conn, table):
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,)
+    ).fetchone() is not None
+
+class DatabaseMigrator:
+    """
+    Runner migrasi skema berversi. Versi skema disimpan di PRAGMA user_version
+    dan setiap langkah hanya dijalankan sekali. Tabel besar dimigrasi per chunk
+    (tiap chunk satu transaksi) sehingga bisa dilanjutkan jika terputus.
+    """
+
+    def __init__(self, db_path='flood_system.db', chunk_size=5000, progress=None):
+        self.db_path = db_path
+        self.chunk_size = chunk_size
+        self.progress = progress or self._print_progress
+
+        # (versi, deskripsi, fungsi) - urutan tidak boleh diubah, hanya ditambah
+        self.migrations = [
+            (1, "flood_reports format Google Sheets", self._migrate_gsheet_format),
+            (2, "index report_date / IP Address / Timestamp", self._create_report_indexes),
+            (3, "tabel agregat report_counts_daily / report_counts_monthly", self._create_report_count_tables),
+            (4, "indeks full-text FTS5 Alamat / Nama Pelapor", self._create_report_fts),
+            (5, "snapshot rate limiter rate_limit_hits", self._create_rate_limit_table),
+            (6, "tautan laporan duplikat report_duplicates", self._create_report_duplicates_table),
+        ]
+
+    @property
+    def latest_version(self):
+        return self.migrations[-1][0]
+
+    def _print_progress(self, step, done, total):
+        percent = (done / total * 100) if total else 100.0
+        print(f"  ⏳ {step}: {done}/{total} ({percent:.1f}%)")
+
+    def get_version(self, conn):
+        return conn.execute('PRAGMA user_version').fetchone()[0]
+
+    def migrate(self, backup=False):
+        """Jalankan semua migrasi yang belum diterapkan; kembalikan versi akhir"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            version = self.get_version(conn)
+            pending = [m for m in self.migrations if m[0] > version]
+            if not pending:
+                return version
+
+            print(f"🔄 Schema version {version} -> {self.latest_version}")
+            if backup and os.path.exists(self.db_path):
+                self.backup(conn)
+
+            for target, description, step in pending:
+                print(f"🔄 Migration {target}: {description}")
+                step(conn)
+                conn.execute(f'PRAGMA user_version = {int(target)}')
+                conn.commit()
+                print(f"✅ Migration {target} applied")
+
+            return self.get_version(conn)
+
+        except Exception as e:
+            conn.rollback()
+            print(f"❌ Migration failed: {e}")
+            traceback.print_exc()
+            raise
+        finally:
+            conn.close()
+
+    def backup(self, conn=None, backup_path=None, pages_per_step=1024):
+        """
+        Backup online memakai SQLite backup API. Disalin bertahap per
+        `pages_per_step` halaman sehingga aplikasi tetap bisa menulis.
+        """
+        if backup_path is None:
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            base, ext = os.path.splitext(self.db_path)
+            backup_path = f"{base}_backup_{timestamp}{ext or '.db'}"
+
+        own_conn = conn is None
+        source = conn or sqlite3.connect(self.db_path, timeout=30)
+        target = sqlite3.connect(backup_path)
+        try:
+            def report(status, remaining, total):
+                self.progress("backup", total - remaining, total)
+
+            source.backup(target, pages=pages_per_step, progress=report)
+            print(f"✅ Database backed up to: {backup_path}")
+            return backup_path
+        finally:
+            target.close()
+            if own_conn:
+                source.close()
+
+    # ============ LANGKAH MIGRASI ============
+
+    def _migrate_gsheet_format(self, conn):
+        """v1: tabel flood_reports dengan kolom format Google Sheets"""
+        if not _table_exists(conn, 'flood_reports'):
+            conn.execute(FLOOD_REPORTS_SCHEMA.format(table='flood_reports'))
+            return
+
+        columns = _table_columns(conn, 'flood_reports')
+        if 'Alamat' in columns and 'report_date' in columns:
+            return
+
+        select_exprs = []
+        insert_cols = []
+        for target_col, candidates in LEGACY_COLUMN_MAP:
+            for source_col, expr in candidates:
+                if source_col in columns:
+                    insert_cols.append(target_col)
+                    select_exprs.append(expr)
+                    break
+
+        conn.execute(FLOOD_REPORTS_SCHEMA.format(table='flood_reports_new'))
+        conn.commit()
+
+        insert_sql = f'''
+            INSERT INTO flood_reports_new ({", ".join(insert_cols)})
+            SELECT {", ".join(select_exprs)} FROM flood_reports
+            WHERE id > ? ORDER BY id LIMIT ?
+        '''
+
+        total = conn.execute('SELECT COUNT(*) FROM flood_reports').fetchone()[0]
+        # Lanjutkan dari baris terakhir yang sudah tersalin (resumable)
+        last_id = conn.execute('SELECT COALESCE(MAX(id), 0) FROM flood_reports_new').fetchone()[0]
+        copied = conn.execute('SELECT COUNT(*) FROM flood_reports_new').fetchone()[0]
+
+        while True:
+            cursor = conn.execute(insert_sql, (last_id, self.chunk_size))
+            conn.commit()
+            if cursor.rowcount <= 0:
+                break
+            copied += cursor.rowcount
+            last_id = conn.execute('SELECT MAX(id) FROM flood_reports_new').fetchone()[0]
+            self.progress("flood_reports", copied, total)
+
+        # Baris yang masuk selama penyalinan ikut disalin saat swap
+        conn.execute('BEGIN IMMEDIATE')
+        conn.execute(insert_sql, (last_id, -1))
+        conn.execute('DROP TABLE flood_reports')
+        conn.execute('ALTER TABLE flood_reports_new RENAME TO flood_reports')
+
+    def _create_report_indexes(self, conn):
+        """v2: index untuk query harian/bulanan, limit per IP, dan urutan Timestamp"""
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_flood_reports_report_date
+            ON flood_reports (report_date, "Timestamp")
+        ''')
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_flood_reports_ip_date
+            ON flood_reports ("IP Address", report_date)
+        ''')
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_flood_reports_timestamp
+            ON flood_reports ("Timestamp")
+        ''')
+
+    def _create_report_count_tables(self, conn):
+        """v3: tabel agregat harian/bulanan per status, dijaga oleh trigger"""
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS report_counts_daily (
+                report_date TEXT NOT NULL,
+                status TEXT NOT NULL,
+                report_count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (report_date, status)
+            ) WITHOUT ROWID
+        ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS report_counts_monthly (
+                year_month TEXT NOT NULL,
+                status TEXT NOT NULL,
+                report_count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (year_month, status)
+            ) WITHOUT ROWID
+        ''')
+
+        for statement in REPORT_COUNT_TRIGGERS:
+            conn.execute(statement)
+
+        self.backfill_report_counts(conn)
+
+    def backfill_report_counts(self, conn=None, source='flood_reports'):
+        """
+        Hitung ulang tabel agregat dari `source` (untuk data lama / perbaikan).
+        Pakai view flood_reports_all (ReportArchiver) agar arsip ikut dihitung.
+        """
+        own_conn = conn is None
+        conn = conn or sqlite3.connect(self.db_path, timeout=30)
+        try:
+            conn.execute('DELETE FROM report_counts_daily')
+            conn.execute('DELETE FROM report_counts_monthly')
+            conn.execute(f'''
+                INSERT INTO report_counts_daily (report_date, status, report_count)
+                SELECT report_date, COALESCE("Status", 'pending'), COUNT(*)
+                FROM {source}
+                WHERE report_date IS NOT NULL
+                GROUP BY report_date, COALESCE("Status", 'pending')
+            ''')
+            conn.execute('''
+                INSERT INTO report_counts_monthly (year_month, status, report_count)
+                SELECT substr(report_date, 1, 7), status, SUM(report_count)
+                FROM report_counts_daily
+                GROUP BY substr(report_date, 1, 7), status
+            ''')
+            if own_conn:
+                conn.commit()
+            total = conn.execute('SELECT COALESCE(SUM(report_count), 0) FROM report_counts_daily').fetchone()[0]
+            print(f"✅ Report counts backfilled: {total} reports")
+        finally:
+            if own_conn:
+                conn.close()
+
+    def _create_report_fts(self, conn):
+        """v4: FTS5 external-content atas "Alamat" dan "Nama Pelapor", dijaga oleh trigger"""
+        conn.execute(f'''
+            CREATE VIRTUAL TABLE IF NOT EXISTS {REPORT_FTS_TABLE} USING fts5(
+                "Alamat", "Nama Pelapor",
+                content='flood_reports', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2',
+                prefix='2 3'
+            )
+        ''')
+
+        for statement in REPORT_FTS_TRIGGERS:
+            conn.execute(statement)
+
+        self.rebuild_report_fts(conn)
+
+    def rebuild_report_fts(self, conn=None):
+        """Bangun ulang indeks FTS dari flood_reports (data lama / perbaikan)"""
+        own_conn = conn is None
+        conn = conn or sqlite3.connect(self.db_path, timeout=30)
+        try:
+            conn.execute(f"INSERT INTO {REPORT_FTS_TABLE} ({REPORT_FTS_TABLE}) VALUES ('rebuild')")
+            if own_conn:
+                conn.commit()
+            print("✅ Report search index rebuilt")
+        finally:
+            if own_conn:
+                conn.close()
+
+    def _create_rate_limit_table(self, conn):
+        """v5: snapshot jendela rate limiter agar batas laporan bertahan setelah restart"""
+        conn.execute(f'''
+            CREATE TABLE IF NOT EXISTS {RATE_LIMIT_TABLE} (
+                limit_key TEXT PRIMARY KEY,
+                hits TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            ) WITHOUT ROWID
+        ''')
+
+    def _create_report_duplicates_table(self, conn):
+        """
+        v6: tautan laporan duplikat -> laporan kanonik. Tabel terpisah (bukan
+        kolom flood_reports) sehingga arsip tahunan tidak perlu diubah;
+        report_date ikut disimpan agar statistik dari tabel agregat bisa
+        dikurangi jumlah duplikat tanpa membaca baris laporan.
+        """
+        conn.execute(f'''
+            CREATE TABLE IF NOT EXISTS {REPORT_DUPLICATES_TABLE} (
+                report_id INTEGER PRIMARY KEY,
+                canonical_id INTEGER NOT NULL,
+                similarity REAL NOT NULL,
+                report_date TEXT NOT NULL,
+                "Timestamp" TEXT NOT NULL
+            )
+        ''')
+        conn.execute(f'''
+            CREATE INDEX IF NOT EXISTS idx_report_duplicates_canonical
+            ON {REPORT_DUPLICATES_TABLE} (canonical_id)
+        ''')
+        conn.execute(f'''
+            CREATE INDEX IF NOT EXISTS idx_report_duplicates_date
+            ON {REPORT_DUPLICATES_TABLE} (report_date)
+        ''')
@@ -0,0 +1,59 @@
+from collections import namedtuple
+
+# Kolom laporan (nama kolom SQLite / Google Sheets) dan nama atribut Python-nya
+REPORT_COLUMNS = [
+    'id', 'Alamat', 'Tinggi Banjir', 'Nama Pelapor', 'No HP', 'IP Address',
+    'Photo URL', 'Status', 'report_date', 'report_time', 'Timestamp'
+]
+REPORT_FIELDS = [
+    'id', 'alamat', 'tinggi_banjir', 'nama_pelapor', 'no_hp', 'ip_address',
+    'photo_url', 'status', 'report_date', 'report_time', 'timestamp'
+]
+
+# Daftar kolom untuk SELECT dengan urutan yang sama dengan FloodReport
+REPORT_SELECT = ", ".join(f'"{col}"' for col in REPORT_COLUMNS)
+
+_COLUMN_INDEX = {col: i for i, col in enumerate(REPORT_COLUMNS)}
+
+class FloodReport(namedtuple('FloodReport', REPORT_FIELDS)):
+    """
+    Satu baris flood_reports sebagai tuple ringkas (tanpa __dict__ per baris).
+    Tetap bisa diakses seperti dict lama: report['Alamat'], report.get('Status'),
+    selain lewat atribut report.alamat / report.status.
+    """
+
+    __slots__ = ()
+
+    COLUMNS = REPORT_COLUMNS
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return tuple.__getitem__(self, _COLUMN_INDEX[key])
+        return tuple.__getitem__(self, key)
+
+    def __contains__(self, key):
+        return key in _COLUMN_INDEX
+
+    def get(self, key, default=None):
+        index = _COLUMN_INDEX.get(key)
+        if index is None:
+            return default
+        return tuple.__getitem__(self, index)
+
+    def keys(self):
+        return list(REPORT_COLUMNS)
+
+    def values(self):
+        return list(self)
+
+    def items(self):
+        return list(zip(REPORT_COLUMNS, self))
+
+    def to_dict(self):
+        """Salinan dict (mis. untuk JSON / Google Sheets)"""
+        return dict(zip(REPORT_COLUMNS, self))
+
+    @classmethod
+    def row_factory(cls, cursor, row):
+        """sqlite3 row_factory untuk query yang memakai REPORT_SELECT"""
+        return tuple.__new__(cls, row)
@@ -1,59 +1,124 @@
-import sqlite3
 from datetime import datetime
+from operator import itemgetter
 import os
+import re
 import traceback
-import pytz  
+import numpy as np
+import pandas as pd
 
-class FloodReportModel:
+from models.SQLiteConnectionPool import SQLiteConnectionPool
+from models.FloodReport import FloodReport, REPORT_COLUMNS, REPORT_SELECT
+from models.ReportArchiver import ReportArchiver
+from models.SQLiteWriteQueue import SQLiteWriteQueue
+from models.ReportReadCache import ReportReadCache, cached_read
+from models.ReportExporter import ReportExporter
+from models.ReportStorage import (
+    ReportStorage,
+    month_date_range,
+    HISTOGRAM_BUCKETS,
+    _iter_chunks,
+    _bucket_starts
+)
+from models.DatabaseMigrator import (
+    DatabaseMigrator,
+    suspend_report_insert_triggers,
+    resume_report_insert_triggers,
+    REPORT_FTS_TABLE,
+    REPORT_DUPLICATES_TABLE
+)
+
+# Batas tunggu hasil job di antrean penulis
+WRITE_TIMEOUT_SECONDS = 30
+
+# Predikat yang melewati laporan duplikat (collapse_duplicates=True)
+NOT_DUPLICATE_SQL = f'id NOT IN (SELECT report_id FROM {REPORT_DUPLICATES_TABLE})'
+
+# Ekspresi kunci bucket di report_counts_daily
+HISTOGRAM_DAY_KEYS = {
+    'day': 'report_date',
+    'week': "date(report_date, 'weekday 0', '-6 days')",
+    'month': 'substr(report_date, 1, 7)'
+}
+
+# Query baca laporan; diuji terhadap index di tests/test_report_indexes.py
+TODAY_REPORTS_WHERE = '''
+    WHERE report_date = ?
+    ORDER BY "Timestamp" DESC
+'''
+
+# report_date = tanggal dari "Timestamp", jadi urutan (report_date,
+# "Timestamp") sama dengan urutan "Timestamp" dan bisa dibaca mundur
+# langsung dari idx_flood_reports_report_date tanpa temp B-tree
+MONTH_REPORTS_WHERE = '''
+    WHERE report_date >= ? AND report_date < ?
+    ORDER BY report_date DESC, "Timestamp" DESC
+'''
+
+ALL_REPORTS_WHERE = 'ORDER BY "Timestamp" DESC'
+
+IP_DAY_COUNT_SQL = '''
+    SELECT COUNT(*) FROM flood_reports
+    WHERE "IP Address" = ? AND report_date = ?
+'''
+
+def reports_sql(where_sql, source='flood_reports'):
+    """SELECT kolom laporan dari source dengan klausa WHERE/ORDER BY ini"""
+    return f'''
+        SELECT {REPORT_SELECT} FROM {source}
+        {where_sql}
+    '''
+
+def _fts_query(text):
+    """Teks bebas pengguna -> query FTS5 aman: setiap kata jadi prefix berkutip (AND)"""
+    tokens = re.findall(r'\w+', str(text or ''))
+    return " ".join(f'"{token}"*' for token in tokens)
+
+def _sql_datetime(value):
+    return str(value.astype('datetime64[s]')).replace('T', ' ')
+
+class FloodReportModel(ReportStorage):
+    """Backend penyimpanan laporan SQLite (lihat ReportStorage)"""
+    
     def __init__(self, db_path='flood_system.db'):
+        super().__init__()
         self.db_path = db_path
         print(f"📂 Database path: {os.path.abspath(db_path)}")
         
-        self.tz_wib = pytz.timezone('Asia/Jakarta')
+        self.pool = SQLiteConnectionPool.for_path(db_path)
+        self.archiver = ReportArchiver(db_path)
+        self.writer = SQLiteWriteQueue.for_path(db_path)
+        self.read_cache = ReportReadCache.for_path(db_path)
         
         self.init_database()
     
     def get_connection(self):
-        """Get database connection"""
+        """Get pooled (per-thread, WAL) database connection. Jangan di-close."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            return conn
+            return self.pool.get_connection()
         except Exception as e:
             print(f"❌ Cannot connect to database: {e}")
             return None
     
+    def _read_failed(self, fallback):
+        """Hasil kosong dari jalur gagal method @cached_read; tidak disimpan di read_cache"""
+        self.read_cache.mark_failed()
+        return fallback
+    
     def init_database(self):
         """Initialize database dengan struktur baru"""
         try:
             if os.path.exists(self.db_path):
                 print(f"ℹ️ Database exists: {os.path.getsize(self.db_path)} bytes")
             
+            # Skema dikelola oleh migrasi berversi (PRAGMA user_version)
+            version = DatabaseMigrator(self.db_path).migrate()
+            print(f"✅ Schema version: {version}")
+            
             conn = self.get_connection()
             if not conn:
-                conn = sqlite3.connect(self.db_path)
+                return False
             
             cursor = conn.cursor()
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS flood_reports (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    "Timestamp" TEXT,
-                    "Alamat" TEXT NOT NULL,
-                    "Tinggi Banjir" TEXT NOT NULL,
-                    "Nama Pelapor" TEXT NOT NULL,
-                    "No HP" TEXT,
-                    "IP Address" TEXT,
-                    "Photo URL" TEXT,
-                    "Status" TEXT DEFAULT 'pending',
-                    report_date DATE,
-                    report_time TIME,
-                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            conn.commit()
-            
             cursor.execute("PRAGMA table_info(flood_reports)")
             columns = cursor.fetchall()
             print(f"✅ Table 'flood_reports' ready with {len(columns)} columns")
@@ -61,7 +126,6 @@ class FloodReportModel:
             for col in columns:
                 print(f"  - {col[1]} ({col[2]})")
             
-            conn.close()
             return True
             
         except Exception as e:
@@ -70,64 +134,159 @@ class FloodReportModel:
             return False
     
     def create_report(self, alamat, tinggi_banjir, nama_pelapor, 
-                    no_hp=None, photo_url=None, ip_address=None):
-        """Create new flood report dengan waktu WIB"""
+                    no_hp=None, photo_url=None, ip_address=None,
+                    duplicate_of=None, similarity=None, deduplicate=None):
+        """Create new flood report dengan waktu WIB (opsional ditautkan ke laporan kanonik)"""
         try:
-            current_time_wib = datetime.now(self.tz_wib)
-            timestamp = current_time_wib.strftime("%Y-%m-%d %H:%M:%S")
-            report_date = current_time_wib.strftime("%Y-%m-%d")
-            report_time = current_time_wib.strftime("%H:%M:%S")
-            
-            print(f"📝 Creating report (WIB Time):")
-            print(f"  Timestamp: {timestamp}")
-            print(f"  Alamat: {alamat}")
-            print(f"  Tinggi Banjir: {tinggi_banjir}")
-            print(f"  Nama Pelapor: {nama_pelapor}")
-            print(f"  No HP: {no_hp}")
-            print(f"  Photo URL: {photo_url}")
-            print(f"  IP Address: {ip_address}")
+            values = self._new_report_values(alamat, tinggi_banjir, nama_pelapor,
+                                             no_hp, photo_url, ip_address)
+            link = (int(duplicate_of), float(similarity or 1.0)) if duplicate_of else None
+            
+            def job(conn):
+                report_id = conn.execute('''
+                    INSERT INTO flood_reports 
+                    ("Timestamp", "Alamat", "Tinggi Banjir", "Nama Pelapor", 
+                    "No HP", "IP Address", "Photo URL", "Status",
+                    report_date, report_time)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', values).lastrowid
+                # Cek duplikat di thread penulis tunggal -> find + add indeks
+                # tidak bisa diselingi laporan serupa dari sesi lain
+                job_link = deduplicate(report_id) if deduplicate is not None else None
+                job_link = job_link or link
+                # Tautan duplikat satu job dengan laporannya -> tidak pernah
+                # terlihat sebagai laporan kanonik oleh change feed
+                if job_link:
+                    conn.execute(f'''
+                        INSERT INTO {REPORT_DUPLICATES_TABLE} 
+                        (report_id, canonical_id, similarity, report_date, "Timestamp")
+                        VALUES (?, ?, ?, ?, ?)
+                    ''', (report_id, job_link[0], job_link[1], values[8], values[0]))
+                return report_id, job_link
+            
+            # Ditulis oleh thread penulis tunggal (group commit), bukan
+            # oleh thread sesi ini -> tidak ada rebutan write lock antar sesi
+            last_id, link = self.writer.submit(job).result(timeout=WRITE_TIMEOUT_SECONDS)
+            
+            self.read_cache.invalidate()
+            if link:
+                print(f"✅ Report created with ID: {last_id} (duplicate of {link[0]})")
+            else:
+                print(f"✅ Report created with ID: {last_id}")
             
-            conn = self.get_connection()
-            if not conn:
-                print("❌ No database connection")
-                return None
+            return last_id
             
-            cursor = conn.cursor()
+        except Exception as e:
+            print(f"❌ Error creating report: {e}")
+            traceback.print_exc()
+            return None
+    
+    def update_report_status(self, report_id, status):
+        """Ubah status laporan (mis. 'verified'); return True jika baris ditemukan"""
+        try:
+            _, rowcount = self.writer.execute(
+                'UPDATE flood_reports SET "Status" = ? WHERE id = ?',
+                (str(status), int(report_id))
+            ).result(timeout=WRITE_TIMEOUT_SECONDS)
+            
+            if rowcount == 0:
+                print(f"⚠️ Report {report_id} not found")
+                return False
             
-            cursor.execute('''
+            self.read_cache.invalidate()
+            print(f"✅ Report {report_id} status -> {status}")
+            return True
+            
+        except Exception as e:
+            print(f"❌ Error updating report status: {e}")
+            return False
+    
+    def create_reports_bulk(self, rows, chunk_size=10000):
+        """
+        Impor banyak laporan sekaligus (data lapangan offline / ekspor Google
+        Sheets). `rows` adalah iterable dict dengan kolom format Sheets
+        ("Alamat", "Tinggi Banjir", ...) atau nama argumen create_report.
+        Baris divalidasi per chunk secara vektor (pandas), lalu setiap chunk
+        dikirim sebagai satu job ke antrean penulis (satu transaksi per chunk)
+        sehingga create_report dari sesi lain tetap bisa menyelip di antara
+        chunk. Chunk berikutnya dinormalisasi selagi chunk sebelumnya ditulis.
+        Gagal di tengah = chunk yang sudah di-commit tetap tersimpan. Di dalam
+        satu chunk, id diberikan menurut urutan "Timestamp".
+        Return {'inserted', 'rejected', 'first_id', 'last_id'}; rentang id
+        bisa berisi laporan lain yang masuk di antara chunk.
+        """
+        result = {'inserted': 0, 'rejected': 0, 'first_id': None, 'last_id': None}
+        pending = None
+        
+        try:
+            for chunk in _iter_chunks(rows, chunk_size):
+                records, rejected = self._normalize_bulk_chunk(chunk)
+                result['rejected'] += rejected
+                
+                if pending is not None:
+                    self._finish_bulk_chunk(pending, result)
+                    pending = None
+                if records:
+                    pending = (self.writer.submit(self._bulk_insert_job(records)), len(records))
+            
+            if pending is not None:
+                self._finish_bulk_chunk(pending, result)
+            
+            if result['inserted']:
+                self.read_cache.invalidate()
+            print(f"✅ Bulk import: {result['inserted']} inserted, {result['rejected']} rejected "
+                  f"(id {result['first_id']}-{result['last_id']})")
+            return result
+            
+        except Exception as e:
+            # Chunk yang sudah dikirim tetap di-commit oleh penulis; ikut dihitung
+            if pending is not None:
+                try:
+                    self._finish_bulk_chunk(pending, result)
+                except Exception:
+                    pass
+            if result['inserted']:
+                self.read_cache.invalidate()
+            print(f"❌ Error in bulk import after {result['inserted']} rows (failed chunk rolled back): {e}")
+            traceback.print_exc()
+            return result
+    
+    @staticmethod
+    def _bulk_insert_job(records):
+        """Job antrean penulis untuk satu chunk impor massal"""
+        # Urut "Timestamp" -> sisipan ke index Timestamp/report_date hampir
+        # berurutan (jauh lebih sedikit halaman B-tree yang berpindah)
+        records.sort(key=itemgetter(0))
+        
+        def job(conn):
+            # Agregat & indeks FTS diperbarui sekali per chunk (bukan trigger
+            # per baris); trigger dilepas dan dipasang lagi di SAVEPOINT job
+            # ini sehingga job lain tidak pernah melihat tabel tanpa trigger
+            suspend_report_insert_triggers(conn)
+            conn.executemany('''
                 INSERT INTO flood_reports 
                 ("Timestamp", "Alamat", "Tinggi Banjir", "Nama Pelapor", 
                 "No HP", "IP Address", "Photo URL", "Status",
                 report_date, report_time)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                timestamp,
-                str(alamat) if alamat else "",
-                str(tinggi_banjir) if tinggi_banjir else "",
-                str(nama_pelapor) if nama_pelapor else "",
-                str(no_hp) if no_hp else None,
-                str(ip_address) if ip_address else "unknown",
-                str(photo_url) if photo_url else None,
-                'pending',
-                report_date,
-                report_time
-            ))
-            
-            conn.commit()
-            last_id = cursor.lastrowid
-            print(f"✅ Report created with ID: {last_id}")
-            
-            cursor.execute('SELECT COUNT(*) FROM flood_reports')
-            count = cursor.fetchone()[0]
-            print(f"✅ Total reports in database: {count}")
-            
-            conn.close()
-            return last_id
-            
-        except Exception as e:
-            print(f"❌ Error creating report: {e}")
-            traceback.print_exc()
-            return None
+            ''', records)
+            
+            # id AUTOINCREMENT berurutan: satu executemany di thread penulis tunggal
+            last_id = conn.execute('SELECT last_insert_rowid()').fetchone()[0]
+            first_id = last_id - len(records) + 1
+            resume_report_insert_triggers(conn, first_id, last_id)
+            return first_id, last_id
+        return job
+    
+    @staticmethod
+    def _finish_bulk_chunk(pending, result):
+        """Tunggu commit satu chunk lalu catat ke result"""
+        future, count = pending
+        first_id, last_id = future.result(timeout=WRITE_TIMEOUT_SECONDS)
+        if result['first_id'] is None:
+            result['first_id'] = first_id
+        result['last_id'] = last_id
+        result['inserted'] += count
     
     def get_today_reports_count_by_ip(self, ip_address):
         """Count today's reports by IP address"""
@@ -139,13 +298,9 @@ class FloodReportModel:
                 return 0
             
             cursor = conn.cursor()
-            cursor.execute('''
-                SELECT COUNT(*) FROM flood_reports 
-                WHERE "IP Address" = ? AND report_date = ?
-            ''', (ip_address, today))
+            cursor.execute(IP_DAY_COUNT_SQL, (ip_address, today))
             
             count = cursor.fetchone()[0]
-            conn.close()
             
             print(f"📊 Today's reports for IP {ip_address}: {count}")
             return count
@@ -154,146 +309,364 @@ class FloodReportModel:
             print(f"❌ Error counting reports: {e}")
             return 0
     
-    def get_today_reports(self):
-        """Get today's reports"""
+    def _history_source(self, conn):
+        """Tabel utama + arsip tahunan (view flood_reports_all) untuk query historis"""
+        try:
+            return self.archiver.attach_archives(conn)
+        except Exception as e:
+            print(f"⚠️ Archives not attached: {e}")
+            return 'flood_reports'
+    
+    def _fetch_reports(self, conn, where_sql, params, as_frame=False, source='flood_reports'):
+        """
+        Query laporan sebagai list FloodReport (tanpa salinan dict per baris)
+        atau, jika as_frame=True, langsung sebagai pandas DataFrame kolom Sheets.
+        """
+        cursor = conn.cursor()
+        cursor.row_factory = None if as_frame else FloodReport.row_factory
+        cursor.execute(reports_sql(where_sql, source), params)
+        rows = cursor.fetchall()
+        
+        if as_frame:
+            return pd.DataFrame.from_records(rows, columns=REPORT_COLUMNS)
+        return rows
+    
+    @cached_read
+    def get_today_reports(self, as_frame=False):
+        """Get today's reports (list FloodReport, atau DataFrame jika as_frame=True)"""
         try:
             today = datetime.now(self.tz_wib).strftime("%Y-%m-%d")
             
             conn = self.get_connection()
             if not conn:
-                return []
+                return self._read_failed(self._empty_reports(as_frame))
             
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT * FROM flood_reports 
-                WHERE report_date = ?
-                ORDER BY "Timestamp" DESC
-            ''', (today,))
-            
-            rows = cursor.fetchall()
-            conn.close()
-            
-            reports = []
-            for row in rows:
-                reports.append({
-                    'id': row['id'],
-                    'Alamat': row['Alamat'],
-                    'Tinggi Banjir': row['Tinggi Banjir'],
-                    'Nama Pelapor': row['Nama Pelapor'],
-                    'No HP': row['No HP'],
-                    'IP Address': row['IP Address'],
-                    'Photo URL': row['Photo URL'],
-                    'Status': row['Status'],
-                    'report_date': row['report_date'],
-                    'report_time': row['report_time'],
-                    'Timestamp': row['Timestamp']
-                })
+            reports = self._fetch_reports(conn, TODAY_REPORTS_WHERE, (today,), as_frame)
             
             print(f"📊 Today's reports: {len(reports)}")
             return reports
             
         except Exception as e:
             print(f"❌ Error getting today's reports: {e}")
-            return []
+            return self._read_failed(self._empty_reports(as_frame))
     
-    def get_month_reports(self):
-        """Get this month's reports"""
+    @cached_read
+    def get_month_reports(self, as_frame=False):
+        """Get this month's reports (list FloodReport, atau DataFrame jika as_frame=True)"""
         try:
             current_month = datetime.now(self.tz_wib).strftime("%Y-%m")
+            month_start, next_month_start = month_date_range(current_month)
             
             conn = self.get_connection()
             if not conn:
-                return []
+                return self._read_failed(self._empty_reports(as_frame))
             
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT * FROM flood_reports 
-                WHERE strftime('%Y-%m', report_date) = ?
-                ORDER BY "Timestamp" DESC
-            ''', (current_month,))
-            
-            rows = cursor.fetchall()
-            conn.close()
-            
-            reports = []
-            for row in rows:
-                reports.append({
-                    'id': row['id'],
-                    'Alamat': row['Alamat'],
-                    'Tinggi Banjir': row['Tinggi Banjir'],
-                    'Nama Pelapor': row['Nama Pelapor'],
-                    'No HP': row['No HP'],
-                    'IP Address': row['IP Address'],
-                    'Photo URL': row['Photo URL'],
-                    'Status': row['Status'],
-                    'report_date': row['report_date'],
-                    'report_time': row['report_time'],
-                    'Timestamp': row['Timestamp']
-                })
+            reports = self._fetch_reports(conn, MONTH_REPORTS_WHERE, (month_start, next_month_start), as_frame)
             
             print(f"📊 Month's reports: {len(reports)}")
             return reports
             
         except Exception as e:
             print(f"❌ Error getting month's reports: {e}")
-            return []
+            return self._read_failed(self._empty_reports(as_frame))
     
-    def get_all_reports(self):
-        """Get all reports"""
+    def get_all_reports(self, as_frame=False):
+        """Get all reports termasuk arsip (list FloodReport, atau DataFrame jika as_frame=True)"""
         try:
             conn = self.get_connection()
             if not conn:
-                return []
-            
-            cursor = conn.cursor()
-            cursor.execute('SELECT * FROM flood_reports ORDER BY "Timestamp" DESC')
-            
-            rows = cursor.fetchall()
-            conn.close()
-            
-            reports = []
-            for row in rows:
-                reports.append({
-                    'id': row['id'],
-                    'Alamat': row['Alamat'],
-                    'Tinggi Banjir': row['Tinggi Banjir'],
-                    'Nama Pelapor': row['Nama Pelapor'],
-                    'No HP': row['No HP'],
-                    'IP Address': row['IP Address'],
-                    'Photo URL': row['Photo URL'],
-                    'Status': row['Status'],
-                    'Timestamp': row['Timestamp']
-                })
+                return self._empty_reports(as_frame)
             
-            return reports
+            source = self._history_source(conn)
+            return self._fetch_reports(conn, ALL_REPORTS_WHERE, (), as_frame, source)
             
         except Exception as e:
             print(f"❌ Error getting all reports: {e}")
-            return []
+            return self._empty_reports(as_frame)
     
-    def get_monthly_statistics(self):
-        """Get monthly statistics"""
+    def search_reports(self, query, scope='all', limit=50, as_frame=False):
+        """
+        Cari laporan berdasarkan Alamat / Nama Pelapor (FTS5), diurutkan bm25.
+        Setiap kata dicocokkan sebagai prefix ("jl merd" -> Jl. Merdeka).
+        """
+        terms = _fts_query(query)
+        if not terms:
+            return self._empty_reports(as_frame)
+        
         try:
-            current_month = datetime.now(self.tz_wib).strftime("%Y-%m")
-            
             conn = self.get_connection()
             if not conn:
-                return {'total_reports': 0, 'month': current_month}
+                return self._empty_reports(as_frame)
+            
+            conditions = []
+            params = [terms]
+            start, end = self._scope_timestamp_range(scope)
+            if start is not None:
+                conditions.append('"Timestamp" >= ? AND "Timestamp" < ?')
+                params.extend([start, end])
+            params.append(int(limit))
+            
+            where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+            
+            # Alamat diberi bobot lebih besar daripada Nama Pelapor
+            return self._fetch_reports(conn, f'''
+                JOIN (
+                    SELECT rowid AS match_id,
+                        bm25({REPORT_FTS_TABLE}, 2.0, 1.0) AS score
+                    FROM {REPORT_FTS_TABLE}
+                    WHERE {REPORT_FTS_TABLE} MATCH ?
+                ) AS matches ON matches.match_id = flood_reports.id
+                {where}
+                ORDER BY matches.score, "Timestamp" DESC
+                LIMIT ?
+            ''', params, as_frame)
             
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT COUNT(*) FROM flood_reports 
-                WHERE strftime('%Y-%m', report_date) = ?
-            ''', (current_month,))
+        except Exception as e:
+            print(f"❌ Error searching reports: {e}")
+            return self._empty_reports(as_frame)
+    
+    @cached_read
+    def get_monthly_statistics(self, collapse_duplicates=False):
+        """Get monthly statistics (dari tabel agregat report_counts_monthly)"""
+        try:
+            current_month = datetime.now(self.tz_wib).strftime("%Y-%m")
             
-            total = cursor.fetchone()[0]
-            conn.close()
+            conn = self.get_connection()
+            if not conn:
+                return self._read_failed({'total_reports': 0, 'month': current_month})
+            
+            rows = conn.execute('''
+                SELECT status, report_count FROM report_counts_monthly 
+                WHERE year_month = ?
+            ''', (current_month,)).fetchall()
+            
+            by_status = {row['status']: row['report_count'] for row in rows}
+            if collapse_duplicates:
+                # Agregat mencakup semua laporan -> kurangi duplikat bulan ini per status
+                month_start, next_month_start = month_date_range(current_month)
+                duplicates = conn.execute(f'''
+                    SELECT COALESCE(r."Status", 'pending') AS status, COUNT(*) AS report_count
+                    FROM {REPORT_DUPLICATES_TABLE} d
+                    JOIN flood_reports r ON r.id = d.report_id
+                    WHERE d.report_date >= ? AND d.report_date < ?
+                    GROUP BY 1
+                ''', (month_start, next_month_start)).fetchall()
+                for row in duplicates:
+                    by_status[row['status']] = by_status.get(row['status'], 0) - row['report_count']
+            by_status = {status: count for status, count in by_status.items() if count}
             
             return {
-                'total_reports': total,
+                'total_reports': sum(by_status.values()),
+                'by_status': by_status,
                 'month': current_month
             }
             
         except Exception as e:
             print(f"❌ Error getting statistics: {e}")
-            return {'total_reports': 0, 'month': ''}
\ No newline at end of file
+            return self._read_failed({'total_reports': 0, 'month': ''})
+    
+    @cached_read
+    def get_report_histogram(self, start, end, bucket='day', collapse_duplicates=False):
+        """
+        Jumlah laporan per bucket ('hour' | 'day' | 'week' | 'month') untuk
+        rentang [start, end) dengan satu query GROUP BY. Bucket kosong diisi 0.
+        Bucket 'week' dimulai hari Senin. Return {'bucket', 'starts',
+        'labels', 'counts', 'total'}; starts/counts berupa array NumPy.
+        """
+        if bucket not in HISTOGRAM_BUCKETS:
+            raise ValueError(f"bucket harus salah satu dari {sorted(HISTOGRAM_BUCKETS)}")
+        
+        unit, step = HISTOGRAM_BUCKETS[bucket]
+        starts = _bucket_starts(start, end, bucket)
+        counts = np.zeros(len(starts), dtype=np.int64)
+        result = {
+            'bucket': bucket,
+            'starts': starts,
+            'labels': [str(label) for label in np.datetime_as_string(starts)],
+            'counts': counts,
+            'total': 0
+        }
+        if len(starts) == 0:
+            return result
+        
+        # Batas query = tepi bucket pertama & setelah bucket terakhir
+        lower = starts[0]
+        upper = starts[-1] + np.timedelta64(step, unit)
+        
+        try:
+            conn = self.get_connection()
+            if not conn:
+                return self._read_failed(result)
+            
+            if bucket == 'hour':
+                # Resolusi jam hanya ada di baris laporan (idx_flood_reports_timestamp)
+                not_duplicate = f'AND {NOT_DUPLICATE_SQL}' if collapse_duplicates else ''
+                rows = conn.execute(f'''
+                    SELECT substr("Timestamp", 1, 13) AS bucket, COUNT(*)
+                    FROM {self._history_source(conn)} 
+                    WHERE "Timestamp" >= ? AND "Timestamp" < ? {not_duplicate}
+                    GROUP BY bucket
+                ''', (_sql_datetime(lower), _sql_datetime(upper))).fetchall()
+                keys = [row[0].replace(' ', 'T') for row in rows]
+            else:
+                # Hari/minggu/bulan dari agregat harian (primary key report_date)
+                day_range = (str(lower.astype('datetime64[D]')), str(upper.astype('datetime64[D]')))
+                rows = conn.execute(f'''
+                    SELECT {HISTOGRAM_DAY_KEYS[bucket]} AS bucket, SUM(report_count)
+                    FROM report_counts_daily 
+                    WHERE report_date >= ? AND report_date < ?
+                    GROUP BY bucket
+                ''', day_range).fetchall()
+                if collapse_duplicates:
+                    # Agregat menghitung semua laporan; kurangi duplikat per bucket
+                    rows += [(row[0], -row[1]) for row in conn.execute(f'''
+                        SELECT {HISTOGRAM_DAY_KEYS[bucket]} AS bucket, COUNT(*)
+                        FROM {REPORT_DUPLICATES_TABLE} 
+                        WHERE report_date >= ? AND report_date < ?
+                        GROUP BY bucket
+                    ''', day_range)]
+                keys = [row[0] for row in rows]
+            
+            if rows:
+                keys = np.array(keys, dtype=f'datetime64[{unit}]')
+                values = np.array([row[1] or 0 for row in rows], dtype=np.int64)
+                index = np.searchsorted(starts, keys)
+                valid = (index < len(starts)) & (starts[np.minimum(index, len(starts) - 1)] == keys)
+                np.add.at(counts, index[valid], values[valid])
+            
+            result['total'] = int(counts.sum())
+            return result
+            
+        except Exception as e:
+            print(f"❌ Error getting report histogram: {e}")
+            return self._read_failed(result)
+    
+    # ============ KEYSET PAGINATION ============
+    
+    @cached_read
+    def get_reports_page(self, scope='all', page_size=20, cursor=None, collapse_duplicates=False):
+        """
+        Satu halaman laporan terbaru dengan keyset pagination.
+        cursor = (Timestamp, id) baris terakhir halaman sebelumnya.
+        Return {'reports': [...], 'next_cursor': (Timestamp, id) atau None}
+        """
+        try:
+            conn = self.get_connection()
+            if not conn:
+                return self._read_failed({'reports': [], 'next_cursor': None})
+            
+            conditions = []
+            params = []
+            
+            # Filter range pada "Timestamp" (bukan report_date) agar filter dan
+            # ORDER BY sama-sama dilayani idx_flood_reports_timestamp
+            start, end = self._scope_timestamp_range(scope)
+            if start is not None:
+                conditions.append('"Timestamp" >= ? AND "Timestamp" < ?')
+                params.extend([start, end])
+            
+            if cursor is not None:
+                conditions.append('("Timestamp", id) < (?, ?)')
+                params.extend([cursor[0], cursor[1]])
+            
+            if collapse_duplicates:
+                conditions.append(NOT_DUPLICATE_SQL)
+            
+            where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+            params.append(int(page_size) + 1)
+            
+            # Scope 'all' mencakup arsip; view UNION ALL tetap memakai index
+            # "Timestamp" tiap file (MERGE), jadi keyset tetap murah
+            source = self._history_source(conn) if scope == 'all' else 'flood_reports'
+            reports = self._fetch_reports(conn, f'''
+                {where}
+                ORDER BY "Timestamp" DESC, id DESC
+                LIMIT ?
+            ''', params, source=source)
+            
+            has_more = len(reports) > page_size
+            reports = reports[:page_size]
+            
+            next_cursor = (reports[-1].timestamp, reports[-1].id) if has_more and reports else None
+            return {'reports': reports, 'next_cursor': next_cursor}
+            
+        except Exception as e:
+            print(f"❌ Error getting reports page: {e}")
+            return self._read_failed({'reports': [], 'next_cursor': None})
+    
+    def get_reports_since(self, last_id, scope='today', limit=500, collapse_duplicates=False):
+        """
+        Laporan dengan id > last_id (urut id naik) untuk change feed. Hanya
+        baris baru yang dibaca (range primary key), jadi biaya per polling
+        sebanding dengan jumlah laporan baru.
+        """
+        try:
+            conn = self.get_connection()
+            if not conn:
+                return []
+            
+            last_id = int(last_id or 0)
+            conditions = ['id > ?']
+            params = [last_id]
+            start, end = self._scope_timestamp_range(scope)
+            if start is not None:
+                # Setelah pemuatan awal, unary + mencegah index "Timestamp"
+                # dipakai sehingga SQLite membaca range id (hanya baris baru)
+                ts = '+"Timestamp"' if last_id else '"Timestamp"'
+                conditions.append(f'{ts} >= ? AND {ts} < ?')
+                params.extend([start, end])
+            if collapse_duplicates:
+                conditions.append(NOT_DUPLICATE_SQL)
+            params.append(int(limit))
+            
+            return self._fetch_reports(conn, f'''
+                WHERE {' AND '.join(conditions)}
+                ORDER BY id
+                LIMIT ?
+            ''', params)
+            
+        except Exception as e:
+            print(f"❌ Error getting reports since {last_id}: {e}")
+            return []
+    
+    @cached_read
+    def get_reports_summary(self, scope='all', collapse_duplicates=False):
+        """Ringkasan (jumlah, lokasi & pelapor unik, laporan hari ini) tanpa memuat baris"""
+        empty = {'total_reports': 0, 'unique_locations': 0, 'unique_reporters': 0, 'today_reports': 0}
+        try:
+            conn = self.get_connection()
+            if not conn:
+                return self._read_failed(empty)
+            
+            today_start, today_end = self._scope_timestamp_range('today')
+            start, end = self._scope_timestamp_range(scope)
+            conditions = ['"Timestamp" >= ? AND "Timestamp" < ?'] if start is not None else []
+            if collapse_duplicates:
+                conditions.append(NOT_DUPLICATE_SQL)
+            where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+            params = [today_start, today_end] + ([start, end] if start is not None else [])
+            source = self._history_source(conn) if scope == 'all' else 'flood_reports'
+            
+            row = conn.execute(f'''
+                SELECT COUNT(*),
+                    COUNT(DISTINCT "Alamat"),
+                    COUNT(DISTINCT "Nama Pelapor"),
+                    SUM(CASE WHEN "Timestamp" >= ? AND "Timestamp" < ? THEN 1 ELSE 0 END)
+                FROM {source} 
+                {where}
+            ''', params).fetchone()
+            
+            return {
+                'total_reports': row[0],
+                'unique_locations': row[1],
+                'unique_reporters': row[2],
+                'today_reports': row[3] or 0
+            }
+            
+        except Exception as e:
+            print(f"❌ Error getting reports summary: {e}")
+            return self._read_failed(empty)
+    
+    def export_reports(self, output, fmt='csv', start_date=None, end_date=None):
+        """Stream laporan (termasuk arsip) ke path / file biner; return jumlah baris"""
+        return ReportExporter(self.db_path).export(output, fmt, start_date, end_date)
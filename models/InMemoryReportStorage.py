@@ -0,0 +1,392 @@
+import re
+import threading
+import traceback
+from datetime import datetime, timedelta
+from operator import itemgetter
+import numpy as np
+import pandas as pd
+
+from models.FloodReport import FloodReport, REPORT_COLUMNS
+from models.ReportExporter import ReportExporter, EXPORT_COLUMNS
+from models.ReportStorage import (
+    ReportStorage,
+    HISTOGRAM_BUCKETS,
+    _iter_chunks,
+    _to_datetime64,
+    _bucket_starts
+)
+
+# Kolom FloodReport yang ikut diekspor (tanpa IP Address)
+_export_row = itemgetter(*(REPORT_COLUMNS.index(col) for col in EXPORT_COLUMNS))
+
+def _bound(value):
+    """Batas range (str / datetime / datetime64) -> datetime64[s]"""
+    if isinstance(value, np.datetime64):
+        return value.astype('datetime64[s]')
+    return _to_datetime64(value)
+
+class InMemoryReportStorage(ReportStorage):
+    """
+    Backend penyimpanan laporan di memori untuk uji beban dan benchmark.
+
+    Laporan disimpan sebagai list FloodReport (id = posisi + 1) ditambah
+    array kolom NumPy ("Timestamp", "Alamat", "Nama Pelapor") untuk query
+    range dan agregat vektor. Urutan (Timestamp, id) disimpan sebagai array
+    posisi sehingga range, keyset pagination dan histogram cukup dengan
+    searchsorted. Hitungan per IP/hari dan per bulan/status dijaga seperti
+    tabel agregat SQLite. Data hilang saat proses berhenti.
+    """
+
+    def __init__(self, capacity=1024):
+        super().__init__()
+        self._lock = threading.RLock()
+
+        self._rows = []
+        self._ts = np.empty(capacity, dtype='datetime64[s]')
+        self._alamat = np.empty(capacity, dtype=object)
+        self._nama = np.empty(capacity, dtype=object)
+        self._duplicate = np.zeros(capacity, dtype=bool)
+        self._max_ts = None
+
+        # Posisi terurut (Timestamp, id); diperbarui malas saat dibaca
+        self._order = np.empty(0, dtype=np.int64)
+        self._sorted_ts = np.empty(0, dtype='datetime64[s]')
+        self._order_dirty = False
+
+        self._ip_day_counts = {}    # (IP Address, report_date) -> jumlah
+        self._month_counts = {}     # (YYYY-MM, Status) -> jumlah
+        self._duplicate_of = {}     # id duplikat -> (id kanonik, kemiripan)
+
+        print("✅ In-memory report storage ready")
+
+    # ============ PENYIMPANAN ARRAY ============
+
+    def _reserve(self, size):
+        capacity = len(self._ts)
+        if size <= capacity:
+            return
+        capacity = max(size, capacity * 2)
+        count = len(self._rows)
+        for name in ('_ts', '_alamat', '_nama', '_duplicate'):
+            old = getattr(self, name)
+            grown = np.empty(capacity, dtype=old.dtype)
+            grown[:count] = old[:count]
+            setattr(self, name, grown)
+
+    def _append(self, records):
+        """Tambah tuple urutan insert create_report; return (first_id, last_id)"""
+        with self._lock:
+            first = len(self._rows)
+            last = first + len(records)
+            ts = np.array([record[0] for record in records], dtype='datetime64[s]')
+
+            # Laporan live selalu terbaru -> cukup tambah di ujung urutan;
+            # impor data lama memicu pengurutan ulang saat dibaca berikutnya
+            if (self._max_ts is not None and ts[0] < self._max_ts) or np.any(ts[1:] < ts[:-1]):
+                self._order_dirty = True
+            batch_max = ts.max()
+            self._max_ts = batch_max if self._max_ts is None else max(self._max_ts, batch_max)
+
+            self._reserve(last)
+            self._ts[first:last] = ts
+            self._alamat[first:last] = [record[1] for record in records]
+            self._nama[first:last] = [record[3] for record in records]
+            self._duplicate[first:last] = False
+
+            for report_id, record in enumerate(records, start=first + 1):
+                self._rows.append(tuple.__new__(FloodReport, (report_id,) + tuple(record[1:]) + (record[0],)))
+                ip_key = (record[5], record[8])
+                self._ip_day_counts[ip_key] = self._ip_day_counts.get(ip_key, 0) + 1
+                month_key = (record[8][:7], record[7])
+                self._month_counts[month_key] = self._month_counts.get(month_key, 0) + 1
+
+            return first + 1, last
+
+    def _sorted(self):
+        """(posisi, Timestamp) terurut (Timestamp, id) naik untuk semua laporan"""
+        count = len(self._rows)
+        if self._order_dirty:
+            self._order = np.argsort(self._ts[:count], kind='stable')
+            self._sorted_ts = self._ts[self._order]
+            self._order_dirty = False
+        elif len(self._order) < count:
+            tail = np.arange(len(self._order), count)
+            self._order = np.concatenate([self._order, tail])
+            self._sorted_ts = np.concatenate([self._sorted_ts, self._ts[tail]])
+        return self._order, self._sorted_ts
+
+    def _range(self, start=None, end=None):
+        """Posisi & Timestamp laporan dengan start <= Timestamp < end, urut naik"""
+        order, sorted_ts = self._sorted()
+        lo = 0 if start is None else int(np.searchsorted(sorted_ts, _bound(start), 'left'))
+        hi = len(order) if end is None else int(np.searchsorted(sorted_ts, _bound(end), 'left'))
+        return order[lo:hi], sorted_ts[lo:hi]
+
+    def _canonical(self, positions, *columns):
+        """Buang posisi laporan duplikat (beserta kolom yang sejajar)"""
+        keep = ~self._duplicate[positions]
+        return (positions[keep],) + tuple(column[keep] for column in columns)
+
+    def _select(self, positions, as_frame=False):
+        rows = list(map(self._rows.__getitem__, positions.tolist()))
+        if as_frame:
+            return pd.DataFrame.from_records(rows, columns=REPORT_COLUMNS)
+        return rows
+
+    # ============ TULIS ============
+
+    def create_report(self, alamat, tinggi_banjir, nama_pelapor,
+                    no_hp=None, photo_url=None, ip_address=None,
+                    duplicate_of=None, similarity=None, deduplicate=None):
+        """Create new flood report dengan waktu WIB (opsional ditautkan ke laporan kanonik)"""
+        try:
+            values = self._new_report_values(alamat, tinggi_banjir, nama_pelapor,
+                                             no_hp, photo_url, ip_address)
+            link = (int(duplicate_of), float(similarity or 1.0)) if duplicate_of else None
+            with self._lock:
+                report_id, _ = self._append([values])
+                # Di bawah lock yang sama dengan append, seperti job penulis SQLite
+                if deduplicate is not None:
+                    link = deduplicate(report_id) or link
+                if link:
+                    self._duplicate[report_id - 1] = True
+                    self._duplicate_of[report_id] = link
+
+            if link:
+                print(f"✅ Report created with ID: {report_id} (duplicate of {link[0]})")
+            else:
+                print(f"✅ Report created with ID: {report_id}")
+            return report_id
+
+        except Exception as e:
+            print(f"❌ Error creating report: {e}")
+            traceback.print_exc()
+            return None
+
+    def create_reports_bulk(self, rows, chunk_size=10000):
+        """Impor massal; semua chunk divalidasi dulu lalu ditambahkan sekaligus"""
+        result = {'inserted': 0, 'rejected': 0, 'first_id': None, 'last_id': None}
+        try:
+            records = []
+            for chunk in _iter_chunks(rows, chunk_size):
+                valid, rejected = self._normalize_bulk_chunk(chunk)
+                records.extend(valid)
+                result['rejected'] += rejected
+
+            if records:
+                result['first_id'], result['last_id'] = self._append(records)
+                result['inserted'] = len(records)
+
+            print(f"✅ Bulk import: {result['inserted']} inserted, {result['rejected']} rejected "
+                  f"(id {result['first_id']}-{result['last_id']})")
+            return result
+
+        except Exception as e:
+            print(f"❌ Error in bulk import (rolled back): {e}")
+            traceback.print_exc()
+            return {'inserted': 0, 'rejected': result['rejected'], 'first_id': None, 'last_id': None}
+
+    def update_report_status(self, report_id, status):
+        """Ubah status laporan; return True jika laporan ditemukan"""
+        try:
+            position = int(report_id) - 1
+            with self._lock:
+                if not 0 <= position < len(self._rows):
+                    print(f"⚠️ Report {report_id} not found")
+                    return False
+
+                old = self._rows[position]
+                self._rows[position] = old._replace(status=str(status))
+
+                month = old.report_date[:7]
+                self._month_counts[(month, old.status)] -= 1
+                new_key = (month, str(status))
+                self._month_counts[new_key] = self._month_counts.get(new_key, 0) + 1
+
+            print(f"✅ Report {report_id} status -> {status}")
+            return True
+
+        except Exception as e:
+            print(f"❌ Error updating report status: {e}")
+            return False
+
+    # ============ HITUNG & AGREGAT ============
+
+    def get_today_reports_count_by_ip(self, ip_address):
+        """Count today's reports by IP address"""
+        today = datetime.now(self.tz_wib).strftime("%Y-%m-%d")
+        with self._lock:
+            count = self._ip_day_counts.get((ip_address, today), 0)
+        print(f"📊 Today's reports for IP {ip_address}: {count}")
+        return count
+
+    def get_monthly_statistics(self, collapse_duplicates=False):
+        """Get monthly statistics (dari hitungan per bulan/status)"""
+        current_month = datetime.now(self.tz_wib).strftime("%Y-%m")
+        with self._lock:
+            by_status = {
+                status: count for (month, status), count in self._month_counts.items()
+                if month == current_month
+            }
+            if collapse_duplicates:
+                for report_id in self._duplicate_of:
+                    report = self._rows[report_id - 1]
+                    if report.report_date.startswith(current_month):
+                        by_status[report.status] = by_status.get(report.status, 0) - 1
+            by_status = {status: count for status, count in by_status.items() if count}
+        return {
+            'total_reports': sum(by_status.values()),
+            'by_status': by_status,
+            'month': current_month
+        }
+
+    def get_report_histogram(self, start, end, bucket='day', collapse_duplicates=False):
+        """Jumlah laporan per bucket untuk [start, end); format sama dengan FloodReportModel"""
+        if bucket not in HISTOGRAM_BUCKETS:
+            raise ValueError(f"bucket harus salah satu dari {sorted(HISTOGRAM_BUCKETS)}")
+
+        unit, step = HISTOGRAM_BUCKETS[bucket]
+        starts = _bucket_starts(start, end, bucket)
+        counts = np.zeros(len(starts), dtype=np.int64)
+        result = {
+            'bucket': bucket,
+            'starts': starts,
+            'labels': [str(label) for label in np.datetime_as_string(starts)],
+            'counts': counts,
+            'total': 0
+        }
+        if len(starts) == 0:
+            return result
+
+        with self._lock:
+            positions, ts = self._range(starts[0], starts[-1] + np.timedelta64(step, unit))
+            if collapse_duplicates:
+                positions, ts = self._canonical(positions, ts)
+
+        # Bucket bersebelahan -> indeks bucket = tepi terakhir <= Timestamp
+        index = np.searchsorted(starts.astype('datetime64[s]'), ts, side='right') - 1
+        counts += np.bincount(index, minlength=len(starts))
+        result['total'] = int(counts.sum())
+        return result
+
+    def get_reports_summary(self, scope='all', collapse_duplicates=False):
+        """Ringkasan (jumlah, lokasi & pelapor unik, laporan hari ini)"""
+        today_start, today_end = self._scope_timestamp_range('today')
+        with self._lock:
+            positions, ts = self._range(*self._scope_timestamp_range(scope))
+            if collapse_duplicates:
+                positions, ts = self._canonical(positions, ts)
+            return {
+                'total_reports': len(positions),
+                'unique_locations': len(pd.unique(self._alamat[positions])),
+                'unique_reporters': len(pd.unique(self._nama[positions])),
+                'today_reports': int(np.count_nonzero((ts >= _bound(today_start)) & (ts < _bound(today_end))))
+            }
+
+    # ============ QUERY RANGE ============
+
+    def get_today_reports(self, as_frame=False):
+        """Get today's reports (list FloodReport, atau DataFrame jika as_frame=True)"""
+        with self._lock:
+            positions, _ = self._range(*self._scope_timestamp_range('today'))
+            reports = self._select(positions[::-1], as_frame)
+        print(f"📊 Today's reports: {len(reports)}")
+        return reports
+
+    def get_month_reports(self, as_frame=False):
+        """Get this month's reports (list FloodReport, atau DataFrame jika as_frame=True)"""
+        with self._lock:
+            positions, _ = self._range(*self._scope_timestamp_range('month'))
+            reports = self._select(positions[::-1], as_frame)
+        print(f"📊 Month's reports: {len(reports)}")
+        return reports
+
+    def get_all_reports(self, as_frame=False):
+        """Get all reports (list FloodReport, atau DataFrame jika as_frame=True)"""
+        with self._lock:
+            positions, _ = self._range()
+            return self._select(positions[::-1], as_frame)
+
+    def search_reports(self, query, scope='all', limit=50, as_frame=False):
+        """
+        Cari laporan berdasarkan Alamat / Nama Pelapor. Setiap kata harus
+        cocok sebagai awal kata; kecocokan di Alamat berbobot 2, di Nama
+        Pelapor 1, lalu laporan terbaru lebih dulu.
+        """
+        tokens = re.findall(r'\w+', str(query or '').lower())
+        if not tokens:
+            return self._empty_reports(as_frame)
+
+        with self._lock:
+            positions, _ = self._range(*self._scope_timestamp_range(scope))
+            alamat = pd.Series(self._alamat[positions], dtype=object).str.lower()
+            nama = pd.Series(self._nama[positions], dtype=object).str.lower()
+
+            matched = np.ones(len(positions), dtype=bool)
+            score = np.zeros(len(positions), dtype=np.int64)
+            for token in tokens:
+                pattern = r'(?:^|\W)' + re.escape(token)
+                in_alamat = alamat.str.contains(pattern, regex=True, na=False).to_numpy(dtype=bool)
+                in_nama = nama.str.contains(pattern, regex=True, na=False).to_numpy(dtype=bool)
+                matched &= in_alamat | in_nama
+                score += 2 * in_alamat + in_nama
+
+            hits = positions[matched]
+            # Kunci terakhir lexsort = utama: skor tertinggi, lalu terbaru
+            rank = np.lexsort((-np.arange(len(hits)), -score[matched]))
+            return self._select(hits[rank[:int(limit)]], as_frame)
+
+    def get_reports_page(self, scope='all', page_size=20, cursor=None, collapse_duplicates=False):
+        """
+        Satu halaman laporan terbaru dengan keyset pagination.
+        cursor = (Timestamp, id) baris terakhir halaman sebelumnya.
+        """
+        with self._lock:
+            positions, ts = self._range(*self._scope_timestamp_range(scope))
+
+            if cursor is not None:
+                cursor_ts = _bound(cursor[0])
+                lo = int(np.searchsorted(ts, cursor_ts, 'left'))
+                hi = int(np.searchsorted(ts, cursor_ts, 'right'))
+                # Timestamp sama -> urut id naik (posisi = id - 1)
+                positions = positions[:lo + int(np.searchsorted(positions[lo:hi], int(cursor[1]) - 1, 'left'))]
+
+            if collapse_duplicates:
+                positions, = self._canonical(positions)
+
+            reports = self._select(positions[::-1][:int(page_size) + 1])
+
+        has_more = len(reports) > page_size
+        reports = reports[:page_size]
+        next_cursor = (reports[-1].timestamp, reports[-1].id) if has_more and reports else None
+        return {'reports': reports, 'next_cursor': next_cursor}
+
+    def get_reports_since(self, last_id, scope='today', limit=500, collapse_duplicates=False):
+        """Laporan dengan id > last_id (urut id naik) untuk change feed"""
+        with self._lock:
+            first = max(int(last_id or 0), 0)
+            positions = np.arange(first, len(self._rows))
+            start, end = self._scope_timestamp_range(scope)
+            if start is not None:
+                ts = self._ts[first:len(self._rows)]
+                positions = positions[(ts >= _bound(start)) & (ts < _bound(end))]
+            if collapse_duplicates:
+                positions, = self._canonical(positions)
+            return self._select(positions[:int(limit)])
+
+    def export_reports(self, output, fmt='csv', start_date=None, end_date=None):
+        """Ekspor lewat penulis format ReportExporter; return jumlah baris"""
+        end = None
+        if end_date:
+            end = (datetime.strptime(str(end_date), '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d')
+
+        exporter = ReportExporter()
+        with self._lock:
+            positions, _ = self._range(start_date or None, end)
+            positions = positions.tolist()
+
+        def chunks():
+            for chunk in _iter_chunks(positions, exporter.chunk_size):
+                yield [_export_row(self._rows[position]) for position in chunk]
+
+        return exporter.write(output, fmt, chunks())
@@ -0,0 +1,177 @@
+import sqlite3
+import os
+import re
+import traceback
+from datetime import datetime, timedelta
+import pytz
+
+from models.DatabaseMigrator import FLOOD_REPORTS_SCHEMA, REPORT_COUNT_TRIGGERS, _table_columns
+
+# Laporan yang lebih tua dari horizon ini dipindah ke file arsip per tahun
+ARCHIVE_HORIZON_DAYS = 730
+ARCHIVE_DIR = 'archive'
+
+# View (TEMP, per koneksi) = tabel utama + semua arsip tahunan yang di-ATTACH
+HISTORY_VIEW = 'flood_reports_all'
+
+_ARCHIVE_FILE = re.compile(r'^flood_reports_(\d{4})\.db$')
+
+class ReportArchiver:
+    """
+    Arsip laporan lama ke file SQLite per tahun (archive/flood_reports_YYYY.db).
+    Tabel flood_reports beserta index-nya hanya berisi data "panas" sehingga
+    query hari ini / bulan ini tetap kecil. Data historis dibaca lewat view
+    flood_reports_all yang menggabungkan tabel utama dan arsip (ATTACH).
+    Hitungan di report_counts_daily/monthly tetap mencakup data yang diarsip.
+    """
+
+    def __init__(self, db_path='flood_system.db', archive_dir=None,
+                 horizon_days=ARCHIVE_HORIZON_DAYS, chunk_size=5000):
+        self.db_path = db_path
+        self.archive_dir = archive_dir or os.path.join(os.path.dirname(os.path.abspath(db_path)), ARCHIVE_DIR)
+        self.horizon_days = horizon_days
+        self.chunk_size = chunk_size
+        self.tz_wib = pytz.timezone('Asia/Jakarta')
+
+    def archive_path(self, year):
+        return os.path.join(self.archive_dir, f"flood_reports_{int(year)}.db")
+
+    def archive_years(self):
+        """Tahun-tahun yang sudah memiliki file arsip"""
+        if not os.path.isdir(self.archive_dir):
+            return []
+        years = []
+        for name in os.listdir(self.archive_dir):
+            match = _ARCHIVE_FILE.match(name)
+            if match:
+                years.append(int(match.group(1)))
+        return sorted(years)
+
+    def cutoff_date(self):
+        """report_date < cutoff akan diarsip"""
+        cutoff = datetime.now(self.tz_wib) - timedelta(days=self.horizon_days)
+        return cutoff.strftime("%Y-%m-%d")
+
+    # ============ BACA DATA HISTORIS ============
+
+    def attach_archives(self, conn):
+        """
+        ATTACH arsip yang belum terpasang pada koneksi ini dan (re)buat view
+        flood_reports_all. Return nama sumber yang dipakai untuk query
+        historis: view tersebut, atau 'flood_reports' jika belum ada arsip.
+        Catatan: SQLite membatasi jumlah ATTACH (default 10 file/tahun).
+        """
+        years = self.archive_years()
+        if not years:
+            return 'flood_reports'
+
+        attached = {row[1] for row in conn.execute('PRAGMA database_list')}
+        changed = False
+        for year in years:
+            schema = f"archive_{year}"
+            if schema not in attached:
+                conn.execute(f"ATTACH DATABASE ? AS {schema}", (self.archive_path(year),))
+                changed = True
+
+        view_exists = conn.execute(
+            "SELECT 1 FROM sqlite_temp_master WHERE type='view' AND name=?", (HISTORY_VIEW,)
+        ).fetchone() is not None
+
+        if changed or not view_exists:
+            columns = ", ".join(f'"{col}"' for col in _table_columns(conn, 'flood_reports'))
+            selects = [f"SELECT {columns} FROM main.flood_reports"]
+            selects += [f"SELECT {columns} FROM archive_{year}.flood_reports" for year in years]
+            conn.execute(f"DROP VIEW IF EXISTS temp.{HISTORY_VIEW}")
+            conn.execute(f"CREATE TEMP VIEW {HISTORY_VIEW} AS {' UNION ALL '.join(selects)}")
+
+        return HISTORY_VIEW
+
+    # ============ JOB ARSIP ============
+
+    def run(self):
+        """Pindahkan laporan lebih tua dari horizon ke arsip tahunan; return {tahun: jumlah}"""
+        cutoff = self.cutoff_date()
+        moved = {}
+
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            years = [row[0] for row in conn.execute('''
+                SELECT DISTINCT substr(report_date, 1, 4) FROM flood_reports
+                WHERE report_date < ?
+                ORDER BY 1
+            ''', (cutoff,))]
+
+            if not years:
+                print(f"ℹ️ Tidak ada laporan sebelum {cutoff} untuk diarsip")
+                return moved
+
+            os.makedirs(self.archive_dir, exist_ok=True)
+            columns = ", ".join(f'"{col}"' for col in _table_columns(conn, 'flood_reports'))
+
+            for year in years:
+                moved[int(year)] = self._archive_year(conn, int(year), cutoff, columns)
+
+            print(f"✅ Archived {sum(moved.values())} reports older than {cutoff}")
+            return moved
+
+        except Exception as e:
+            print(f"❌ Archive job failed: {e}")
+            traceback.print_exc()
+            raise
+        finally:
+            conn.close()
+
+    def _archive_year(self, conn, year, cutoff, columns):
+        schema = f"archive_{year}"
+        conn.execute(f"ATTACH DATABASE ? AS {schema}", (self.archive_path(year),))
+        try:
+            conn.execute(FLOOD_REPORTS_SCHEMA.format(table=f"{schema}.flood_reports"))
+            conn.execute(f'CREATE INDEX IF NOT EXISTS {schema}.idx_flood_reports_report_date ON flood_reports (report_date, "Timestamp")')
+            conn.execute(f'CREATE INDEX IF NOT EXISTS {schema}.idx_flood_reports_timestamp ON flood_reports ("Timestamp")')
+            conn.commit()
+
+            start = f"{year:04d}-01-01"
+            end = min(f"{year + 1:04d}-01-01", cutoff)
+            total = conn.execute(
+                'SELECT COUNT(*) FROM main.flood_reports WHERE report_date >= ? AND report_date < ?',
+                (start, end)
+            ).fetchone()[0]
+
+            moved = 0
+            while True:
+                ids = conn.execute('''
+                    SELECT id FROM main.flood_reports
+                    WHERE report_date >= ? AND report_date < ?
+                    ORDER BY id LIMIT ?
+                ''', (start, end, self.chunk_size)).fetchall()
+                if not ids:
+                    break
+                chunk = (ids[0][0], ids[-1][0], start, end)
+
+                # 1) salin (idempoten: id sudah ada di arsip diabaikan)
+                with conn:
+                    conn.execute(f'''
+                        INSERT OR IGNORE INTO {schema}.flood_reports ({columns})
+                        SELECT {columns} FROM main.flood_reports
+                        WHERE id BETWEEN ? AND ? AND report_date >= ? AND report_date < ?
+                    ''', chunk)
+
+                # 2) hapus dari tabel utama. Trigger hitungan DELETE dilepas
+                # sementara agar statistik tetap mencakup laporan yang diarsip.
+                # BEGIN eksplisit: DDL tidak membuka transaksi implisit, jadi
+                # tanpa ini DROP TRIGGER langsung ter-commit sendiri.
+                with conn:
+                    conn.execute('BEGIN IMMEDIATE')
+                    conn.execute('DROP TRIGGER IF EXISTS trg_report_counts_delete')
+                    cursor = conn.execute('''
+                        DELETE FROM main.flood_reports
+                        WHERE id BETWEEN ? AND ? AND report_date >= ? AND report_date < ?
+                    ''', chunk)
+                    conn.execute(REPORT_COUNT_TRIGGERS[1])
+
+                moved += cursor.rowcount
+                print(f"  ⏳ archive {year}: {moved}/{total}")
+
+            return moved
+        finally:
+            conn.execute(f"DETACH DATABASE {schema}")
@@ -0,0 +1,220 @@
+import re
+import threading
+import time
+import os
+import zlib
+import unicodedata
+from collections import deque, namedtuple
+import numpy as np
+
+# Singkatan umum alamat -> bentuk baku ('' = dibuang)
+ADDRESS_ABBREVIATIONS = {
+    'jl': 'jalan', 'jln': 'jalan',
+    'gg': 'gang',
+    'kel': 'kelurahan', 'kec': 'kecamatan', 'kab': 'kabupaten',
+    'ds': 'desa', 'dsn': 'dusun',
+    'perum': 'perumahan',
+    'no': '', 'nomor': ''
+}
+
+# Prima Mersenne 2^31 - 1: (a * x + b) tetap muat di uint64
+_MINHASH_PRIME = (1 << 31) - 1
+
+# MinHash alamat + nomor (rumah/gang/RT) yang disebut di alamat
+AddressSignature = namedtuple('AddressSignature', ['minhash', 'numbers'])
+
+def normalize_address(text):
+    """'Jl. Slamet Riyadi No.12' -> 'jalan slamet riyadi 12'"""
+    text = unicodedata.normalize('NFKD', str(text or '')).encode('ascii', 'ignore').decode('ascii').lower()
+    words = []
+    for word in re.findall(r'[a-z]+|\d+', text):
+        word = str(int(word)) if word.isdigit() else ADDRESS_ABBREVIATIONS.get(word, word)
+        if word:
+            words.append(word)
+    return " ".join(words)
+
+def numbers_compatible(numbers, other):
+    """
+    Nomor di dua alamat tidak bertentangan: salah satu tanpa nomor, atau
+    nomor yang satu termuat di yang lain ('Gang Mawar 1 RT 3' ~ 'Gang Mawar 1').
+    'Gang Mawar 1' vs 'Gang Mawar 3' bertentangan walau teksnya sangat mirip.
+    """
+    return not numbers or not other or numbers <= other or other <= numbers
+
+class ReportDeduplicator:
+    """
+    Deteksi laporan hampir sama: warga yang melaporkan jalan yang sama dalam
+    beberapa menit. Alamat dinormalisasi, dipecah menjadi shingle karakter,
+    lalu diringkas menjadi signature MinHash (num_perm nilai). Signature
+    dibagi menjadi `bands` pita untuk indeks LSH di memori; laporan yang
+    berbagi satu pita menjadi kandidat, dan kandidat dengan estimasi Jaccard
+    >= threshold dianggap duplikat, kecuali nomor di alamatnya bertentangan
+    (lihat numbers_compatible): shingle tidak bisa membedakan 'Gang Mawar 1'
+    dari 'Gang Mawar 3'. Indeks hanya berisi laporan kanonik dalam jendela
+    waktu geser (window_minutes); entri lama dibuang saat lookup.
+    """
+
+    _indexes = {}
+    _indexes_lock = threading.Lock()
+
+    def __init__(self, window_minutes=30, threshold=0.7, num_perm=64, bands=16,
+                 shingle_size=3, max_entries=50000, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm harus kelipatan bands")
+
+        self.window_seconds = window_minutes * 60
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+        self.shingle_size = shingle_size
+        self.max_entries = max_entries
+
+        # Parameter hash tetap (seed) -> signature sama di setiap proses
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _MINHASH_PRIME, num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _MINHASH_PRIME, num_perm, dtype=np.uint64)
+
+        self._entries = deque()     # (waktu epoch, report_id) urut waktu
+        self._signatures = {}       # report_id -> signature
+        self._buckets = {}          # (pita, hash pita) -> set report_id
+        self._lock = threading.Lock()
+        self.warmed = False
+
+    @classmethod
+    def for_path(cls, db_path, **kwargs):
+        """Satu indeks per file database, dipakai bersama semua sesi dalam proses"""
+        key = os.path.abspath(db_path)
+        with cls._indexes_lock:
+            index = cls._indexes.get(key)
+            if index is None:
+                index = cls(**kwargs)
+                cls._indexes[key] = index
+            return index
+
+    # ============ SIGNATURE ============
+
+    def shingles(self, normalized):
+        k = self.shingle_size
+        if len(normalized) <= k:
+            return {normalized} if normalized else set()
+        return {normalized[i:i + k] for i in range(len(normalized) - k + 1)}
+
+    def signature(self, address):
+        """AddressSignature (MinHash uint64 num_perm + nomor di alamat); None jika alamat kosong"""
+        normalized = normalize_address(address)
+        shingles = self.shingles(normalized)
+        if not shingles:
+            return None
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode('ascii')) & _MINHASH_PRIME for shingle in shingles),
+            dtype=np.uint64, count=len(shingles)
+        )
+        return AddressSignature(
+            ((np.outer(hashes, self._a) + self._b) % _MINHASH_PRIME).min(axis=0),
+            frozenset(word for word in normalized.split() if word.isdigit())
+        )
+
+    def _band_keys(self, signature):
+        r = self.rows_per_band
+        minhash = signature.minhash
+        return [(band, minhash[band * r:(band + 1) * r].tobytes()) for band in range(self.bands)]
+
+    # ============ INDEKS LSH ============
+
+    def _expire(self, now):
+        cutoff = now - self.window_seconds
+        while self._entries and (self._entries[0][0] < cutoff or len(self._entries) > self.max_entries):
+            _, report_id = self._entries.popleft()
+            signature = self._signatures.pop(report_id, None)
+            if signature is None:
+                continue
+            for key in self._band_keys(signature):
+                bucket = self._buckets.get(key)
+                if bucket is not None:
+                    bucket.discard(report_id)
+                    if not bucket:
+                        del self._buckets[key]
+
+    def find(self, signature, now=None):
+        """
+        Laporan kanonik paling mirip dalam jendela waktu.
+        Return (report_id, estimasi Jaccard) atau None.
+        """
+        if signature is None:
+            return None
+        now = time.time() if now is None else now
+
+        with self._lock:
+            self._expire(now)
+            return self._find(signature)
+
+    def _find(self, signature):
+        """find() tanpa lock dan tanpa expire (dipanggil dengan lock)"""
+        candidates = set()
+        for key in self._band_keys(signature):
+            candidates.update(self._buckets.get(key, ()))
+
+        # Nomor rumah/gang berbeda -> lokasi berbeda, berapa pun kemiripan teksnya
+        candidates = [
+            report_id for report_id in candidates
+            if numbers_compatible(signature.numbers, self._signatures[report_id].numbers)
+        ]
+        if not candidates:
+            return None
+
+        # Estimasi Jaccard semua kandidat sekaligus = porsi nilai MinHash yang sama
+        matrix = np.stack([self._signatures[report_id].minhash for report_id in candidates])
+        similarity = (matrix == signature.minhash).mean(axis=1)
+        best = int(similarity.argmax())
+        if similarity[best] < self.threshold:
+            return None
+        return candidates[best], float(similarity[best])
+
+    def add(self, report_id, signature, now=None):
+        """Masukkan laporan kanonik ke indeks"""
+        if signature is None:
+            return
+        now = time.time() if now is None else now
+
+        with self._lock:
+            self._expire(now)
+            self._add(report_id, signature, now)
+
+    def _add(self, report_id, signature, now):
+        self._entries.append((now, report_id))
+        self._signatures[report_id] = signature
+        for key in self._band_keys(signature):
+            self._buckets.setdefault(key, set()).add(report_id)
+
+    def find_or_add(self, report_id, signature, now=None):
+        """
+        find() lalu, jika tidak ada yang mirip, add() dalam satu lock: dua
+        laporan serupa yang diproses bersamaan tidak bisa sama-sama menjadi
+        kanonik. Return (id kanonik, kemiripan) atau None.
+        """
+        if signature is None:
+            return None
+        now = time.time() if now is None else now
+
+        with self._lock:
+            self._expire(now)
+            match = self._find(signature)
+            if match is None:
+                self._add(report_id, signature, now)
+            return match
+
+    def warm(self, reports, now=None):
+        """
+        Isi indeks dari laporan kanonik terbaru, mis. setelah restart.
+        `reports` = iterable (report_id, Alamat, waktu epoch).
+        """
+        now = time.time() if now is None else now
+        for report_id, address, added_at in sorted(reports, key=lambda item: item[2]):
+            if added_at >= now - self.window_seconds:
+                self.add(report_id, self.signature(address), added_at)
+        self.warmed = True
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'buckets': len(self._buckets)}
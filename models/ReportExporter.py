@@ -0,0 +1,170 @@
+import sqlite3
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+from models.FloodReport import REPORT_COLUMNS
+from models.ReportArchiver import ReportArchiver
+
+# Kolom ekspor untuk mitra (IP Address tidak ikut dibagikan)
+EXPORT_COLUMNS = [col for col in REPORT_COLUMNS if col != 'IP Address']
+# format -> (MIME type, ekstensi file)
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'geojson': ('application/geo+json', 'geojson')
+}
+
+def parquet_available():
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+class ReportExporter:
+    """
+    Ekspor laporan banjir (tabel utama + arsip tahunan) ke CSV, Parquet atau
+    GeoJSON. Baris dibaca lewat cursor dengan fetchmany per chunk dan
+    langsung ditulis ke output, sehingga memori tetap konstan berapa pun
+    jumlah barisnya. Rentang tanggal: start_date s.d. end_date (inklusif).
+    """
+
+    def __init__(self, db_path='flood_system.db', chunk_size=5000):
+        self.db_path = db_path
+        self.chunk_size = chunk_size
+
+    def iter_chunks(self, start_date=None, end_date=None):
+        """Generator list-of-tuples (urutan EXPORT_COLUMNS), satu snapshot baca"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            source = ReportArchiver(self.db_path).attach_archives(conn)
+
+            conditions = []
+            params = []
+            if start_date:
+                conditions.append('"Timestamp" >= ?')
+                params.append(str(start_date))
+            if end_date:
+                next_day = datetime.strptime(str(end_date), '%Y-%m-%d') + timedelta(days=1)
+                conditions.append('"Timestamp" < ?')
+                params.append(next_day.strftime('%Y-%m-%d'))
+            where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+            columns = ", ".join(f'"{col}"' for col in EXPORT_COLUMNS)
+            # Satu transaksi baca -> hasil konsisten walau ada penulisan baru
+            conn.execute('BEGIN')
+            cursor = conn.execute(f'''
+                SELECT {columns} FROM {source}
+                {where}
+                ORDER BY "Timestamp", id
+            ''', params)
+
+            while True:
+                rows = cursor.fetchmany(self.chunk_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            conn.close()
+
+    def export(self, output, fmt='csv', start_date=None, end_date=None):
+        """
+        Tulis ekspor ke `output` (path atau file biner). Return jumlah baris.
+        """
+        return self.write(output, fmt, self.iter_chunks(start_date, end_date))
+
+    def write(self, output, fmt, chunks):
+        """
+        Tulis iterable chunk baris (urutan EXPORT_COLUMNS) ke `output` dalam
+        format `fmt`; dipakai juga oleh backend selain SQLite.
+        """
+        fmt = fmt.lower()
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Format ekspor harus salah satu dari {sorted(EXPORT_FORMATS)}")
+
+        writer = getattr(self, f"_write_{fmt}")
+
+        if isinstance(output, str):
+            with open(output, 'wb') as f:
+                total = writer(chunks, f)
+        else:
+            total = writer(chunks, output)
+
+        print(f"✅ Exported {total} reports as {fmt}")
+        return total
+
+    # ============ PENULIS FORMAT ============
+
+    def _write_csv(self, chunks, binary_file):
+        # Baris di-encode sendiri per chunk: membungkus file milik pemanggil
+        # dengan io.TextIOWrapper gagal untuk objek file yang tidak lengkap
+        # (mis. SpooledTemporaryFile di Python 3.10 tidak punya readable())
+        text = io.StringIO()
+        writer = csv.writer(text)
+
+        def flush():
+            binary_file.write(text.getvalue().encode('utf-8'))
+            text.seek(0)
+            text.truncate()
+
+        writer.writerow(EXPORT_COLUMNS)
+        flush()
+        total = 0
+        for rows in chunks:
+            writer.writerows(rows)
+            flush()
+            total += len(rows)
+        return total
+
+    def _write_parquet(self, chunks, binary_file):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Ekspor Parquet membutuhkan paket 'pyarrow'")
+
+        # Urutan = EXPORT_COLUMNS
+        schema = pa.schema([
+            pa.field('id', pa.int64()),
+            pa.field('Alamat', pa.string()),
+            pa.field('Tinggi Banjir', pa.string()),
+            pa.field('Nama Pelapor', pa.string()),
+            pa.field('No HP', pa.string()),
+            pa.field('Photo URL', pa.string()),
+            pa.field('Status', pa.string()),
+            pa.field('report_date', pa.string()),
+            pa.field('report_time', pa.string()),
+            pa.field('Timestamp', pa.string())
+        ])
+        total = 0
+        # Satu row group per chunk
+        with pq.ParquetWriter(binary_file, schema) as writer:
+            for rows in chunks:
+                columns = list(zip(*rows))
+                writer.write_table(pa.Table.from_arrays(
+                    [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                    schema=schema
+                ))
+                total += len(rows)
+        return total
+
+    def _write_geojson(self, chunks, binary_file):
+        # Laporan belum memiliki koordinat; geometry null dengan alamat di properties
+        binary_file.write(b'{"type": "FeatureCollection", "features": [\n')
+        total = 0
+        for rows in chunks:
+            features = []
+            for row in rows:
+                features.append(json.dumps({
+                    'type': 'Feature',
+                    'id': row[0],
+                    'geometry': None,
+                    'properties': dict(zip(EXPORT_COLUMNS[1:], row[1:]))
+                }, ensure_ascii=False))
+            prefix = b',\n' if total else b''
+            binary_file.write(prefix + ',\n'.join(features).encode('utf-8'))
+            total += len(rows)
+        binary_file.write(b'\n]}\n')
+        return total
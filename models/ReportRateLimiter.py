@@ -0,0 +1,234 @@
+import sqlite3
+import threading
+import time
+import os
+import re
+import atexit
+import traceback
+from collections import OrderedDict, deque
+
+from models.SQLiteWriteQueue import SQLiteWriteQueue
+from models.DatabaseMigrator import RATE_LIMIT_TABLE
+
+# jenis kunci -> (maks. laporan, panjang jendela dalam detik)
+REPORT_RATE_LIMITS = {
+    'ip': (10, 24 * 3600),
+    'phone': (10, 24 * 3600)
+}
+
+# Batas tunggu snapshot di antrean penulis
+SNAPSHOT_TIMEOUT_SECONDS = 30
+
+def normalize_phone(phone):
+    """'0812-3456 789' / '+62 812...' -> '628123456789'; None jika tidak ada digit"""
+    digits = re.sub(r'\D', '', str(phone or ''))
+    if digits.startswith('0'):
+        digits = '62' + digits[1:]
+    return digits or None
+
+class ReportRateLimiter:
+    """
+    Pembatas laju pengiriman laporan per IP klien dan per nomor HP
+    (sliding window log). Setiap kunci menyimpan waktu `limit` laporan
+    terakhirnya dalam deque berbatas, sehingga cek izin cukup membandingkan
+    laporan tertua dengan awal jendela: beberapa mikrodetik, tanpa query
+    database. Jumlah kunci dibatasi (LRU, max_keys).
+
+    Kunci yang berubah di-snapshot berkala ke tabel rate_limit_hits lewat
+    SQLiteWriteQueue dan dimuat lagi saat proses mulai, sehingga batas tetap
+    berlaku setelah restart. Tanpa db_path limiter murni di memori.
+    """
+
+    _limiters = {}
+    _limiters_lock = threading.Lock()
+
+    def __init__(self, db_path=None, limits=None, max_keys=100000, snapshot_interval=60):
+        self.db_path = db_path
+        self.limits = dict(limits or REPORT_RATE_LIMITS)
+        self.max_keys = max_keys
+        self.snapshot_interval = snapshot_interval
+
+        self._hits = OrderedDict()      # (jenis, nilai) -> deque waktu epoch
+        self._dirty = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        if db_path:
+            self._load()
+            self._start_snapshots()
+
+    @classmethod
+    def for_path(cls, db_path, **kwargs):
+        """Satu limiter per file database, dipakai bersama semua sesi dalam proses"""
+        key = os.path.abspath(db_path)
+        with cls._limiters_lock:
+            limiter = cls._limiters.get(key)
+            if limiter is None:
+                limiter = cls(db_path, **kwargs)
+                cls._limiters[key] = limiter
+            return limiter
+
+    # ============ CEK IZIN ============
+
+    def _keys(self, ip_address=None, phone=None):
+        keys = []
+        if ip_address:
+            keys.append(('ip', str(ip_address)))
+        phone = normalize_phone(phone)
+        if phone:
+            keys.append(('phone', phone))
+        return [key for key in keys if key[0] in self.limits]
+
+    def _retry_after(self, key, now):
+        """0 jika kunci masih boleh mengirim, selain itu detik hingga slot berikutnya"""
+        limit, window = self.limits[key[0]]
+        hits = self._hits.get(key)
+        if hits is None or len(hits) < limit:
+            return 0.0
+        return max(0.0, hits[0] + window - now)
+
+    def check(self, ip_address=None, phone=None, now=None):
+        """Return (boleh, detik tunggu) tanpa mencatat laporan"""
+        now = time.time() if now is None else now
+        keys = self._keys(ip_address, phone)
+        with self._lock:
+            wait = max((self._retry_after(key, now) for key in keys), default=0.0)
+        return wait == 0, wait
+
+    def acquire(self, ip_address=None, phone=None, now=None):
+        """
+        Cek dan catat satu laporan untuk semua kunci secara atomik (dua sesi
+        bersamaan tidak bisa sama-sama memakai slot terakhir).
+        Return (boleh, detik tunggu).
+        """
+        now = time.time() if now is None else now
+        keys = self._keys(ip_address, phone)
+        with self._lock:
+            wait = max((self._retry_after(key, now) for key in keys), default=0.0)
+            if wait > 0:
+                return False, wait
+            for key in keys:
+                self._record(key, now)
+        return True, 0.0
+
+    def release(self, ip_address=None, phone=None):
+        """Kembalikan slot terakhir (laporan gagal disimpan setelah acquire)"""
+        with self._lock:
+            for key in self._keys(ip_address, phone):
+                hits = self._hits.get(key)
+                if hits:
+                    hits.pop()
+                    self._dirty.add(key)
+
+    def _record(self, key, now):
+        hits = self._hits.get(key)
+        if hits is None:
+            hits = deque(maxlen=self.limits[key[0]][0])
+            self._hits[key] = hits
+            while len(self._hits) > self.max_keys:
+                self._hits.popitem(last=False)
+        else:
+            self._hits.move_to_end(key)
+        hits.append(now)
+        self._dirty.add(key)
+
+    def stats(self):
+        with self._lock:
+            return {'keys': len(self._hits), 'dirty': len(self._dirty)}
+
+    # ============ SNAPSHOT SQLITE ============
+
+    def _max_window(self):
+        return max(window for _, window in self.limits.values())
+
+    def _load(self):
+        """Muat jendela yang masih berlaku dari snapshot terakhir"""
+        now = time.time()
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            rows = conn.execute(f'''
+                SELECT limit_key, hits FROM {RATE_LIMIT_TABLE}
+                WHERE updated_at >= ?
+                ORDER BY updated_at
+            ''', (now - self._max_window(),)).fetchall()
+
+            for limit_key, hits in rows:
+                kind, _, value = limit_key.partition(':')
+                if kind not in self.limits:
+                    continue
+                limit, window = self.limits[kind]
+                times = [float(t) for t in hits.split() if float(t) > now - window]
+                if times:
+                    # Urut updated_at naik -> kunci terbaru di ujung LRU
+                    self._hits[(kind, value)] = deque(times, maxlen=limit)
+            while len(self._hits) > self.max_keys:
+                self._hits.popitem(last=False)
+
+            print(f"✅ Rate limiter loaded {len(self._hits)} keys")
+
+        except Exception as e:
+            print(f"⚠️ Rate limiter snapshot not loaded: {e}")
+        finally:
+            conn.close()
+
+    def snapshot(self):
+        """Tulis kunci yang berubah ke SQLite; return jumlah kunci yang ditulis"""
+        if not self.db_path:
+            return 0
+
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            upserts = []
+            deletes = []
+            for key in dirty:
+                hits = self._hits.get(key)
+                if hits is None:
+                    # Tergeser dari LRU: baris lama dibiarkan hingga kedaluwarsa
+                    continue
+                limit_key = f"{key[0]}:{key[1]}"
+                if hits:
+                    upserts.append((limit_key, " ".join(f"{t:.3f}" for t in hits), hits[-1]))
+                else:
+                    deletes.append((limit_key,))
+
+        expired_before = time.time() - self._max_window()
+
+        def job(conn):
+            conn.executemany(f'''
+                INSERT INTO {RATE_LIMIT_TABLE} (limit_key, hits, updated_at)
+                VALUES (?, ?, ?)
+                ON CONFLICT(limit_key) DO UPDATE SET
+                    hits = excluded.hits, updated_at = excluded.updated_at
+            ''', upserts)
+            conn.executemany(f'DELETE FROM {RATE_LIMIT_TABLE} WHERE limit_key = ?', deletes)
+            conn.execute(f'DELETE FROM {RATE_LIMIT_TABLE} WHERE updated_at < ?', (expired_before,))
+
+        try:
+            SQLiteWriteQueue.for_path(self.db_path).submit(job).result(timeout=SNAPSHOT_TIMEOUT_SECONDS)
+            return len(upserts) + len(deletes)
+        except Exception as e:
+            print(f"❌ Rate limiter snapshot failed: {e}")
+            traceback.print_exc()
+            # Coba lagi pada snapshot berikutnya
+            with self._lock:
+                self._dirty |= dirty
+            return 0
+
+    def _start_snapshots(self):
+        self._thread = threading.Thread(
+            target=self._snapshot_loop, name=f"rate-limit-snapshot:{os.path.basename(self.db_path)}", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _snapshot_loop(self):
+        while not self._stop.wait(self.snapshot_interval):
+            if self._dirty:
+                self.snapshot()
+
+    def close(self):
+        """Hentikan snapshot berkala lalu tulis perubahan terakhir"""
+        self._stop.set()
+        if self._dirty:
+            self.snapshot()
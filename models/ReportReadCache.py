@@ -0,0 +1,163 @@
+import threading
+import time
+import os
+import functools
+from collections import OrderedDict
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+import pytz
+
+class ReportReadCache:
+    """
+    Cache baca lintas sesi untuk daftar & statistik laporan.
+
+    Semua sesi Streamlit dalam satu proses berbagi cache per file database.
+    Kunci cache memuat versi data (dinaikkan setiap penulisan lewat model)
+    dan tanggal WIB, sehingga laporan baru langsung terlihat dan daftar
+    "hari ini" berganti tepat tengah malam Asia/Jakarta. Entri juga
+    kedaluwarsa setelah TTL (menangkap penulisan dari proses lain, mis. CLI
+    impor) dan jumlahnya dibatasi (LRU). Miss yang bersamaan untuk kunci
+    yang sama hanya menjalankan satu query. Hasil fallback dari query yang
+    gagal (lihat mark_failed) tidak disimpan.
+    """
+
+    _caches = {}
+    _caches_lock = threading.Lock()
+
+    def __init__(self, ttl_seconds=30, max_entries=128, max_items=200000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_items = max_items
+        self.tz_wib = pytz.timezone('Asia/Jakarta')
+
+        self.version = 0
+        self._entries = OrderedDict()   # key -> (expires_at, size, value)
+        self._loading = {}              # key -> Future (single-flight)
+        self._items = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()  # flag gagal per thread loader
+
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def for_path(cls, db_path, **kwargs):
+        """Satu cache per file database, dipakai bersama semua sesi dalam proses"""
+        key = os.path.abspath(db_path)
+        with cls._caches_lock:
+            cache = cls._caches.get(key)
+            if cache is None:
+                cache = cls(**kwargs)
+                cls._caches[key] = cache
+            return cache
+
+    def invalidate(self):
+        """Naikkan versi data (dipanggil setelah create/update/impor)"""
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+            self._items = 0
+
+    def mark_failed(self):
+        """Dipanggil loader di jalur exception: hasil yang dikembalikannya tidak di-cache"""
+        self._local.failed = True
+
+    def _wib_day(self, now_wib):
+        return now_wib.strftime("%Y-%m-%d")
+
+    def _expiry(self, now_wib):
+        """min(TTL, tengah malam WIB berikutnya) dalam waktu monotonic"""
+        midnight = (now_wib + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        until_midnight = (midnight - now_wib).total_seconds()
+        return time.monotonic() + min(self.ttl_seconds, until_midnight)
+
+    def get_or_load(self, key, loader):
+        now_wib = datetime.now(self.tz_wib)
+
+        with self._lock:
+            full_key = (self.version, self._wib_day(now_wib)) + key
+            entry = self._entries.get(full_key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(full_key)
+                    self.hits += 1
+                    return entry[2]
+                self._drop(full_key)
+
+            pending = self._loading.get(full_key)
+            if pending is None:
+                pending = Future()
+                self._loading[full_key] = pending
+                owner = True
+                self.misses += 1
+            else:
+                owner = False
+
+        if not owner:
+            return pending.result()
+
+        # Loader bersarang: kegagalan loader dalam ikut menandai loader luar
+        outer_failed = getattr(self._local, 'failed', False)
+        self._local.failed = False
+        try:
+            value = loader()
+        except Exception as e:
+            with self._lock:
+                self._loading.pop(full_key, None)
+            pending.set_exception(e)
+            raise
+        finally:
+            failed = self._local.failed
+            self._local.failed = outer_failed or failed
+
+        with self._lock:
+            self._loading.pop(full_key, None)
+            # Jangan simpan hasil gagal atau yang dimuat sebelum invalidate()
+            if not failed and full_key[0] == self.version:
+                self._store(full_key, value, self._expiry(now_wib))
+        pending.set_result(value)
+        return value
+
+    def _store(self, full_key, value, expires_at):
+        size = len(value) if hasattr(value, '__len__') else 1
+        if size > self.max_items:
+            return
+        self._drop(full_key)
+        self._entries[full_key] = (expires_at, size, value)
+        self._items += size
+        while self._entries and (len(self._entries) > self.max_entries or self._items > self.max_items):
+            _, (_, evicted_size, _) = self._entries.popitem(last=False)
+            self._items -= evicted_size
+
+    def _drop(self, full_key):
+        entry = self._entries.pop(full_key, None)
+        if entry is not None:
+            self._items -= entry[1]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'version': self.version,
+                'entries': len(self._entries),
+                'items': self._items,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+def cached_read(method):
+    """
+    Decorator untuk method baca FloodReportModel: hasil dibagi lintas sesi
+    lewat self.read_cache. Argumen yang tidak hashable melewati cache.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        try:
+            hash(key)
+        except TypeError:
+            return method(self, *args, **kwargs)
+
+        value = self.read_cache.get_or_load(key, lambda: method(self, *args, **kwargs))
+        # DataFrame bisa diubah pemanggil; berikan salinan
+        return value.copy() if hasattr(value, 'columns') else value
+    return wrapper
@@ -0,0 +1,274 @@
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+import os
+import importlib
+import pytz
+import numpy as np
+import pandas as pd
+from itertools import islice
+
+from models.FloodReport import REPORT_COLUMNS
+
+# Backend penyimpanan laporan: nama -> (module, class)
+STORAGE_BACKENDS = {
+    'sqlite': ('models.FloodReportModel', 'FloodReportModel'),
+    'memory': ('models.InMemoryReportStorage', 'InMemoryReportStorage')
+}
+DEFAULT_STORAGE_BACKEND = 'sqlite'
+
+def month_date_range(year_month):
+    """'YYYY-MM' -> ('YYYY-MM-01', awal bulan berikutnya) untuk predikat range report_date"""
+    year, month = (int(part) for part in year_month.split('-'))
+    next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return f"{year:04d}-{month:02d}-01", f"{next_year:04d}-{next_month:02d}-01"
+
+# bucket -> (unit datetime64, langkah per bucket)
+HISTOGRAM_BUCKETS = {
+    'hour': ('h', 1),
+    'day': ('D', 1),
+    'week': ('D', 7),
+    'month': ('M', 1)
+}
+
+# Kolom yang disimpan oleh create_reports_bulk (urutan = format Google Sheets)
+BULK_COLUMNS = [
+    'Timestamp', 'Alamat', 'Tinggi Banjir', 'Nama Pelapor',
+    'No HP', 'IP Address', 'Photo URL', 'Status'
+]
+
+# Nama argumen create_report / skema lama -> kolom format Google Sheets
+BULK_FIELD_ALIASES = {
+    'timestamp': 'Timestamp',
+    'alamat': 'Alamat', 'address': 'Alamat',
+    'tinggi_banjir': 'Tinggi Banjir', 'flood_height': 'Tinggi Banjir',
+    'nama_pelapor': 'Nama Pelapor', 'reporter_name': 'Nama Pelapor',
+    'no_hp': 'No HP', 'reporter_phone': 'No HP',
+    'ip_address': 'IP Address',
+    'photo_url': 'Photo URL', 'photo_path': 'Photo URL',
+    'status': 'Status'
+}
+
+BULK_SOURCES = {
+    col: [col] + [alias for alias, target in BULK_FIELD_ALIASES.items() if target == col]
+    for col in BULK_COLUMNS
+}
+
+def _iter_chunks(rows, chunk_size):
+    iterator = iter(rows)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+def _to_datetime64(value):
+    if hasattr(value, 'strftime'):
+        value = value.strftime('%Y-%m-%dT%H:%M:%S')
+    return np.datetime64(str(value).replace(' ', 'T'), 's')
+
+def _bucket_starts(start, end, bucket):
+    """Awal setiap bucket kalender yang beririsan dengan [start, end)"""
+    unit, step = HISTOGRAM_BUCKETS[bucket]
+    start = _to_datetime64(start)
+    end = _to_datetime64(end)
+
+    first = start.astype(f'datetime64[{unit}]')
+    if bucket == 'week':
+        # 1970-01-01 adalah hari Kamis -> mundur ke hari Senin
+        first = first - np.timedelta64((first.astype(np.int64) + 3) % 7, 'D')
+
+    last = end.astype(f'datetime64[{unit}]') + np.timedelta64(step, unit)
+    starts = np.arange(first, last, np.timedelta64(step, unit))
+    return starts[starts < end]
+
+def create_report_storage(backend=None, db_path='flood_system.db'):
+    """
+    Buat backend penyimpanan laporan. `backend` = 'sqlite' (default) atau
+    'memory'; jika None dibaca dari env FLOOD_STORAGE_BACKEND, sehingga uji
+    beban bisa menjalankan aplikasi yang sama tanpa I/O disk.
+    """
+    backend = (backend or os.environ.get('FLOOD_STORAGE_BACKEND') or DEFAULT_STORAGE_BACKEND).lower()
+    if backend not in STORAGE_BACKENDS:
+        raise ValueError(f"Backend penyimpanan harus salah satu dari {sorted(STORAGE_BACKENDS)}")
+
+    module_name, class_name = STORAGE_BACKENDS[backend]
+    storage_class = getattr(importlib.import_module(module_name), class_name)
+    return storage_class(db_path) if backend == 'sqlite' else storage_class()
+
+class ReportStorage(ABC):
+    """
+    Antarmuka penyimpanan laporan banjir yang dipakai controller.
+
+    Implementasi: FloodReportModel (SQLite, dipakai aplikasi) dan
+    InMemoryReportStorage (array di memori, untuk uji beban & benchmark
+    controller/view tanpa I/O disk). Daftar laporan dikembalikan sebagai
+    list FloodReport atau DataFrame (as_frame=True), terbaru lebih dulu.
+    Method baca tidak melempar exception; kegagalan = hasil kosong.
+    collapse_duplicates=True melewati laporan yang ditautkan ke laporan
+    kanonik (lihat ReportDeduplicator).
+    """
+
+    # File database backend (None untuk backend tanpa file)
+    db_path = None
+
+    def __init__(self):
+        self.tz_wib = pytz.timezone('Asia/Jakarta')
+
+    # ============ TULIS ============
+
+    @abstractmethod
+    def create_report(self, alamat, tinggi_banjir, nama_pelapor,
+                    no_hp=None, photo_url=None, ip_address=None,
+                    duplicate_of=None, similarity=None, deduplicate=None):
+        """
+        Simpan satu laporan (waktu WIB), opsional sebagai duplikat laporan
+        kanonik; return id atau None. `deduplicate(report_id)` -> (id kanonik,
+        kemiripan) atau None dipanggil di bagian tulis yang sama dengan insert
+        (berurutan antar sesi), mis. ReportDeduplicator.find_or_add.
+        """
+
+    @abstractmethod
+    def create_reports_bulk(self, rows, chunk_size=10000):
+        """Impor banyak laporan (atomik per chunk); return {'inserted', 'rejected', 'first_id', 'last_id'}"""
+
+    @abstractmethod
+    def update_report_status(self, report_id, status):
+        """Ubah status laporan; return True jika laporan ditemukan"""
+
+    # ============ HITUNG & AGREGAT ============
+
+    @abstractmethod
+    def get_today_reports_count_by_ip(self, ip_address):
+        """Jumlah laporan hari ini (WIB) dari IP ini (rate limit)"""
+
+    @abstractmethod
+    def get_monthly_statistics(self, collapse_duplicates=False):
+        """{'total_reports', 'by_status', 'month'} untuk bulan ini"""
+
+    @abstractmethod
+    def get_report_histogram(self, start, end, bucket='day', collapse_duplicates=False):
+        """Jumlah laporan per bucket untuk [start, end); lihat HISTOGRAM_BUCKETS"""
+
+    @abstractmethod
+    def get_reports_summary(self, scope='all', collapse_duplicates=False):
+        """{'total_reports', 'unique_locations', 'unique_reporters', 'today_reports'}"""
+
+    # ============ QUERY RANGE ============
+
+    @abstractmethod
+    def get_today_reports(self, as_frame=False):
+        """Laporan hari ini, terbaru dulu (list FloodReport atau DataFrame)"""
+
+    @abstractmethod
+    def get_month_reports(self, as_frame=False):
+        """Laporan bulan ini, terbaru dulu (list FloodReport atau DataFrame)"""
+
+    @abstractmethod
+    def get_all_reports(self, as_frame=False):
+        """Semua laporan termasuk arsip, terbaru dulu"""
+
+    @abstractmethod
+    def search_reports(self, query, scope='all', limit=50, as_frame=False):
+        """Cari laporan berdasarkan Alamat / Nama Pelapor"""
+
+    @abstractmethod
+    def get_reports_page(self, scope='all', page_size=20, cursor=None, collapse_duplicates=False):
+        """Keyset pagination; return {'reports', 'next_cursor'}"""
+
+    @abstractmethod
+    def get_reports_since(self, last_id, scope='today', limit=500, collapse_duplicates=False):
+        """Laporan dengan id > last_id, urut id naik (change feed)"""
+
+    @abstractmethod
+    def export_reports(self, output, fmt='csv', start_date=None, end_date=None):
+        """Tulis ekspor (lihat ReportExporter) ke path / file biner; return jumlah baris"""
+
+    # ============ BANTUAN BERSAMA ============
+
+    def _empty_reports(self, as_frame):
+        return pd.DataFrame(columns=REPORT_COLUMNS) if as_frame else []
+
+    def _scope_timestamp_range(self, scope):
+        """Batas "Timestamp" [awal, akhir) untuk scope 'today' / 'month' / 'all'"""
+        now = datetime.now(self.tz_wib)
+        if scope == 'today':
+            start = now.strftime("%Y-%m-%d")
+            end = (now + timedelta(days=1)).strftime("%Y-%m-%d")
+            return start, end
+        if scope == 'month':
+            return month_date_range(now.strftime("%Y-%m"))
+        return None, None
+
+    def _new_report_values(self, alamat, tinggi_banjir, nama_pelapor,
+                           no_hp=None, photo_url=None, ip_address=None):
+        """Nilai kolom laporan baru (urutan insert create_report) dengan waktu WIB"""
+        current_time_wib = datetime.now(self.tz_wib)
+        timestamp = current_time_wib.strftime("%Y-%m-%d %H:%M:%S")
+
+        print("📝 Creating report (WIB Time):")
+        print(f"  Timestamp: {timestamp}")
+        print(f"  Alamat: {alamat}")
+        print(f"  Tinggi Banjir: {tinggi_banjir}")
+        print(f"  Nama Pelapor: {nama_pelapor}")
+        print(f"  No HP: {no_hp}")
+        print(f"  Photo URL: {photo_url}")
+        print(f"  IP Address: {ip_address}")
+
+        return (
+            timestamp,
+            str(alamat) if alamat else "",
+            str(tinggi_banjir) if tinggi_banjir else "",
+            str(nama_pelapor) if nama_pelapor else "",
+            str(no_hp) if no_hp else None,
+            str(ip_address) if ip_address else "unknown",
+            str(photo_url) if photo_url else None,
+            'pending',
+            current_time_wib.strftime("%Y-%m-%d"),
+            current_time_wib.strftime("%H:%M:%S")
+        )
+
+    def _normalize_bulk_chunk(self, chunk):
+        """Validasi & normalisasi satu chunk; return (list tuple siap insert, jumlah ditolak)"""
+        raw = pd.DataFrame.from_records(chunk)
+        df = pd.DataFrame(index=raw.index)
+        for col in BULK_COLUMNS:
+            # Kolom Sheets diutamakan, alias mengisi yang kosong
+            values = pd.Series(pd.NA, index=raw.index, dtype='string')
+            for source in BULK_SOURCES[col]:
+                if source in raw.columns:
+                    values = values.fillna(raw[source].astype('string').str.strip().replace('', pd.NA))
+            df[col] = values
+
+        # Timestamp kosong = waktu impor (WIB); format lain (mis. ekspor Sheets) diparse
+        now_wib = datetime.now(self.tz_wib).strftime("%Y-%m-%d %H:%M:%S")
+        raw_ts = df['Timestamp'].fillna(now_wib)
+        ts = pd.to_datetime(raw_ts, format="%Y-%m-%d %H:%M:%S", errors='coerce')
+        unparsed = ts.isna()
+        if unparsed.any():
+            ts[unparsed] = pd.to_datetime(raw_ts[unparsed], format='mixed', dayfirst=True, errors='coerce')
+
+        valid = (
+            ts.notna()
+            & df['Alamat'].notna()
+            & df['Tinggi Banjir'].notna()
+            & df['Nama Pelapor'].notna()
+        )
+        df = df[valid].copy()
+        ts = ts[valid]
+
+        # Timestamp yang sudah berformat baku dipakai apa adanya (tanpa strftime)
+        timestamp = raw_ts[valid].astype('string')
+        reformat = unparsed[valid]
+        if reformat.any():
+            timestamp[reformat] = ts[reformat].dt.strftime("%Y-%m-%d %H:%M:%S")
+
+        df['IP Address'] = df['IP Address'].fillna('bulk_import')
+        df['Status'] = df['Status'].fillna('pending').str.lower()
+
+        # Iterasi array object NumPy jauh lebih cepat daripada array string pandas
+        columns = [timestamp] + [df[col] for col in BULK_COLUMNS[1:]] + [
+            timestamp.str.slice(0, 10),
+            timestamp.str.slice(11, 19)
+        ]
+        records = list(zip(*(col.to_numpy(dtype=object, na_value=None) for col in columns)))
+        return records, int((~valid).sum())
@@ -0,0 +1,112 @@
+import sqlite3
+import threading
+import weakref
+import os
+
+def _close_quietly(conn):
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+class SQLiteConnectionPool:
+    """
+    Pool koneksi SQLite per thread.
+
+    Setiap thread (sesi Streamlit) memakai satu koneksi yang terus dipakai
+    ulang, sehingga cache prepared statement milik koneksi tetap hangat.
+    Database dijalankan dalam mode WAL agar pembaca tidak memblokir penulis.
+
+    Koneksi dicatat per objek thread (weakref), bukan per ident: ident bisa
+    dipakai ulang oleh thread baru, dan koneksi thread yang sudah selesai
+    langsung ditutup begitu objek thread-nya dibuang.
+    """
+
+    _pools = {}
+    _pools_lock = threading.Lock()
+
+    def __init__(self, db_path, busy_timeout_ms=5000, cached_statements=256, max_connections=64):
+        self.db_path = db_path
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cached_statements = cached_statements
+        self.max_connections = max_connections
+
+        self._local = threading.local()
+        self._connections = weakref.WeakKeyDictionary()    # thread -> (koneksi, finalizer)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_path(cls, db_path, **kwargs):
+        """Satu pool per file database, dipakai bersama semua sesi dalam proses"""
+        key = os.path.abspath(db_path)
+        with cls._pools_lock:
+            pool = cls._pools.get(key)
+            if pool is None:
+                pool = cls(db_path, **kwargs)
+                cls._pools[key] = pool
+            return pool
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout_ms / 1000.0,
+            cached_statements=self.cached_statements,
+            check_same_thread=False
+        )
+        # Dipakai hanya oleh satu thread; check_same_thread dimatikan agar
+        # close_all() bisa menutup koneksi milik thread lain.
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA busy_timeout={int(self.busy_timeout_ms)}')
+        return conn
+
+    def get_connection(self):
+        """Koneksi milik thread saat ini (dibuat saat pertama kali dipakai)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            return conn
+
+        conn = self._connect()
+        self._local.conn = conn
+        thread = threading.current_thread()
+
+        with self._lock:
+            replaced = self._connections.pop(thread, None)
+            if replaced is not None:
+                # Koneksi lama thread ini (mis. setelah _local di-reset) ditutup
+                replaced[1]()
+            self._connections[thread] = (conn, weakref.finalize(thread, _close_quietly, conn))
+            if len(self._connections) > self.max_connections:
+                self._prune_dead_threads()
+
+        print(f"🔌 New pooled SQLite connection ({len(self._connections)} open)")
+        return conn
+
+    def _prune_dead_threads(self):
+        """Tutup koneksi milik thread yang sudah selesai (dipanggil dengan lock)"""
+        for thread, (_, finalizer) in list(self._connections.items()):
+            if not thread.is_alive():
+                finalizer()
+                del self._connections[thread]
+
+    def release_thread_connection(self):
+        """Tutup koneksi milik thread saat ini"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            return
+        self._local.conn = None
+        with self._lock:
+            entry = self._connections.pop(threading.current_thread(), None)
+        if entry is not None:
+            entry[1]()
+        else:
+            conn.close()
+
+    def close_all(self):
+        """Tutup semua koneksi (mis. sebelum restore/backup file database)"""
+        with self._lock:
+            for _, finalizer in list(self._connections.values()):
+                finalizer()
+            self._connections.clear()
+        self._local = threading.local()
@@ -0,0 +1,156 @@
+import sqlite3
+import threading
+import queue
+import time
+import os
+import traceback
+from concurrent.futures import Future
+
+_STOP = object()
+
+class SQLiteWriteQueue:
+    """
+    Satu thread penulis per file database.
+
+    Sesi Streamlit tidak menulis langsung ke SQLite (yang bisa gagal dengan
+    "database is locked" saat banyak sesi menulis bersamaan), tetapi mengirim
+    job ke antrean. Thread penulis memiliki satu koneksi, mengumpulkan job
+    yang datang dalam beberapa milidetik, lalu menjalankannya dalam satu
+    transaksi (group commit). Setiap job memakai SAVEPOINT sendiri sehingga
+    job yang gagal tidak membatalkan job lain, dan Future tiap job baru
+    diselesaikan setelah COMMIT berhasil.
+    """
+
+    _queues = {}
+    _queues_lock = threading.Lock()
+
+    def __init__(self, db_path, batch_window_ms=3, max_batch=256, busy_timeout_ms=5000):
+        self.db_path = db_path
+        self.batch_window = batch_window_ms / 1000.0
+        self.max_batch = max_batch
+        self.busy_timeout_ms = busy_timeout_ms
+
+        self._queue = queue.Queue()
+        self._last_batch_size = 0
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    @classmethod
+    def for_path(cls, db_path, **kwargs):
+        """Satu antrean penulis per file database, dipakai bersama semua sesi"""
+        key = os.path.abspath(db_path)
+        with cls._queues_lock:
+            writer = cls._queues.get(key)
+            if writer is None:
+                writer = cls(db_path, **kwargs)
+                cls._queues[key] = writer
+            return writer
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name=f"sqlite-writer:{os.path.basename(self.db_path)}", daemon=True
+                )
+                self._thread.start()
+
+    def submit(self, job):
+        """
+        Kirim job(conn) -> nilai. Return Future; .result() berisi nilai job
+        setelah transaksinya di-commit, atau melempar exception job tersebut.
+        """
+        future = Future()
+        self._ensure_started()
+        self._queue.put((job, future))
+        return future
+
+    def execute(self, sql, params=()):
+        """Shortcut satu statement; Future berisi (lastrowid, rowcount)"""
+        def job(conn):
+            cursor = conn.execute(sql, params)
+            return cursor.lastrowid, cursor.rowcount
+        return self.submit(job)
+
+    def close(self, timeout=5.0):
+        """Selesaikan job yang tersisa lalu hentikan thread penulis"""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put((_STOP, None))
+            self._thread.join(timeout)
+
+    # ============ THREAD PENULIS ============
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout_ms / 1000.0, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA busy_timeout={int(self.busy_timeout_ms)}')
+        return conn
+
+    def _collect_batch(self):
+        """
+        Job pertama (blocking) + job yang sudah mengantre. Jika batch
+        sebelumnya berisi lebih dari satu job (ada penulis bersamaan), tunggu
+        hingga batch_window agar job yang hampir bersamaan ikut satu commit.
+        """
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + (self.batch_window if self._last_batch_size > 1 else 0)
+        while len(batch) < self.max_batch and batch[-1][0] is not _STOP:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        self._last_batch_size = len(batch)
+        return batch
+
+    def _run(self):
+        conn = self._connect()
+        print(f"✅ SQLite writer thread started ({self.db_path})")
+        try:
+            while True:
+                batch = self._collect_batch()
+                stop = batch[-1][0] is _STOP
+                jobs = [item for item in batch if item[0] is not _STOP]
+                if jobs:
+                    self._run_batch(conn, jobs)
+                if stop:
+                    break
+        finally:
+            conn.close()
+
+    def _run_batch(self, conn, jobs):
+        outcomes = []
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            for job, future in jobs:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                conn.execute('SAVEPOINT job')
+                try:
+                    outcomes.append((future, True, job(conn)))
+                    conn.execute('RELEASE job')
+                except Exception as e:
+                    conn.execute('ROLLBACK TO job')
+                    conn.execute('RELEASE job')
+                    outcomes.append((future, False, e))
+            conn.execute('COMMIT')
+
+        except Exception as e:
+            # BEGIN/COMMIT gagal: tidak ada job di batch ini yang tersimpan
+            print(f"❌ SQLite writer batch failed ({len(jobs)} jobs): {e}")
+            traceback.print_exc()
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            for job, future in jobs:
+                if not future.done():
+                    if future.running() or future.set_running_or_notify_cancel():
+                        future.set_exception(e)
+            return
+
+        for future, ok, value in outcomes:
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
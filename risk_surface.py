@@ -0,0 +1,88 @@
+"""
+Sweep engine untuk halaman Simulasi Banjir.
+
+Menghitung permukaan risiko ANN di atas grid curah hujan x tinggi air
+(opsional x kelembapan) dalam satu pass NumPy, setara dengan memanggil
+predict_flood_ann_with_temp_range di setiap titik grid.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+from model_registry import registry
+
+RAINFALL_BOUNDS = (0.0, 500.0)
+WATER_LEVEL_BOUNDS = (60.0, 150.0)
+SURFACE_CACHE_SIZE = 32
+
+@lru_cache(maxsize=SURFACE_CACHE_SIZE)
+def _compute_surface(rainfall_bounds, water_level_bounds, resolution,
+                    humidity, humidity_bounds, humidity_steps, temp_min, temp_max, version):
+    rainfall_axis = np.linspace(rainfall_bounds[0], rainfall_bounds[1], resolution[0])
+    water_level_axis = np.linspace(water_level_bounds[0], water_level_bounds[1], resolution[1])
+    temperature = (temp_min + temp_max) / 2
+
+    if humidity_bounds is None:
+        humidity_axis = None
+        # Grid (water_level, rainfall) agar baris = sumbu y pada heatmap
+        rainfall_grid = rainfall_axis[np.newaxis, :]
+        water_level_grid = water_level_axis[:, np.newaxis]
+        humidity_grid = humidity
+    else:
+        humidity_axis = np.linspace(humidity_bounds[0], humidity_bounds[1], humidity_steps)
+        rainfall_grid = rainfall_axis[np.newaxis, np.newaxis, :]
+        water_level_grid = water_level_axis[np.newaxis, :, np.newaxis]
+        humidity_grid = humidity_axis[:, np.newaxis, np.newaxis]
+
+    result = registry.predict_batch(rainfall_grid, water_level_grid, humidity_grid, temperature, version=version)
+    if 'error' in result:
+        raise ValueError(result['error'])
+
+    risk_level = result['risk_level']
+    status_code = result['status_code']
+    for arr in (rainfall_axis, water_level_axis, risk_level, status_code):
+        arr.setflags(write=False)
+    if humidity_axis is not None:
+        humidity_axis.setflags(write=False)
+
+    return {
+        'rainfall': rainfall_axis,
+        'water_level': water_level_axis,
+        'humidity': humidity_axis,
+        'risk_level': risk_level,
+        'status_code': status_code,
+        'temperature_average': round(temperature, 1),
+        'version': result['model_version']
+    }
+
+def compute_risk_surface(rainfall_bounds=RAINFALL_BOUNDS, water_level_bounds=WATER_LEVEL_BOUNDS,
+                        resolution=(200, 200), humidity=70.0, temp_min=24.0, temp_max=32.0,
+                        humidity_bounds=None, humidity_steps=10, version=None):
+    """
+    Permukaan risiko untuk rentang parameter tertentu.
+
+    Hasil 2D berbentuk (len(water_level), len(rainfall)); jika humidity_bounds
+    diisi, hasilnya 3D (len(humidity), len(water_level), len(rainfall)).
+    Hasil di-memoize per batas, resolusi & versi model dan array-nya read-only.
+    version=None memakai versi aktif registry; versi tanpa prediktor batch
+    dihitung lewat pembungkus skalar (lambat untuk resolusi besar).
+    """
+    if isinstance(resolution, int):
+        resolution = (resolution, resolution)
+
+    return _compute_surface(
+        tuple(float(b) for b in rainfall_bounds),
+        tuple(float(b) for b in water_level_bounds),
+        tuple(int(r) for r in resolution),
+        float(humidity),
+        tuple(float(b) for b in humidity_bounds) if humidity_bounds is not None else None,
+        int(humidity_steps),
+        float(temp_min),
+        float(temp_max),
+        version or registry.active_version
+    )
+
+def clear_surface_cache():
+    """Kosongkan cache permukaan risiko (mis. setelah bobot model berubah)"""
+    _compute_surface.cache_clear()
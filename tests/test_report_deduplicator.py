@@ -0,0 +1,79 @@
+"""
+ReportDeduplicator: alamat hampir sama ditautkan, tetapi nomor rumah/gang
+yang berbeda tidak pernah dianggap lokasi yang sama.
+"""
+
+import threading
+
+from models.ReportDeduplicator import ReportDeduplicator, normalize_address, numbers_compatible
+from models.InMemoryReportStorage import InMemoryReportStorage
+
+NOW = 1_700_000_000.0
+
+def test_normalize_address():
+    assert normalize_address('Jl. Slamet Riyadi No.012') == 'jalan slamet riyadi 12'
+
+def test_near_duplicate_address_is_linked():
+    dedup = ReportDeduplicator()
+    dedup.add(1, dedup.signature('Jl. Slamet Riyadi No. 12, Surakarta'), NOW)
+
+    match = dedup.find(dedup.signature('Jalan Slamet Riyadi no 12 Surakarta'), NOW + 60)
+    assert match is not None
+    assert match[0] == 1
+
+def test_different_house_numbers_are_not_linked():
+    dedup = ReportDeduplicator()
+    dedup.add(1, dedup.signature('Gang Mawar 1'), NOW)
+
+    assert dedup.find(dedup.signature('Gang Mawar 3'), NOW + 60) is None
+    assert dedup.find(dedup.signature('Gg. Mawar 1'), NOW + 60)[0] == 1
+
+def test_numbers_compatible():
+    assert numbers_compatible(frozenset(), frozenset({'3'}))
+    assert numbers_compatible(frozenset({'1', '3'}), frozenset({'1'}))
+    assert not numbers_compatible(frozenset({'1'}), frozenset({'3'}))
+
+def test_reports_outside_window_are_not_linked():
+    dedup = ReportDeduplicator(window_minutes=30)
+    dedup.add(1, dedup.signature('Jl. Slamet Riyadi 12'), NOW)
+
+    assert dedup.find(dedup.signature('Jl. Slamet Riyadi 12'), NOW + 31 * 60) is None
+
+def test_concurrent_find_or_add_keeps_one_canonical():
+    dedup = ReportDeduplicator()
+    signature = dedup.signature('Jl. Slamet Riyadi 12')
+    barrier = threading.Barrier(8)
+    results = {}
+
+    def submit(report_id):
+        barrier.wait()
+        results[report_id] = dedup.find_or_add(report_id, signature, NOW)
+
+    threads = [threading.Thread(target=submit, args=(report_id,)) for report_id in range(1, 9)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    canonical = [report_id for report_id, match in results.items() if match is None]
+    assert len(canonical) == 1
+    assert all(match[0] == canonical[0] for match in results.values() if match is not None)
+
+def test_monthly_statistics_collapse_duplicates():
+    storage = InMemoryReportStorage()
+    dedup = ReportDeduplicator()
+
+    def create(address):
+        signature = dedup.signature(address)
+        return storage.create_report(
+            address, '30', 'Budi',
+            deduplicate=lambda report_id: dedup.find_or_add(report_id, signature)
+        )
+
+    create('Jl. Slamet Riyadi 12')
+    create('Jalan Slamet Riyadi 12')
+    create('Gang Mawar 1')
+    create('Gang Mawar 3')
+
+    assert storage.get_monthly_statistics()['total_reports'] == 4
+    assert storage.get_monthly_statistics(collapse_duplicates=True)['total_reports'] == 3
@@ -0,0 +1,71 @@
+"""
+Regresi index flood_reports (migrasi v2): query harian/bulanan, limit per IP
+dan urutan "Timestamp" harus dilayani index, tanpa full scan atau temp B-tree.
+Query diambil langsung dari konstanta FloodReportModel.
+"""
+
+import sqlite3
+
+import pytest
+
+from models.DatabaseMigrator import DatabaseMigrator
+from models.FloodReportModel import (
+    reports_sql,
+    TODAY_REPORTS_WHERE,
+    MONTH_REPORTS_WHERE,
+    ALL_REPORTS_WHERE,
+    IP_DAY_COUNT_SQL
+)
+
+TODAY_SQL = reports_sql(TODAY_REPORTS_WHERE)
+MONTH_SQL = reports_sql(MONTH_REPORTS_WHERE)
+ALL_SQL = reports_sql(ALL_REPORTS_WHERE)
+
+@pytest.fixture
+def conn(tmp_path):
+    db_path = str(tmp_path / 'flood_system.db')
+    DatabaseMigrator(db_path).migrate()
+    conn = sqlite3.connect(db_path)
+    yield conn
+    conn.close()
+
+def query_plan(conn, sql, params=()):
+    return [row[3] for row in conn.execute(f'EXPLAIN QUERY PLAN {sql}', params)]
+
+def assert_uses_index(plan, index_name):
+    assert any(
+        step.startswith(('SEARCH', 'SCAN')) and f'INDEX {index_name}' in step
+        for step in plan
+    ), plan
+    assert not any('TEMP B-TREE' in step for step in plan), plan
+
+def test_today_reports_use_report_date_index(conn):
+    plan = query_plan(conn, TODAY_SQL, ('2024-01-15',))
+    assert_uses_index(plan, 'idx_flood_reports_report_date')
+    assert any(step.startswith('SEARCH') for step in plan), plan
+
+def test_month_reports_use_report_date_index_without_sort(conn):
+    plan = query_plan(conn, MONTH_SQL, ('2024-01-01', '2024-02-01'))
+    assert_uses_index(plan, 'idx_flood_reports_report_date')
+    assert any(step.startswith('SEARCH') for step in plan), plan
+
+def test_daily_ip_count_uses_covering_index(conn):
+    plan = query_plan(conn, IP_DAY_COUNT_SQL, ('10.0.0.1', '2024-01-15'))
+    assert any('COVERING INDEX idx_flood_reports_ip_date' in step for step in plan), plan
+
+def test_all_reports_ordered_by_timestamp_index(conn):
+    plan = query_plan(conn, ALL_SQL)
+    assert_uses_index(plan, 'idx_flood_reports_timestamp')
+
+def test_month_order_matches_timestamp_order(conn):
+    rows = [
+        (f'2024-01-{day:02d} {hour:02d}:00:00', 'Jl. Mawar', '30', 'Budi', f'2024-01-{day:02d}')
+        for day in (3, 15, 28) for hour in (23, 0, 12)
+    ]
+    conn.executemany('''
+        INSERT INTO flood_reports ("Timestamp", "Alamat", "Tinggi Banjir", "Nama Pelapor", report_date)
+        VALUES (?, ?, ?, ?, ?)
+    ''', rows)
+
+    month = [row[-1] for row in conn.execute(MONTH_SQL, ('2024-01-01', '2024-02-01'))]
+    assert month == sorted((row[0] for row in rows), reverse=True)
@@ -0,0 +1,44 @@
+"""
+ReportReadCache: hasil fallback dari jalur gagal (mark_failed) tidak
+di-cache, jadi query berikutnya dicoba lagi alih-alih membaca data kosong.
+"""
+
+from models.ReportReadCache import ReportReadCache
+
+def test_successful_read_is_cached():
+    cache = ReportReadCache()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return [1, 2, 3]
+
+    assert cache.get_or_load(('reports',), loader) == [1, 2, 3]
+    assert cache.get_or_load(('reports',), loader) == [1, 2, 3]
+    assert len(calls) == 1
+
+def test_failed_read_is_not_cached():
+    cache = ReportReadCache()
+    results = [[], [1, 2, 3]]
+
+    def loader():
+        value = results.pop(0)
+        if not value:
+            cache.mark_failed()
+        return value
+
+    assert cache.get_or_load(('reports',), loader) == []
+    assert cache.get_or_load(('reports',), loader) == [1, 2, 3]
+    assert cache.stats()['entries'] == 1
+
+def test_failed_inner_read_marks_outer_read():
+    cache = ReportReadCache()
+
+    def inner():
+        cache.mark_failed()
+        return []
+
+    outer = lambda: {'reports': cache.get_or_load(('inner',), inner)}
+
+    cache.get_or_load(('outer',), outer)
+    assert cache.stats()['entries'] == 0
@@ -0,0 +1,146 @@
+"""
+Propagasi ketidakpastian Monte Carlo untuk prediksi ANN dan Gumbel.
+
+Setiap input (per stasiun) diberi N sampel noise sesuai distribusi error
+sensor, lalu seluruh sampel dievaluasi sekaligus dalam satu pass NumPy
+berbentuk (stasiun, sampel). Hasilnya persentil risiko dan probabilitas
+tiap kelas status.
+
+ANN memakai versi model aktif di model_registry; Gumbel memakai parameter
+hasil fit per stasiun (gumbel_fitting), atau default untuk stasiun yang
+belum di-fit.
+"""
+
+import numpy as np
+
+from model_ann import ANN_STATUS_LABELS
+from model_registry import registry
+from gumbel_distribution import predict_flood_gumbel_batch
+from gumbel_fitting import get_station_parameters, DEFAULT_DB_PATH
+
+DEFAULT_N_SAMPLES = 10000
+DEFAULT_PERCENTILES = (5, 50, 95)
+
+# Error sensor default. Jenis distribusi:
+#   ('normal', sigma)            -> x + N(0, sigma)
+#   ('relative_normal', frac)    -> x * (1 + N(0, frac))
+#   ('uniform', half_width)      -> x + U(-half_width, half_width)
+DEFAULT_NOISE = {
+    'rainfall': ('relative_normal', 0.10),
+    'water_level': ('normal', 0.10),
+    'humidity': ('normal', 3.0),
+    'temperature': ('normal', 0.5)
+}
+
+PHYSICAL_BOUNDS = {
+    'rainfall': (0.0, None),
+    'water_level': (None, None),
+    'humidity': (0.0, 100.0),
+    'temperature': (None, None)
+}
+
+def sample_inputs(values, name, n_samples, rng, noise=None):
+    """Sampel noise untuk satu fitur; hasil berbentuk (len(values), n_samples)"""
+    noise = noise or DEFAULT_NOISE
+    values = np.atleast_1d(np.asarray(values, dtype=float))[:, np.newaxis]
+    kind, scale = noise.get(name, ('normal', 0.0))
+    shape = (values.shape[0], n_samples)
+
+    if kind == 'normal':
+        samples = values + rng.normal(0.0, scale, size=shape)
+    elif kind == 'relative_normal':
+        samples = values * (1.0 + rng.normal(0.0, scale, size=shape))
+    elif kind == 'uniform':
+        samples = values + rng.uniform(-scale, scale, size=shape)
+    else:
+        raise ValueError(f"Distribusi noise tidak dikenal: {kind}")
+
+    low, high = PHYSICAL_BOUNDS.get(name, (None, None))
+    if low is not None or high is not None:
+        np.clip(samples, low, high, out=samples)
+    return samples
+
+def summarize_samples(risk_level, status_code, percentiles=DEFAULT_PERCENTILES, labels=ANN_STATUS_LABELS):
+    """Persentil risiko dan probabilitas kelas status per baris"""
+    risk_percentiles = np.percentile(risk_level, percentiles, axis=1)
+    class_counts = np.stack([(status_code == code).sum(axis=1) for code in range(len(labels))], axis=1)
+
+    return {
+        'risk_mean': risk_level.mean(axis=1),
+        'risk_percentiles': {p: risk_percentiles[i] for i, p in enumerate(percentiles)},
+        'status_probability': {
+            label: class_counts[:, code] / risk_level.shape[1]
+            for code, label in enumerate(labels)
+        },
+        'n_samples': risk_level.shape[1]
+    }
+
+def propagate_ann_uncertainty(rainfall, water_level, humidity, temperature,
+                            n_samples=DEFAULT_N_SAMPLES, noise=None, seed=None,
+                            percentiles=DEFAULT_PERCENTILES, version=None):
+    """
+    Monte Carlo untuk predict_flood_ann; input skalar atau array per stasiun.
+    version=None memakai versi aktif registry.
+    """
+    try:
+        rng = np.random.default_rng(seed)
+        rainfall, water_level, humidity, temperature = np.broadcast_arrays(
+            *(np.atleast_1d(np.asarray(v, dtype=float)) for v in (rainfall, water_level, humidity, temperature))
+        )
+
+        result = registry.predict_batch(
+            sample_inputs(rainfall, 'rainfall', n_samples, rng, noise),
+            sample_inputs(water_level, 'water_level', n_samples, rng, noise),
+            sample_inputs(humidity, 'humidity', n_samples, rng, noise),
+            sample_inputs(temperature, 'temperature', n_samples, rng, noise),
+            version=version
+        )
+        if 'error' in result:
+            raise ValueError(result['error'])
+
+        summary = summarize_samples(result['risk_level'], result['status_code'], percentiles)
+        summary['model_version'] = result['model_version']
+        return summary
+
+    except Exception as e:
+        return {
+            'status': 'ERROR',
+            'message': f'Error dalam propagasi ketidakpastian ANN: {str(e)}'
+        }
+
+def station_gumbel_parameters(stations, n_rows, method='mle', db_path=DEFAULT_DB_PATH):
+    """mu, beta berbentuk (n_rows, 1) dari parameter fit tiap stasiun, plus sumbernya"""
+    if stations is None or isinstance(stations, str):
+        stations = [stations] * n_rows
+    if len(stations) != n_rows:
+        raise ValueError("Jumlah stasiun harus sama dengan jumlah nilai curah hujan")
+
+    params = [get_station_parameters(station, method, db_path) for station in stations]
+    mu = np.array([p[0] for p in params], dtype=float)[:, np.newaxis]
+    beta = np.array([p[1] for p in params], dtype=float)[:, np.newaxis]
+    return mu, beta, [p[2] for p in params]
+
+def propagate_gumbel_uncertainty(rainfall, n_samples=DEFAULT_N_SAMPLES, noise=None, seed=None,
+                                percentiles=DEFAULT_PERCENTILES, station=None, method='mle',
+                                db_path=DEFAULT_DB_PATH):
+    """
+    Monte Carlo untuk predict_flood_gumbel; input skalar atau array per stasiun.
+    `station` = nama stasiun (satu atau list sepanjang rainfall) untuk lookup
+    mu/beta hasil fit; None atau stasiun yang belum di-fit memakai default.
+    """
+    try:
+        rng = np.random.default_rng(seed)
+        rainfall_samples = sample_inputs(rainfall, 'rainfall', n_samples, rng, noise)
+        mu, beta, sources = station_gumbel_parameters(station, rainfall_samples.shape[0], method, db_path)
+
+        result = predict_flood_gumbel_batch(rainfall_samples, mu=mu, beta=beta)
+        summary = summarize_samples(result['risk_level'], result['status_code'], percentiles)
+        summary['probability_mean'] = result['probability'].mean(axis=1)
+        summary['parameter_source'] = sources
+        return summary
+
+    except Exception as e:
+        return {
+            'status': 'ERROR',
+            'message': f'Error dalam propagasi ketidakpastian Gumbel: {str(e)}'
+        }
@@ -3,6 +3,8 @@ import pandas as pd
 import os
 from datetime import datetime
 
+PAGE_SIZE = 25
+
 def show_current_month_reports(controller):
     """Display current month's flood reports"""
     
@@ -31,18 +33,39 @@ def show_current_month_reports(controller):
     </style>
     """, unsafe_allow_html=True)
     
-    reports = controller.get_today_reports()
+    # Buffer laporan hari ini disimpan per sesi; setiap rerun hanya
+    # mengambil laporan yang lebih baru dari id terakhir di buffer
+    if 'harian_feed' not in st.session_state:
+        st.session_state.harian_feed = controller.new_report_feed('today')
+    feed = st.session_state.harian_feed
+    is_first_poll = feed['day'] is None
+    new_count = controller.poll_report_feed(feed)
+    
+    if new_count and not is_first_poll:
+        st.toast(f"🆕 {new_count} laporan baru masuk")
     
-    if not reports:
+    if not feed['total']:
         st.info("📭 Belum ada laporan banjir hari ini.")
+        if st.button("🔄 Perbarui", key="harian_refresh_empty"):
+            st.rerun()
         return
     
-    total_reports = len(reports)
-    unique_locations = len(set(r.get('Alamat', '') for r in reports))
-    unique_reporters = len(set(r.get('Nama Pelapor', '') for r in reports))
+    total_reports = feed['total']
+    unique_locations = len(feed['locations'])
+    unique_reporters = len(feed['reporters'])
+    
+    buffered = feed['reports']
+    offset = min(st.session_state.get('harian_offset', 0), max(len(buffered) - 1, 0))
+    offset -= offset % PAGE_SIZE
+    reports = buffered[offset:offset + PAGE_SIZE]
     
     today = datetime.now().strftime('%d %B %Y')
-    st.markdown(f"### 📊 Laporan Harian - {today}")
+    col_title, col_refresh = st.columns([5, 1])
+    with col_title:
+        st.markdown(f"### 📊 Laporan Harian - {today}")
+    with col_refresh:
+        if st.button("🔄 Perbarui", key="harian_refresh", use_container_width=True):
+            st.rerun()
     
     col1, col2, col3 = st.columns(3)
     with col1:
@@ -54,7 +77,7 @@ def show_current_month_reports(controller):
     
     st.markdown("---")
     
-    for i, report in enumerate(reports, 1):
+    for i, report in enumerate(reports, offset + 1):
         with st.container():
             col1, col2, col3, col4, col5 = st.columns([4, 2, 2, 2, 1])
             
@@ -87,28 +110,73 @@ def show_current_month_reports(controller):
                 else:
                     st.write("📭")
         
-        if i < total_reports:
+        if i < offset + len(reports):
             st.divider()
     
+    show_feed_pagination_controls('harian_offset', offset, len(reports), len(buffered), total_reports)
+    
     st.markdown("---")
     
     with st.expander("📋 Data dalam Tabel"):
-        table_data = []
-        for report in reports:
-            table_data.append({
-                'No': reports.index(report) + 1,
-                'Alamat': report.get('Alamat', ''),
-                'Tinggi Banjir': report.get('Tinggi Banjir', ''),
-                'Pelapor': report.get('Nama Pelapor', ''),
-                'No HP': report.get('No HP', ''),
-                'Waktu': report.get('report_time', '')[:5],
-                'Status': report.get('Status', 'pending')
-            })
-        
-        if table_data:
-            df = pd.DataFrame(table_data)
+        if reports:
+            # FloodReport adalah tuple -> DataFrame kolumnar tanpa dict per baris
+            df = pd.DataFrame.from_records(reports, columns=reports[0].COLUMNS)
+            df.insert(0, 'No', range(offset + 1, offset + 1 + len(df)))
+            df['Waktu'] = df['report_time'].fillna('').str[:5]
+            df['Status'] = df['Status'].fillna('pending')
+            df = df.rename(columns={'Nama Pelapor': 'Pelapor'})
+            df = df[['No', 'Alamat', 'Tinggi Banjir', 'Pelapor', 'No HP', 'Waktu', 'Status']]
             st.dataframe(df, use_container_width=True, hide_index=True)
 
+def show_report_search(controller):
+    """Kotak pencarian laporan berdasarkan alamat / nama pelapor (FTS5, bm25)"""
+    st.markdown("### 🔍 Cari Laporan")
+    
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        query = st.text_input(
+            "Cari alamat atau nama pelapor",
+            key="report_search_query",
+            placeholder="contoh: jl merdeka, kemang, budi"
+        )
+    with col2:
+        scope_label = st.selectbox("Periode", ["Semua", "Bulan Ini", "Hari Ini"], key="report_search_scope")
+    
+    if not query or not query.strip():
+        return
+    
+    scope = {'Semua': 'all', 'Bulan Ini': 'month', 'Hari Ini': 'today'}[scope_label]
+    results = controller.search_reports(query, scope=scope, limit=50)
+    
+    if len(results) == 0:
+        st.info(f"Tidak ada laporan yang cocok dengan \"{query}\".")
+        return
+    
+    st.caption(f"{len(results)} laporan paling relevan")
+    df = pd.DataFrame.from_records(results, columns=results[0].COLUMNS)
+    df['Waktu'] = df['Timestamp'].fillna('').str[:16]
+    df['Status'] = df['Status'].fillna('pending')
+    df = df.rename(columns={'Nama Pelapor': 'Pelapor'})
+    df = df[['Alamat', 'Tinggi Banjir', 'Pelapor', 'Waktu', 'Status']]
+    st.dataframe(df, use_container_width=True, hide_index=True)
+
+def show_feed_pagination_controls(state_key, offset, page_count, buffered_count, total_reports):
+    """Tombol halaman sebelumnya/berikutnya atas buffer laporan di session_state"""
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        if offset > 0 and st.button("⬅️ Sebelumnya", key=f"{state_key}_prev", use_container_width=True):
+            st.session_state[state_key] = max(offset - PAGE_SIZE, 0)
+            st.rerun()
+    with col2:
+        caption = f"Menampilkan {offset + 1}-{offset + page_count} dari {total_reports} laporan"
+        if buffered_count < total_reports:
+            caption += f" ({buffered_count} terbaru dimuat)"
+        st.caption(caption)
+    with col3:
+        if offset + page_count < buffered_count and st.button("Berikutnya ➡️", key=f"{state_key}_next", use_container_width=True):
+            st.session_state[state_key] = offset + PAGE_SIZE
+            st.rerun()
+
 def format_date(date_string):
     """Format date to Indonesian format"""
     try:
@@ -3,6 +3,8 @@ import pandas as pd
 import os
 from datetime import datetime
 
+PAGE_SIZE = 25
+
 def show_monthly_reports_summary(controller):
     """Display monthly reports summary dengan struktur baru"""
     
@@ -21,35 +23,39 @@ def show_monthly_reports_summary(controller):
     </style>
     """, unsafe_allow_html=True)
     
-    reports = controller.get_month_reports()
+    summary = controller.get_reports_summary('month')
     
-    if not reports:
+    if not summary.get('total_reports'):
         st.info(" Tidak ada laporan banjir untuk bulan ini.")
         return
     
     current_month = datetime.now().strftime('%B %Y')
-    total_reports = len(reports)
+    total_reports = summary['total_reports']
     
     today = datetime.now().strftime('%Y-%m-%d')
-    today_reports = [r for r in reports if r.get('report_date') == today]
     
     col1, col2, col3, col4 = st.columns(4)
     with col1:
         st.metric("Total Laporan", total_reports)
     with col2:
-        st.metric("Laporan Hari Ini", len(today_reports))
+        st.metric("Laporan Hari Ini", summary['today_reports'])
     with col3:
-        unique_reporters = len(set(r.get('Nama Pelapor', '') for r in reports))
-        st.metric("Jumlah Pelapor", unique_reporters)
+        st.metric("Jumlah Pelapor", summary['unique_reporters'])
     with col4:
-        locations = len(set(r.get('Alamat', '') for r in reports))
-        st.metric("Lokasi Berbeda", locations)
+        st.metric("Lokasi Berbeda", summary['unique_locations'])
+    
+    show_daily_trend(controller)
+    
+    cursor_stack = st.session_state.setdefault('bulanan_cursor_stack', [None])
+    page = controller.get_reports_page('month', page_size=PAGE_SIZE, cursor=cursor_stack[-1])
+    reports = page['reports']
+    offset = (len(cursor_stack) - 1) * PAGE_SIZE
     
     st.markdown("---")
     
     st.markdown(f"###  Daftar Laporan Bulan {current_month}")
     
-    for i, report in enumerate(reports, 1):
+    for i, report in enumerate(reports, offset + 1):
         with st.container():
             col1, col2, col3, col4, col5 = st.columns([4, 2, 2, 2, 1])
             
@@ -85,8 +91,47 @@ def show_monthly_reports_summary(controller):
                 else:
                     st.write("📭")
         
-        if i < total_reports:
+        if i < offset + len(reports):
             st.divider()
+    
+    show_pagination_controls('bulanan_cursor_stack', page['next_cursor'], offset, len(reports), total_reports)
+
+def show_daily_trend(controller):
+    """Grafik jumlah laporan per hari bulan ini (satu query histogram)"""
+    try:
+        # Batas bulan berjalan dalam WIB dari controller (server bisa ber-zona UTC)
+        month_start, tomorrow = controller.get_month_to_date_range()
+        if month_start is None:
+            return
+        histogram = controller.get_report_histogram(month_start, tomorrow, bucket='day')
+        
+        if not histogram.get('labels'):
+            return
+        
+        trend = pd.DataFrame(
+            {'Jumlah Laporan': histogram['counts']},
+            index=[label[-2:] for label in histogram['labels']]
+        )
+        st.markdown("#### Tren Laporan Harian")
+        st.bar_chart(trend)
+    except Exception as e:
+        st.warning(f"⚠️ Grafik tren tidak tersedia: {e}")
+
+def show_pagination_controls(state_key, next_cursor, offset, page_count, total_reports):
+    """Tombol halaman sebelumnya/berikutnya berbasis tumpukan cursor di session_state"""
+    cursor_stack = st.session_state[state_key]
+    
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        if len(cursor_stack) > 1 and st.button("⬅️ Sebelumnya", key=f"{state_key}_prev", use_container_width=True):
+            cursor_stack.pop()
+            st.rerun()
+    with col2:
+        st.caption(f"Menampilkan {offset + 1}-{offset + page_count} dari {total_reports} laporan")
+    with col3:
+        if next_cursor is not None and st.button("Berikutnya ➡️", key=f"{state_key}_next", use_container_width=True):
+            cursor_stack.append(next_cursor)
+            st.rerun()
 
 def format_date_full(date_string):
 
@@ -62,7 +62,15 @@ def show_prediction_dashboard(controller):
     
     st.markdown("### Detail per Lokasi")
     
-    for pred in predictions:
+    uncertainty = []
+    if hasattr(controller, 'get_prediction_uncertainty'):
+        uncertainty = controller.get_prediction_uncertainty(predictions)
+    
+    gumbel_bands = []
+    if hasattr(controller, 'get_gumbel_bands'):
+        gumbel_bands = controller.get_gumbel_bands(predictions)
+    
+    for idx, pred in enumerate(predictions):
         with st.container():
             col1, col2, col3, col4 = st.columns([3, 2, 2, 2])
             
@@ -107,5 +115,28 @@ def show_prediction_dashboard(controller):
                     st.write(f"- Status: {pred['gumbel_status']}")
                     st.write(f"- Risk Level: {pred['gumbel_risk']:.3f}")
                     st.write(f"- Analisis: {pred['gumbel_message']}")
+                
+                if idx < len(uncertainty):
+                    band = uncertainty[idx]
+                    st.markdown("**Ketidakpastian Sensor (Monte Carlo)**")
+                    col_c, col_d = st.columns(2)
+                    with col_c:
+                        st.write(f"- ANN 5%-95%: {band['ann_p5']:.3f} – {band['ann_p95']:.3f}")
+                        st.write("- Peluang status: " + ", ".join(
+                            f"{k} {v:.0%}" for k, v in band['ann_status_probability'].items()))
+                    with col_d:
+                        st.write(f"- Gumbel 5%-95%: {band['gumbel_p5']:.3f} – {band['gumbel_p95']:.3f}")
+                        st.write("- Peluang status: " + ", ".join(
+                            f"{k} {v:.0%}" for k, v in band['gumbel_status_probability'].items()))
+                
+                if idx < len(gumbel_bands) and gumbel_bands[idx]:
+                    gband = gumbel_bands[idx]
+                    level = gband['return_level']
+                    st.markdown(f"**Interval Kepercayaan Gumbel ({gband['confidence']:.0%}, bootstrap)**")
+                    st.write(f"- μ: {gband['mu']['lower']:.1f} – {gband['mu']['upper']:.1f} mm")
+                    st.write(f"- β: {gband['beta']['lower']:.1f} – {gband['beta']['upper']:.1f} mm")
+                    if level:
+                        st.write(f"- Hujan rencana {gband['return_period']} tahun: {level['median']:.1f} mm "
+                                f"({level['lower']:.1f} – {level['upper']:.1f})")
             
             st.markdown("---")